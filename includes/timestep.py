@@ -0,0 +1,152 @@
+"""Timestep
+
+A fixed-timestep accumulator. Decouple simulated time from frame rate: every frame, feed in the
+wall time that passed and run the returned number of fixed physics steps. The leftover fraction
+of a step (alpha) can be used to interpolate between the last two physics states when rendering.
+
+time_scale changes how much simulated time a wall second is worth (slow motion < 1 < fast
+forward) without touching dt: fast forward runs more steps per frame, and only the last state is
+drawn. With a step_budget, the steps per frame are also capped by the measured cost of a step
+(fed with record_cost), so a heavy scene in fast forward drops simulated time instead of frames.
+"""
+
+_TYPE_MSG = lambda name, param, expect: f"invalid type for {name}: {param}. Expected: {expect}"
+_VAL_MSG = lambda name, param, expect: f"invalid value for {name}: {param}. Expected: {expect}"
+
+
+class FixedTimestep:
+    """FixedTimestep
+
+    Real-time accumulator for fixed physics steps
+    """
+    def __init__(self, dt: int | float, max_frame_time: int | float = 0.25,
+                 max_steps: int = 25, time_scale: int | float = 1.0,
+                 step_budget: int | float | None = None, smoothing: float = 0.1) -> None:
+        """FixedTimestep
+
+        Args:
+            dt (int | float): Physics step size in seconds
+            max_frame_time (int | float, optional): Longest wall time (in seconds) accepted for one
+            frame. Longer frames (window dragged, breakpoint...) are clamped. Defaults to 0.25.
+            max_steps (int, optional): Max physics steps per frame. Time that would need more steps
+            is dropped instead of carried over, so the simulation never falls into a spiral of
+            death. Defaults to 25.
+            time_scale (int | float, optional): Simulated seconds per wall second.
+            Defaults to 1.0.
+            step_budget (int | float | None, optional): Wall time (in seconds) physics may use
+            per frame. Lowers max_steps according to the step cost given to record_cost. None
+            to only use max_steps. Defaults to None.
+            smoothing (float, optional): Weight of the newest sample in the moving average of
+            the step cost, in (0, 1]. Defaults to 0.1.
+        """
+        if not isinstance(dt, int | float):
+            raise TypeError(_TYPE_MSG("dt", type(dt), "int, float"))
+        if dt <= 0:
+            raise ValueError(_VAL_MSG("dt", dt, "> 0"))
+        if not isinstance(max_frame_time, int | float):
+            raise TypeError(_TYPE_MSG("max_frame_time", type(max_frame_time), "int, float"))
+        if not isinstance(max_steps, int):
+            raise TypeError(_TYPE_MSG("max_steps", type(max_steps), "int"))
+        if max_steps < 1:
+            raise ValueError(_VAL_MSG("max_steps", max_steps, ">= 1"))
+        if step_budget is not None and not isinstance(step_budget, int | float):
+            raise TypeError(_TYPE_MSG("step_budget", type(step_budget), "int, float, None"))
+        if step_budget is not None and step_budget <= 0:
+            raise ValueError(_VAL_MSG("step_budget", step_budget, "> 0"))
+        if not isinstance(smoothing, int | float):
+            raise TypeError(_TYPE_MSG("smoothing", type(smoothing), "int, float"))
+        if not 0 < smoothing <= 1:
+            raise ValueError(_VAL_MSG("smoothing", smoothing, "in (0, 1]"))
+        self.__dt = dt
+        self.__max_frame_time = max_frame_time
+        self.__max_steps = max_steps
+        self.__step_budget = step_budget
+        self.__smoothing = smoothing
+        self.__step_cost = None
+        self.__accumulator = 0.0
+        self.__dropped = 0.0
+        self.time_scale = time_scale
+
+    def advance(self, frame_time: int | float) -> int:
+        """Add wall time to the accumulator
+
+        Args:
+            frame_time (int | float): Wall time since last frame, in seconds
+
+        Returns:
+            int: Number of fixed steps to run this frame
+        """
+        frame_time = min(max(frame_time, 0), self.__max_frame_time)
+        self.__accumulator += frame_time * self.__time_scale
+        steps = int(self.__accumulator / self.__dt)
+        max_steps = self.max_steps
+        if steps > max_steps:
+            self.__dropped += (steps - max_steps) * self.__dt
+            steps = max_steps
+        self.__accumulator -= steps * self.__dt
+        if self.__accumulator >= self.__dt:
+            self.__accumulator %= self.__dt
+        return steps
+
+    def record_cost(self, elapsed: int | float, steps: int):
+        """Feed the wall time the last steps took. Used by step_budget
+
+        Args:
+            elapsed (int | float): Wall time in seconds
+            steps (int): Number of steps run in that time
+        """
+        if steps < 1:
+            return
+        cost = elapsed / steps
+        if self.__step_cost is None:
+            self.__step_cost = cost
+        else:
+            self.__step_cost += self.__smoothing * (cost - self.__step_cost)
+
+    def reset(self):
+        """Clear the accumulator
+        """
+        self.__accumulator = 0.0
+        self.__dropped = 0.0
+
+    @property
+    def dt(self):
+        """__dt getter
+        """
+        return self.__dt
+    @property
+    def alpha(self):
+        """Fraction of a step left in the accumulator, in [0, 1). Use it as interpolation factor
+        between previous and current physics state
+        """
+        return self.__accumulator / self.__dt
+    @property
+    def time_scale(self):
+        """Simulated seconds per wall second
+        """
+        return self.__time_scale
+    @time_scale.setter
+    def time_scale(self, value):
+        if not isinstance(value, int | float):
+            raise TypeError(_TYPE_MSG("time_scale", type(value), "int, float"))
+        if value <= 0:
+            raise ValueError(_VAL_MSG("time_scale", value, "> 0"))
+        self.__time_scale = value
+    @property
+    def max_steps(self):
+        """Steps allowed this frame: max_steps, lowered to fit step_budget once step costs
+        were recorded
+        """
+        if self.__step_budget is None or not self.__step_cost:
+            return self.__max_steps
+        return max(1, min(self.__max_steps, int(self.__step_budget / self.__step_cost)))
+    @property
+    def step_cost(self):
+        """Moving average of the wall time of one step, None before record_cost
+        """
+        return self.__step_cost
+    @property
+    def dropped(self):
+        """Simulated time (in seconds) dropped because of max_steps
+        """
+        return self.__dropped
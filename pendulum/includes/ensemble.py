@@ -0,0 +1,361 @@
+"""Ensemble
+
+Many pendulums held in NumPy arrays (struct of arrays) and advanced together with one vectorized
+step. Each row is one bob hanging from (balance, pivot_y). Pendulum is a view onto one row, so the
+single pendulum drawn by PendulumMain is simply an ensemble of one.
+
+step() is the tick based update PendulumMain used to run, per tick:
+    angacc = -strength * sin(angle)
+    vel = (vel + angacc) * (1 + damping)
+    angle += vel
+
+advance() works in physical units instead: lengths are converted to metres with pixels_per_meter,
+each bob has its own gravity (m/s^2) and linear drag (1/s), vel is in rad/s, and an Integrator
+from pendulum.includes.integrators moves the state by an explicit dt in seconds. Use one or the
+other on an ensemble, vel does not mean the same in both.
+
+Example (sensitivity to the release point):
+    ensemble = PendulumEnsemble()
+    xs = np.linspace(200, 210, 5000)
+    ensemble.add_many(np.column_stack((xs, np.full(5000, 300))), 15, 475)
+    ensemble.step(600)
+    ensemble.angle  # final angles, one per bob
+    ensemble.advance(10, RK45())  # or ten seconds in physical units
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+from pendulum.includes.integrators import GRAVITY, Integrator, energy, pendulum_accel
+
+PIVOT_Y = 50
+DEF_STRENGTH = 0.0005
+PIXELS_PER_METER = 100
+
+_TYPE_MSG = lambda name, param, expect: f"invalid type for {name}: {param}. Expected: {expect}"
+_VAL_MSG = lambda name, param, expect: f"invalid value for {name}: {param}. Expected: {expect}"
+_INT_COLUMNS = ("x", "y", "old_x", "old_y", "radius", "balance")
+_FLOAT_COLUMNS = ("vel", "angacc", "angle", "length", "strength", "damping", "gravity", "drag")
+
+
+class BobState(NamedTuple):
+    """What Pendulum.draw reads of one bob. old_x, old_y is where its trail was last drawn
+    """
+    x: int
+    y: int
+    old_x: int
+    old_y: int
+    radius: int
+    balance: int
+
+
+class EnsembleSnapshot(NamedTuple):
+    """Read only copy of the ensemble columns a renderer needs
+    """
+    x: np.ndarray
+    y: np.ndarray
+    radius: np.ndarray
+    balance: np.ndarray
+    angle: np.ndarray
+    vel: np.ndarray
+
+    def bob(self, row: int, old: tuple | list | None = None) -> BobState:
+        """State of one bob
+
+        Args:
+            row (int): Row of the bob
+            old (tuple | list | None, optional): Trail start. None to start at the bob.
+            Defaults to None.
+
+        Returns:
+            BobState: Plain ints
+        """
+        x, y = int(self.x[row]), int(self.y[row])
+        old_x, old_y = (x, y) if old is None else old
+        return BobState(x, y, old_x, old_y, int(self.radius[row]), int(self.balance[row]))
+
+
+class PendulumEnsemble:
+    """PendulumEnsemble
+
+    N pendulums in NumPy arrays, stepped together
+    """
+    def __init__(self, capacity: int = 16, pivot_y: int = PIVOT_Y,
+                 pixels_per_meter: int | float = PIXELS_PER_METER) -> None:
+        """PendulumEnsemble
+
+        Args:
+            capacity (int, optional): Initial number of rows. Grows as needed. Defaults to 16.
+            pivot_y (int, optional): Height of every pivot on screen. Defaults to PIVOT_Y.
+            pixels_per_meter (int | float, optional): Screen scale used by advance().
+            Defaults to PIXELS_PER_METER.
+        """
+        if not isinstance(capacity, int):
+            raise TypeError(_TYPE_MSG("capacity", type(capacity), "int"))
+        if capacity < 1:
+            raise ValueError(_VAL_MSG("capacity", capacity, ">= 1"))
+        if not isinstance(pixels_per_meter, int | float):
+            raise TypeError(_TYPE_MSG("pixels_per_meter", type(pixels_per_meter), "int, float"))
+        if pixels_per_meter <= 0:
+            raise ValueError(_VAL_MSG("pixels_per_meter", pixels_per_meter, "> 0"))
+        self.__pivot_y = pivot_y
+        self.__pixels_per_meter = pixels_per_meter
+        self.__count = 0
+        self.__columns = {}
+        for name in _INT_COLUMNS:
+            self.__columns[name] = np.zeros(capacity, dtype=np.int64)
+        for name in _FLOAT_COLUMNS:
+            self.__columns[name] = np.zeros(capacity)
+
+    def __len__(self):
+        return self.__count
+
+    def __reserve(self, count: int):
+        capacity = len(self.__columns["x"])
+        if count <= capacity:
+            return
+        while capacity < count:
+            capacity *= 2
+        for name, column in self.__columns.items():
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self.__count] = column[:self.__count]
+            self.__columns[name] = grown
+
+    def column(self, name: str) -> np.ndarray:
+        """Full storage of a column, including unused rows. Used by Pendulum views
+
+        Args:
+            name (str): Column name
+
+        Returns:
+            np.ndarray: Column array. Replaced when the ensemble grows
+        """
+        return self.__columns[name]
+
+    def add(self, coords: list | tuple, radius: int, balance: int,
+            strength: int | float = DEF_STRENGTH, damping: int | float = 0,
+            gravity: int | float = GRAVITY, drag: int | float = 0) -> int:
+        """Add one pendulum whose bob starts at coords
+
+        Args:
+            coords (list | tuple): Bob position on screen
+            radius (int): Bob radius
+            balance (int): Pivot x
+            strength (int | float, optional): Angular acceleration per unit of sin(angle).
+            Defaults to DEF_STRENGTH.
+            damping (int | float, optional): Velocity change per tick (< 0 damps).
+            Defaults to 0.
+            gravity (int | float, optional): Gravity in m/s^2, for advance().
+            Defaults to GRAVITY.
+            drag (int | float, optional): Linear drag in 1/s, for advance(). Defaults to 0.
+
+        Returns:
+            int: Row of the new pendulum
+        """
+        return int(self.add_many([coords], radius, balance, strength, damping, gravity,
+                                 drag)[0])
+
+    def add_many(self, coords, radius, balance, strength=DEF_STRENGTH,
+                 damping=0, gravity=GRAVITY, drag=0) -> np.ndarray:
+        """Add pendulums. Every argument but coords is a scalar or one value per pendulum
+
+        Args:
+            coords (array like): (N, 2) bob positions on screen
+            radius (array like): Bob radii
+            balance (array like): Pivot x
+            strength (array like, optional): Defaults to DEF_STRENGTH.
+            damping (array like, optional): Defaults to 0.
+            gravity (array like, optional): Defaults to GRAVITY.
+            drag (array like, optional): Defaults to 0.
+
+        Returns:
+            np.ndarray: Rows of the new pendulums
+        """
+        coords = np.rint(np.asarray(coords, dtype=float)).astype(np.int64).reshape(-1, 2)
+        first = self.__count
+        self.__reserve(first + len(coords))
+        rows = np.arange(first, first + len(coords))
+        columns = self.__columns
+        columns["x"][rows] = columns["old_x"][rows] = coords[:, 0]
+        columns["y"][rows] = columns["old_y"][rows] = coords[:, 1]
+        columns["radius"][rows] = radius
+        columns["balance"][rows] = balance
+        columns["strength"][rows] = strength
+        columns["damping"][rows] = damping
+        columns["gravity"][rows] = gravity
+        columns["drag"][rows] = drag
+        for name in ("vel", "angacc", "angle", "length"):
+            columns[name][rows] = 0
+        self.__count += len(coords)
+        return rows
+
+    def clear(self):
+        """Remove every pendulum. Views onto removed rows must not be used anymore
+        """
+        self.__count = 0
+
+    def angle_length(self, rows=None):
+        """Compute length and angle from the bob positions
+
+        Args:
+            rows (array like | None, optional): Rows to update. None for all. Defaults to None.
+        """
+        rows = slice(0, self.__count) if rows is None else rows
+        columns = self.__columns
+        dx = columns["x"][rows] - columns["balance"][rows]
+        dy = columns["y"][rows] - self.__pivot_y
+        length = np.hypot(dx, dy)
+        columns["length"][rows] = length
+        # A bob released on its pivot hangs still instead of dividing by zero
+        columns["angle"][rows] = np.arcsin(np.divide(dx, length, out=np.zeros_like(length),
+                                                     where=length > 0))
+
+    def update_position(self, rows=None):
+        """Compute the bob positions from length and angle, rounded to pixels
+
+        Args:
+            rows (array like | None, optional): Rows to update. None for all. Defaults to None.
+        """
+        rows = slice(0, self.__count) if rows is None else rows
+        columns = self.__columns
+        angle = columns["angle"][rows]
+        length = columns["length"][rows]
+        columns["x"][rows] = np.rint(columns["balance"][rows] + length * np.sin(angle))
+        columns["y"][rows] = np.rint(self.__pivot_y + length * np.cos(angle))
+
+    def step(self, steps: int = 1):
+        """Advance every pendulum
+
+        Args:
+            steps (int, optional): Number of ticks. Defaults to 1.
+        """
+        count = self.__count
+        if not count:
+            return
+        columns = self.__columns
+        angle = columns["angle"][:count]
+        vel = columns["vel"][:count]
+        angacc = columns["angacc"][:count]
+        strength = -columns["strength"][:count]
+        factor = 1 + columns["damping"][:count]
+        for _ in range(steps):
+            np.sin(angle, out=angacc)
+            angacc *= strength
+            vel += angacc
+            vel *= factor
+            angle += vel
+        columns["old_x"][:count] = columns["x"][:count]
+        columns["old_y"][:count] = columns["y"][:count]
+        self.update_position()
+
+    def advance(self, dt: int | float, integrator: Integrator):
+        """Advance every pendulum by dt seconds in physical units
+
+        Args:
+            dt (int | float): Time step in s
+            integrator (Integrator): Integrator moving angle and vel (rad/s)
+        """
+        if not isinstance(integrator, Integrator):
+            raise TypeError(_TYPE_MSG("integrator", type(integrator), "Integrator"))
+        count = self.__count
+        if not count:
+            return
+        columns = self.__columns
+        accel = pendulum_accel(columns["gravity"][:count], self.meters, columns["drag"][:count])
+        columns["angle"][:count], columns["vel"][:count] = integrator.advance(
+            columns["angle"][:count], columns["vel"][:count], dt, accel)
+        columns["angacc"][:count] = accel(columns["angle"][:count], columns["vel"][:count])
+        columns["old_x"][:count] = columns["x"][:count]
+        columns["old_y"][:count] = columns["y"][:count]
+        self.update_position()
+
+    def energy(self) -> np.ndarray:
+        """Mechanical energy of each bob for advance(), 0 at rest
+
+        Returns:
+            np.ndarray: (N,) energies in J/kg
+        """
+        return energy(self.angle, self.vel, self.meters, self.gravity)
+
+    def snapshot(self) -> EnsembleSnapshot:
+        """Copy the columns a renderer needs, safe to read while the ensemble keeps stepping
+
+        Returns:
+            EnsembleSnapshot: Read only arrays
+        """
+        count = self.__count
+        arrays = []
+        for name in EnsembleSnapshot._fields:
+            array = self.__columns[name][:count].copy()
+            array.flags.writeable = False
+            arrays.append(array)
+        return EnsembleSnapshot(*arrays)
+
+    def positions(self) -> np.ndarray:
+        """Bob positions
+
+        Returns:
+            np.ndarray: (N, 2) screen positions
+        """
+        return np.column_stack((self.x, self.y))
+
+    @property
+    def pivot_y(self):
+        """Height of the pivots on screen
+        """
+        return self.__pivot_y
+    @property
+    def pixels_per_meter(self):
+        """Screen scale used by advance()
+        """
+        return self.__pixels_per_meter
+    @property
+    def x(self):
+        """(N,) bob x
+        """
+        return self.__columns["x"][:self.__count]
+    @property
+    def y(self):
+        """(N,) bob y
+        """
+        return self.__columns["y"][:self.__count]
+    @property
+    def angle(self):
+        """(N,) angles in radians, 0 is straight down
+        """
+        return self.__columns["angle"][:self.__count]
+    @property
+    def vel(self):
+        """(N,) angular velocities, in radians per tick for step() and per second for advance()
+        """
+        return self.__columns["vel"][:self.__count]
+    @property
+    def length(self):
+        """(N,) pendulum lengths in pixels
+        """
+        return self.__columns["length"][:self.__count]
+    @property
+    def meters(self):
+        """(N,) pendulum lengths in metres
+        """
+        return self.length / self.__pixels_per_meter
+    @property
+    def strength(self):
+        """(N,) angular acceleration per unit of sin(angle). Writable view
+        """
+        return self.__columns["strength"][:self.__count]
+    @property
+    def damping(self):
+        """(N,) velocity change per tick. Writable view
+        """
+        return self.__columns["damping"][:self.__count]
+    @property
+    def gravity(self):
+        """(N,) gravity in m/s^2 used by advance(). Writable view
+        """
+        return self.__columns["gravity"][:self.__count]
+    @property
+    def drag(self):
+        """(N,) linear drag in 1/s used by advance(). Writable view
+        """
+        return self.__columns["drag"][:self.__count]
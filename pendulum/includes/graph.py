@@ -1,17 +1,208 @@
-def coordinates_process(lines, count):
-    if not lines:
-        temp_1 = []
-    else:
-        temp_1 = [i.strip() for i in lines.split(" ")]
-
-    if not count:
-        temp_2 = []
-    else:
-        temp_2 = [i.strip() for i in count.split(' ')]
-
-    if not temp_1 or not temp_2:
-        return (), ()
-
-    position_x = [int(i) for i in temp_1]
-    position_y = [int(i) for i in temp_2[:len(temp_1)]]
-    return position_x, position_y
\ No newline at end of file
+"""Graph
+
+Live line graph of a RingBuffer, drawn on a pygame Surface inside the simulation window.
+
+The plot is kept on its own surface. Every update scrolls it left by the columns the new samples
+need and draws only those samples on the right edge, so a frame costs what the new samples cost,
+not the length of the history. When a pixel column holds several samples (window wider than the
+graph), they are decimated to one vertical min/max span per column. The whole plot is only redrawn
+when the value range grows (autoscale) or the history was cleared.
+"""
+import math
+
+import numpy as np
+import pygame
+
+from pendulum.includes.history import RingBuffer
+
+DEF_BG_COLOR = "#FFFFFF"
+DEF_LINE_COLOR = "#960000"
+DEF_AXIS_COLOR = "#9c9c9c"
+DEF_BORDER_COLOR = "#475F77"
+DEF_TEXT_COLOR = "#000000"
+
+_TYPE_MSG = lambda name, param, expect: f"invalid type for {name}: {param}. Expected: {expect}"
+_VAL_MSG = lambda name, param, expect: f"invalid value for {name}: {param}. Expected: {expect}"
+
+
+class LiveGraph:
+    """LiveGraph
+
+    Scrolling graph of the latest samples of a RingBuffer
+    """
+    def __init__(self, size: tuple | list, window: int = 600,
+                 y_range: tuple | list = (-1, 1), autoscale: bool = True,
+                 font: pygame.font.Font | None = None, title: str = "",
+                 bg_color: str = DEF_BG_COLOR, line_color: str = DEF_LINE_COLOR,
+                 axis_color: str = DEF_AXIS_COLOR, border_color: str = DEF_BORDER_COLOR,
+                 text_color: str = DEF_TEXT_COLOR) -> None:
+        """LiveGraph
+
+        Args:
+            size (tuple | list): Width and height in pixels
+            window (int, optional): Samples visible at once. Defaults to 600.
+            y_range (tuple | list, optional): Initial (low, high) values. Defaults to (-1, 1).
+            autoscale (bool, optional): Grow the range when a sample falls outside of it.
+            Defaults to True.
+            font (pygame.font.Font | None, optional): Font for title and range labels. None for
+            no text. Defaults to None.
+            title (str, optional): Title drawn in the top left corner. Defaults to "".
+        """
+        if not isinstance(size, tuple | list) or len(size) != 2:
+            raise TypeError(_TYPE_MSG("size", type(size), "(width, height)"))
+        if not isinstance(window, int):
+            raise TypeError(_TYPE_MSG("window", type(window), "int"))
+        if window < 2:
+            raise ValueError(_VAL_MSG("window", window, ">= 2"))
+        if y_range[0] >= y_range[1]:
+            raise ValueError(_VAL_MSG("y_range", y_range, "(low, high) with low < high"))
+        self.__width, self.__height = int(size[0]), int(size[1])
+        self.__window = window
+        self.__samples_per_pixel = window / self.__width
+        self.__low, self.__high = y_range
+        self.__autoscale = autoscale
+        self.__font = font
+        self.__title = title
+        self.__bg_color = bg_color
+        self.__line_color = line_color
+        self.__axis_color = axis_color
+        self.__border_color = border_color
+        self.__text_color = text_color
+        self.__plot = pygame.Surface((self.__width, self.__height))
+        self.__labels = []
+        self.clear()
+
+    def clear(self):
+        """Erase the plot. Call when the history was cleared
+        """
+        self.__plot.fill(self.__bg_color)
+        self.__seen = 0
+        self.__right = 0
+        self.__last = None
+        self.__render_labels()
+
+    def __render_labels(self):
+        self.__labels = []
+        if self.__font is None:
+            return
+        for text in (self.__title, f"{self.__high:.4g}", f"{self.__low:.4g}"):
+            self.__labels.append(self.__font.render(text, True, self.__text_color)
+                                 if text else None)
+
+    def __to_y(self, values: np.ndarray) -> np.ndarray:
+        scale = (self.__height - 1) / (self.__high - self.__low)
+        return np.rint((self.__high - values) * scale).astype(int)
+
+    def __append(self, values: np.ndarray, first: int):
+        """Scroll and draw samples whose global indices start at first
+        """
+        width = self.__width
+        columns = (np.arange(first, first + len(values)) / self.__samples_per_pixel).astype(int)
+        shift = int(columns[-1]) - self.__right
+        if shift > 0:
+            if shift >= width:
+                self.__plot.fill(self.__bg_color)
+            else:
+                self.__plot.scroll(-shift, 0)
+                self.__plot.fill(self.__bg_color, (width - shift, 0, shift, self.__height))
+            self.__right = int(columns[-1])
+        ys = self.__to_y(values)
+        xs = columns - self.__right + width - 1
+        line_color = self.__line_color
+        if self.__samples_per_pixel <= 1:
+            points = list(zip(xs.tolist(), ys.tolist()))
+            if self.__last is not None:
+                points.insert(0, (self.__last[0] - self.__right + width - 1, self.__last[1]))
+            if len(points) > 1:
+                pygame.draw.lines(self.__plot, line_color, False, points)
+            else:
+                self.__plot.set_at(points[0], line_color)
+        else:
+            # One vertical span per column, joined to the last value of the previous column
+            starts = np.flatnonzero(np.r_[True, columns[1:] != columns[:-1]])
+            lows = np.minimum.reduceat(ys, starts)
+            highs = np.maximum.reduceat(ys, starts)
+            lasts = ys[np.r_[starts[1:] - 1, len(ys) - 1]]
+            previous = np.r_[ys[0] if self.__last is None else self.__last[1], lasts[:-1]]
+            lows = np.minimum(lows, previous)
+            highs = np.maximum(highs, previous)
+            for x, low, high in zip(xs[starts].tolist(), lows.tolist(), highs.tolist()):
+                pygame.draw.line(self.__plot, line_color, (x, low), (x, high))
+        self.__last = (int(columns[-1]), int(ys[-1]))
+
+    def __rescale(self, low: float, high: float):
+        margin = (high - low) * 0.1 or 1
+        self.__low = min(self.__low, low - margin)
+        self.__high = max(self.__high, high + margin)
+
+    def redraw(self, history: RingBuffer):
+        """Draw the visible part of the history from scratch
+
+        Args:
+            history (RingBuffer): Samples to plot
+        """
+        total = history.total
+        self.__plot.fill(self.__bg_color)
+        self.__last = None
+        self.__seen = total
+        count = min(len(history), self.__window + math.ceil(self.__samples_per_pixel))
+        if not count:
+            return
+        _, values = history.latest(count)
+        if self.__autoscale and (values.min() < self.__low or values.max() > self.__high):
+            self.__rescale(float(values.min()), float(values.max()))
+        self.__render_labels()
+        self.__right = int((total - 1) / self.__samples_per_pixel)
+        self.__append(values, total - count)
+
+    def update(self, history: RingBuffer):
+        """Draw the samples added since the last update
+
+        Args:
+            history (RingBuffer): Samples to plot
+        """
+        total = history.total
+        new = total - self.__seen
+        if new == 0:
+            return
+        if new < 0 or new > min(len(history), self.__window):
+            self.redraw(history)
+            return
+        _, values = history.latest(new)
+        if self.__autoscale and (values.min() < self.__low or values.max() > self.__high):
+            self.redraw(history)
+            return
+        self.__append(values, total - new)
+        self.__seen = total
+
+    def draw(self, surface: pygame.Surface, pos: tuple | list):
+        """Blit the graph with its zero line, border and labels
+
+        Args:
+            surface (pygame.Surface): Surface to draw on
+            pos (tuple | list): Top left corner
+        """
+        x, y = pos
+        surface.blit(self.__plot, pos)
+        if self.__low < 0 < self.__high:
+            zero = y + int(self.__to_y(np.zeros(1))[0])
+            pygame.draw.line(surface, self.__axis_color, (x, zero), (x + self.__width - 1, zero))
+        pygame.draw.rect(surface, self.__border_color, (x, y, self.__width, self.__height), 2)
+        if self.__labels:
+            title, high, low = self.__labels
+            if title is not None:
+                surface.blit(title, (x + 6, y + 4))
+            surface.blit(high, (x + self.__width - high.get_width() - 6, y + 4))
+            surface.blit(low, (x + self.__width - low.get_width() - 6,
+                               y + self.__height - low.get_height() - 4))
+
+    @property
+    def surface(self):
+        """Plot surface, without border and labels
+        """
+        return self.__plot
+    @property
+    def y_range(self):
+        """Current (low, high) values
+        """
+        return self.__low, self.__high
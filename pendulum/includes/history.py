@@ -0,0 +1,124 @@
+"""History
+
+Fixed size ring buffer of timestamped float samples. Memory is allocated once; when the buffer is
+full the oldest samples are overwritten. Readers get NumPy arrays in chronological order.
+"""
+import numpy as np
+
+_TYPE_MSG = lambda name, param, expect: f"invalid type for {name}: {param}. Expected: {expect}"
+_VAL_MSG = lambda name, param, expect: f"invalid value for {name}: {param}. Expected: {expect}"
+
+
+class RingBuffer:
+    """RingBuffer
+
+    Preallocated history of (time, value) samples
+    """
+    def __init__(self, capacity: int, width: int = 1) -> None:
+        """RingBuffer
+
+        Args:
+            capacity (int): Max samples kept
+            width (int, optional): Values per sample. Defaults to 1.
+        """
+        if not isinstance(capacity, int):
+            raise TypeError(_TYPE_MSG("capacity", type(capacity), "int"))
+        if capacity < 1:
+            raise ValueError(_VAL_MSG("capacity", capacity, ">= 1"))
+        if not isinstance(width, int):
+            raise TypeError(_TYPE_MSG("width", type(width), "int"))
+        if width < 1:
+            raise ValueError(_VAL_MSG("width", width, ">= 1"))
+        self.__capacity = capacity
+        self.__width = width
+        self.__times = np.zeros(capacity)
+        self.__values = np.zeros((capacity, width))
+        self.__head = 0
+        self.__total = 0
+
+    def __len__(self):
+        return min(self.__total, self.__capacity)
+
+    def append(self, time: int | float, value):
+        """Add a sample, overwriting the oldest one when full
+
+        Args:
+            time (int | float): Timestamp
+            value (int | float | array like): Value, or width values
+        """
+        head = self.__head
+        self.__times[head] = time
+        self.__values[head] = value
+        self.__head = (head + 1) % self.__capacity
+        self.__total += 1
+
+    def extend(self, times, values):
+        """Add several samples at once
+
+        Args:
+            times (array like): (N,) timestamps
+            values (array like): (N,) or (N, width) values
+        """
+        times = np.asarray(times, dtype=float).reshape(-1)
+        values = np.asarray(values, dtype=float).reshape(len(times), self.__width)
+        dropped = len(times) - self.__capacity
+        if dropped > 0:
+            times = times[dropped:]
+            values = values[dropped:]
+            self.__total += dropped
+        rows = (self.__head + np.arange(len(times))) % self.__capacity
+        self.__times[rows] = times
+        self.__values[rows] = values
+        self.__head = (self.__head + len(times)) % self.__capacity
+        self.__total += len(times)
+
+    def clear(self):
+        """Drop every sample. Memory is kept
+        """
+        self.__head = 0
+        self.__total = 0
+
+    def arrays(self) -> tuple:
+        """Samples in chronological order
+
+        Returns:
+            tuple: (times, values) copies. values is (N,) for width 1, (N, width) otherwise
+        """
+        count = len(self)
+        start = (self.__head - count) % self.__capacity
+        if start + count <= self.__capacity:
+            times = self.__times[start:start + count].copy()
+            values = self.__values[start:start + count].copy()
+        else:
+            times = np.concatenate((self.__times[start:], self.__times[:self.__head]))
+            values = np.concatenate((self.__values[start:], self.__values[:self.__head]))
+        if self.__width == 1:
+            values = values[:, 0]
+        return times, values
+
+    def latest(self, count: int) -> tuple:
+        """Last samples in chronological order
+
+        Args:
+            count (int): Max samples returned
+
+        Returns:
+            tuple: (times, values) copies, like arrays()
+        """
+        count = max(0, min(count, len(self)))
+        rows = (self.__head - count + np.arange(count)) % self.__capacity
+        values = self.__values[rows]
+        if self.__width == 1:
+            values = values[:, 0]
+        return self.__times[rows], values
+
+    @property
+    def capacity(self):
+        """Max samples kept
+        """
+        return self.__capacity
+    @property
+    def total(self):
+        """Samples appended since the last clear, including the overwritten ones
+        """
+        return self.__total
@@ -0,0 +1,330 @@
+"""Integrators
+
+Integrators for pendulum dynamics in physical units. State is a pair of arrays, angle (rad) and
+angular velocity (rad/s), advanced by an explicit dt (s) under an angular acceleration function
+accel(angle, vel). For a bob on a massless rod with linear drag:
+    accel = -(g / length) * sin(angle) - drag * vel
+
+    SemiImplicitEuler  1st order, 1 evaluation per step, symplectic
+    VelocityVerlet     2nd order, 2 evaluations per step, symplectic when drag is 0
+    RK4                4th order, 4 evaluations per step
+    RK45               Dormand-Prince 5(4), splits dt into adaptive substeps to meet a tolerance
+
+The symplectic methods keep the energy error bounded, the Runge-Kutta ones let it drift slowly
+but are far more accurate per step, so they stay stable with much larger dt. energy_drift
+measures both sides for a given dt.
+
+CLI (from the repository root):
+    python -m pendulum.includes.integrators --angle 1.5 --length 3 --duration 60
+"""
+import abc
+import argparse
+import math
+
+import numpy as np
+
+GRAVITY = 9.81
+
+_TYPE_MSG = lambda name, param, expect: f"invalid type for {name}: {param}. Expected: {expect}"
+_VAL_MSG = lambda name, param, expect: f"invalid value for {name}: {param}. Expected: {expect}"
+
+
+def pendulum_accel(gravity, length, drag=0):
+    """Angular acceleration function of pendulums
+
+    Args:
+        gravity (array like): Gravity in m/s^2, scalar or one per pendulum
+        length (array like): Rod length in m. A length of 0 hangs still
+        drag (array like, optional): Linear drag in 1/s. Defaults to 0.
+
+    Returns:
+        callable: accel(angle, vel) -> np.ndarray
+    """
+    length = np.asarray(length, dtype=float)
+    stiffness = np.divide(gravity, length, out=np.zeros(np.broadcast(gravity, length).shape),
+                          where=length > 0)
+    drag = np.asarray(drag, dtype=float)
+    if not drag.any():
+        return lambda angle, vel: -stiffness * np.sin(angle)
+    return lambda angle, vel: -stiffness * np.sin(angle) - drag * vel
+
+
+def energy(angle, vel, length, gravity=GRAVITY) -> np.ndarray:
+    """Mechanical energy per unit mass, 0 at rest hanging straight down
+
+    Args:
+        angle (array like): Angles in rad
+        vel (array like): Angular velocities in rad/s
+        length (array like): Rod lengths in m
+        gravity (array like, optional): Gravity in m/s^2. Defaults to GRAVITY.
+
+    Returns:
+        np.ndarray: Energies in J/kg
+    """
+    angle, vel, length = np.asarray(angle), np.asarray(vel), np.asarray(length)
+    return 0.5 * (length * vel) ** 2 + gravity * length * (1 - np.cos(angle))
+
+
+class Integrator(abc.ABC):
+    """Integrator
+
+    Base of the integrators. Subclasses implement _step
+    """
+    name = ""
+    order = 0
+
+    def __init__(self) -> None:
+        self.__evaluations = 0
+
+    def advance(self, angle, vel, dt: int | float, accel) -> tuple:
+        """Advance the state by dt
+
+        Args:
+            angle (array like): Angles in rad
+            vel (array like): Angular velocities in rad/s
+            dt (int | float): Time step in s
+            accel (callable): accel(angle, vel) -> angular accelerations in rad/s^2
+
+        Returns:
+            tuple: (angle, vel) new arrays
+        """
+        if not isinstance(dt, int | float):
+            raise TypeError(_TYPE_MSG("dt", type(dt), "int, float"))
+        if dt <= 0:
+            raise ValueError(_VAL_MSG("dt", dt, "> 0"))
+        angle, vel, evaluations = self._step(np.asarray(angle, dtype=float),
+                                             np.asarray(vel, dtype=float), dt, accel)
+        self.__evaluations += evaluations
+        return angle, vel
+
+    @abc.abstractmethod
+    def _step(self, angle: np.ndarray, vel: np.ndarray, dt: float, accel) -> tuple:
+        """Returns (angle, vel, evaluations of accel)
+        """
+
+    def reset(self):
+        """Reset the evaluation counter and any step size memory
+        """
+        self.__evaluations = 0
+
+    @property
+    def evaluations(self):
+        """Calls to accel since the last reset
+        """
+        return self.__evaluations
+
+
+class SemiImplicitEuler(Integrator):
+    """SemiImplicitEuler
+
+    Velocity first, then angle with the new velocity
+    """
+    name = "Euler"
+    order = 1
+
+    def _step(self, angle, vel, dt, accel):
+        vel = vel + accel(angle, vel) * dt
+        return angle + vel * dt, vel, 1
+
+
+class VelocityVerlet(Integrator):
+    """VelocityVerlet
+
+    Kick, drift, kick. With drag the second kick uses the half step velocity
+    """
+    name = "Verlet"
+    order = 2
+
+    def _step(self, angle, vel, dt, accel):
+        half = vel + 0.5 * dt * accel(angle, vel)
+        angle = angle + half * dt
+        return angle, half + 0.5 * dt * accel(angle, half), 2
+
+
+class RK4(Integrator):
+    """RK4
+
+    Classic fourth order Runge-Kutta
+    """
+    name = "RK4"
+    order = 4
+
+    def _step(self, angle, vel, dt, accel):
+        half = 0.5 * dt
+        a1 = accel(angle, vel)
+        v2 = vel + half * a1
+        a2 = accel(angle + half * vel, v2)
+        v3 = vel + half * a2
+        a3 = accel(angle + half * v2, v3)
+        v4 = vel + dt * a3
+        a4 = accel(angle + dt * v3, v4)
+        sixth = dt / 6
+        return (angle + sixth * (vel + 2 * v2 + 2 * v3 + v4),
+                vel + sixth * (a1 + 2 * a2 + 2 * a3 + a4), 4)
+
+
+# Dormand-Prince 5(4) tableau. The 5th order weights are the last row of A (first same as last)
+_DP_A = (
+    (),
+    (1 / 5,),
+    (3 / 40, 9 / 40),
+    (44 / 45, -56 / 15, 32 / 9),
+    (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+    (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656),
+    (35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84),
+)
+_DP_E = (71 / 57600, 0, -71 / 16695, 71 / 1920, -17253 / 339200, 22 / 525, -1 / 40)
+
+
+class RK45(Integrator):
+    """RK45
+
+    Adaptive Dormand-Prince 5(4). advance(dt) always ends exactly at dt, running as many substeps
+    as the tolerance needs. Every pendulum shares the substep size, set by the worst one
+    """
+    name = "RK45"
+    order = 5
+
+    def __init__(self, rtol: int | float = 1e-6, atol: int | float = 1e-9,
+                 min_step: int | float = 1e-6, max_substeps: int = 1000) -> None:
+        """RK45
+
+        Args:
+            rtol (int | float, optional): Relative tolerance. Defaults to 1e-6.
+            atol (int | float, optional): Absolute tolerance. Defaults to 1e-9.
+            min_step (int | float, optional): Substeps this small are accepted whatever their
+            error. Defaults to 1e-6.
+            max_substeps (int, optional): Substeps allowed per advance, past it the rest of dt is
+            taken in one substep. Defaults to 1000.
+        """
+        super().__init__()
+        if not isinstance(rtol, int | float) or not isinstance(atol, int | float):
+            raise TypeError(_TYPE_MSG("rtol, atol", (type(rtol), type(atol)), "int, float"))
+        if rtol <= 0 or atol <= 0:
+            raise ValueError(_VAL_MSG("rtol, atol", (rtol, atol), "> 0"))
+        if not isinstance(max_substeps, int):
+            raise TypeError(_TYPE_MSG("max_substeps", type(max_substeps), "int"))
+        if max_substeps < 1:
+            raise ValueError(_VAL_MSG("max_substeps", max_substeps, ">= 1"))
+        self.__rtol = rtol
+        self.__atol = atol
+        self.__min_step = min_step
+        self.__max_substeps = max_substeps
+        self.__substep = None
+
+    def reset(self):
+        super().reset()
+        self.__substep = None
+
+    def __attempt(self, angle, vel, h, accel, first):
+        """One Dormand-Prince step. Returns (angle, vel, last derivative, error norm)
+        """
+        slopes = [first]
+        for row in _DP_A[1:]:
+            stage_angle = angle + h * sum(weight * slope[0]
+                                          for weight, slope in zip(row, slopes) if weight)
+            stage_vel = vel + h * sum(weight * slope[1]
+                                      for weight, slope in zip(row, slopes) if weight)
+            slopes.append((stage_vel, accel(stage_angle, stage_vel)))
+        new_angle, new_vel = stage_angle, stage_vel
+        error_angle = h * sum(weight * slope[0] for weight, slope in zip(_DP_E, slopes) if weight)
+        error_vel = h * sum(weight * slope[1] for weight, slope in zip(_DP_E, slopes) if weight)
+        rtol, atol = self.__rtol, self.__atol
+        scale_angle = atol + rtol * np.maximum(np.abs(angle), np.abs(new_angle))
+        scale_vel = atol + rtol * np.maximum(np.abs(vel), np.abs(new_vel))
+        error = max(float(np.max(np.abs(error_angle) / scale_angle, initial=0)),
+                    float(np.max(np.abs(error_vel) / scale_vel, initial=0)))
+        return new_angle, new_vel, slopes[-1], error
+
+    def _step(self, angle, vel, dt, accel):
+        # accel may change between calls (new drag, gravity...), so the first slope is not kept
+        first = (vel, accel(angle, vel))
+        evaluations = 1
+        remaining = dt
+        h = min(self.__substep or dt, dt)
+        substeps = 0
+        while remaining > 0:
+            substeps += 1
+            last = remaining <= h * (1 + 1e-9) or substeps >= self.__max_substeps
+            h = remaining if last else h
+            new_angle, new_vel, slope, error = self.__attempt(angle, vel, h, accel, first)
+            evaluations += 6
+            factor = 5 if error == 0 else min(5, max(0.2, 0.9 * error ** -0.2))
+            if error > 1 and h > self.__min_step and substeps < self.__max_substeps:
+                h = max(h * factor, self.__min_step)
+                continue
+            angle, vel, first = new_angle, new_vel, slope
+            remaining -= h
+            # A short final substep says nothing about the size the next call can use
+            if not last or self.__substep is None or error > 1:
+                self.__substep = h * factor
+            h = self.__substep
+        return angle, vel, evaluations
+
+    @property
+    def substep(self):
+        """Substep size the next advance starts with, None before the first one
+        """
+        return self.__substep
+
+
+INTEGRATORS = {integrator.name: integrator
+               for integrator in (SemiImplicitEuler, VelocityVerlet, RK4, RK45)}
+
+
+def energy_drift(integrator: Integrator, angle, dt: int | float, duration: int | float,
+                 length=1, gravity=GRAVITY) -> dict:
+    """Release undamped pendulums from rest and measure how far their energy strays
+
+    Args:
+        integrator (Integrator): Integrator to measure. Its counter is reset
+        angle (array like): Release angles in rad
+        dt (int | float): Time step in s
+        duration (int | float): Simulated time in s
+        length (array like, optional): Rod lengths in m. Defaults to 1.
+        gravity (array like, optional): Gravity in m/s^2. Defaults to GRAVITY.
+
+    Returns:
+        dict: Steps, evaluations, evaluations per simulated second, and the final and max
+        relative energy drift (worst pendulum)
+    """
+    if not isinstance(integrator, Integrator):
+        raise TypeError(_TYPE_MSG("integrator", type(integrator), "Integrator"))
+    angle = np.atleast_1d(np.asarray(angle, dtype=float))
+    vel = np.zeros_like(angle)
+    accel = pendulum_accel(gravity, length)
+    start = energy(angle, vel, length, gravity)
+    reference = np.where(start > 0, start, 1)
+    steps = max(1, round(duration / dt))
+    integrator.reset()
+    worst = 0.0
+    for _ in range(steps):
+        angle, vel = integrator.advance(angle, vel, dt, accel)
+        drift = (energy(angle, vel, length, gravity) - start) / reference
+        worst = max(worst, float(np.max(np.abs(drift))))
+    return {"integrator": integrator.name, "dt": dt, "steps": steps,
+            "evaluations": integrator.evaluations,
+            "evaluations_per_second": integrator.evaluations / (steps * dt),
+            "final_drift": float(drift[np.argmax(np.abs(drift))]), "max_drift": worst}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pendulum integrator energy drift")
+    parser.add_argument("--angle", type=float, default=1.5, help="Release angle in rad")
+    parser.add_argument("--length", type=float, default=3, help="Rod length in m")
+    parser.add_argument("--duration", type=float, default=60, help="Simulated time in s")
+    parser.add_argument("--dt", type=float, nargs="+", default=[1 / 240, 1 / 60, 1 / 15, 0.25])
+    args = parser.parse_args()
+
+    period = 2 * math.pi * math.sqrt(args.length / GRAVITY)
+    print(f"small angle period {period:.3f} s, {args.duration / period:.1f} periods")
+    for dt in args.dt:
+        for integrator in INTEGRATORS.values():
+            result = energy_drift(integrator(), args.angle, dt, args.duration, args.length)
+            print(f"dt {dt:<8.4g} {result['integrator']:<7} "
+                  f"{result['evaluations_per_second']:>9.1f} eval/s  "
+                  f"max drift {result['max_drift']:>10.3e}  final {result['final_drift']:>+10.3e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,8 @@ import re
 import math
 import pygame
 
+from pendulum.includes.ensemble import BobState, PendulumEnsemble
+
 
 HEX_COLOR_PATTERN = "^#([0-9A-Fa-f]{3}){1,2}$"
 DEF_LINE_COLOR = "#000000"
@@ -9,28 +11,76 @@ DEF_BORDER_COLOR = "#000000"
 DEF_FILL_COLOR = "#960000"
 
 class Pendulum:
-    def __init__(self, coords: list | tuple = ..., radius: int = ..., balance: int = ...):
-        self.x = coords[0]
-        self.y = coords[1]
-        self.old_x = coords[0]
-        self.old_y = coords[1]
-        self.radius = radius
-        self.balance = balance
-        self.vel = 0
-        self.angacc = 0
+    """Pendulum
+
+    One bob of a PendulumEnsemble. Attributes read and write the ensemble's row, so the same bob
+    can be stepped with the whole ensemble and drawn on its own
+    """
+    def __init__(self, coords: list | tuple = ..., radius: int = ..., balance: int = ...,
+                 ensemble: PendulumEnsemble | None = None, row: int | None = None):
+        """Pendulum
+
+        Args:
+            coords (list | tuple): Bob position on screen
+            radius (int): Bob radius
+            balance (int): Pivot x
+            ensemble (PendulumEnsemble | None, optional): Ensemble holding the bob. None for a
+            private ensemble of one. Defaults to None.
+            row (int | None, optional): Existing row to view instead of adding a new one.
+            Defaults to None.
+        """
+        if ensemble is None:
+            ensemble = PendulumEnsemble(1)
+        if not isinstance(ensemble, PendulumEnsemble):
+            raise TypeError("ensemble must be a PendulumEnsemble")
+        self.__ensemble = ensemble
+        self.__row = ensemble.add(coords, radius, balance) if row is None else row
 
     def angle_length(self):
-        self.length = math.sqrt(math.pow(self.x - self.balance, 2)
-                            + math.pow(self.y - 50, 2))
-        self.angle = math.asin((self.x - self.balance) / self.length)
+        self.__ensemble.angle_length([self.__row])
 
     def update_position(self):
-        self.x = round(self.balance + self.length * math.sin(self.angle))
-        self.y = round(50 + self.length * math.cos(self.angle))
+        self.__ensemble.update_position([self.__row])
+
+    def __get(self, name):
+        return self.__ensemble.column(name)[self.__row].item()
+
+    def __set(self, name, value):
+        self.__ensemble.column(name)[self.__row] = value
+
+    @property
+    def ensemble(self):
+        return self.__ensemble
+    @property
+    def row(self):
+        return self.__row
+    x = property(lambda self: self.__get("x"), lambda self, value: self.__set("x", value))
+    y = property(lambda self: self.__get("y"), lambda self, value: self.__set("y", value))
+    old_x = property(lambda self: self.__get("old_x"),
+                     lambda self, value: self.__set("old_x", value))
+    old_y = property(lambda self: self.__get("old_y"),
+                     lambda self, value: self.__set("old_y", value))
+    radius = property(lambda self: self.__get("radius"),
+                      lambda self, value: self.__set("radius", value))
+    balance = property(lambda self: self.__get("balance"),
+                       lambda self, value: self.__set("balance", value))
+    vel = property(lambda self: self.__get("vel"), lambda self, value: self.__set("vel", value))
+    angacc = property(lambda self: self.__get("angacc"),
+                      lambda self, value: self.__set("angacc", value))
+    angle = property(lambda self: self.__get("angle"),
+                     lambda self, value: self.__set("angle", value))
+    length = property(lambda self: self.__get("length"),
+                      lambda self, value: self.__set("length", value))
 
     def draw(self, screen: pygame.Surface, click_region: pygame.Surface,
              line_color: str = DEF_LINE_COLOR, border_color: str = DEF_BORDER_COLOR,
-             fill_color: str = DEF_FILL_COLOR):
+             fill_color: str = DEF_FILL_COLOR, state: BobState | None = None):
+        """Draw rod, bob and trail
+
+        Args:
+            state (BobState | None, optional): Snapshot of this bob to draw instead of the live
+            row, for renderers running beside the simulation thread. Defaults to None.
+        """
         if not isinstance(screen, pygame.Surface):
             raise TypeError("screen must be a pygame.Surface")
         if not isinstance(click_region, pygame.Surface):
@@ -41,13 +91,14 @@ class Pendulum:
             border_color = DEF_BORDER_COLOR
         if not re.match(HEX_COLOR_PATTERN, fill_color) or not isinstance(fill_color, str):
             fill_color = DEF_FILL_COLOR
+        bob = self if state is None else state
         pygame.draw.lines(screen, line_color, False,
-                          [(self.balance, 50), (self.x, self.y)], 2)
+                          [(bob.balance, 50), (bob.x, bob.y)], 2)
         pygame.draw.circle(screen, border_color,
-                           (self.x, self.y), self.radius)
+                           (bob.x, bob.y), bob.radius)
         pygame.draw.line(click_region, fill_color,
-                         (self.old_x, self.old_y),
-                         (self.x, self.y), 2)
+                         (bob.old_x, bob.old_y),
+                         (bob.x, bob.y), 2)
         screen.blit(click_region, (0, 0))
         pygame.draw.circle(screen, fill_color,
-                           (self.x, self.y), self.radius - 2)
\ No newline at end of file
+                           (bob.x, bob.y), bob.radius - 2)
\ No newline at end of file
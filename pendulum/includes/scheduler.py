@@ -0,0 +1,143 @@
+"""Scheduler
+
+Runs a simulation on its own thread in fixed steps, paced by the accumulator of
+includes.timestep.FixedTimestep instead of sleeping a frame per step, so simulated time is exactly
+steps * dt whatever the sleep jitter.
+
+After each batch of steps the scheduler captures a snapshot and publishes it with one reference
+swap: the renderer keeps reading the front snapshot while the next one is built behind it.
+Snapshots must be immutable (copies), so a published one never changes under the reader. Steps
+and captures run while holding lock, take it too for anything else that touches the simulation
+from another thread.
+
+Between batches the thread waits on a threading.Event until the next step is due, so it does not
+spin, and stop() wakes it and ends it at once.
+
+Example:
+    scheduler = FixedStepScheduler(lambda dt: ensemble.advance(dt, RK4()), ensemble.snapshot,
+                                   1 / 60)
+    scheduler.start()
+    step, snapshot = scheduler.latest()
+    scheduler.stop()
+"""
+import time
+from threading import Event, Lock, Thread, current_thread
+
+from includes.timestep import FixedTimestep
+
+_TYPE_MSG = lambda name, param, expect: f"invalid type for {name}: {param}. Expected: {expect}"
+
+
+class FixedStepScheduler:
+    """FixedStepScheduler
+
+    Fixed step simulation thread publishing immutable snapshots
+    """
+    def __init__(self, step, capture, dt: int | float, max_steps: int = 25,
+                 time_scale: int | float = 1.0, name: str = "physics") -> None:
+        """FixedStepScheduler
+
+        Args:
+            step (callable): step(dt), advances the simulation by one fixed step
+            capture (callable): capture() -> immutable snapshot of the simulation
+            dt (int | float): Step size in seconds
+            max_steps (int, optional): Max steps per batch, see FixedTimestep. Defaults to 25.
+            time_scale (int | float, optional): Simulated seconds per wall second.
+            Defaults to 1.0.
+            name (str, optional): Thread name. Defaults to "physics".
+        """
+        if not callable(step):
+            raise TypeError(_TYPE_MSG("step", type(step), "callable"))
+        if not callable(capture):
+            raise TypeError(_TYPE_MSG("capture", type(capture), "callable"))
+        self.__step = step
+        self.__capture = capture
+        self.__timestep = FixedTimestep(dt, max_steps=max_steps, time_scale=time_scale)
+        self.__name = name
+        self.__lock = Lock()
+        self.__stop = Event()
+        self.__thread = None
+        self.__steps = 0
+        self.__published = (0, None)
+
+    def start(self):
+        """Publish a first snapshot and start the thread. Does nothing if already running
+        """
+        if self.running:
+            return
+        self.__stop.clear()
+        self.__timestep.reset()
+        self.publish()
+        self.__thread = Thread(target=self.__run, name=self.__name, daemon=True)
+        self.__thread.start()
+
+    def publish(self):
+        """Capture and publish a snapshot now, e.g. after the simulation was edited under lock
+        """
+        with self.__lock:
+            self.__published = (self.__steps, self.__capture())
+
+    def stop(self, timeout: int | float | None = 1.0):
+        """Stop the thread and wait for it to end
+
+        Args:
+            timeout (int | float | None, optional): Max wait in seconds, None to wait for the
+            current batch whatever its length. Defaults to 1.0.
+        """
+        self.__stop.set()
+        thread = self.__thread
+        # A step calling stop() must not join its own thread
+        if thread is not None and thread is not current_thread():
+            thread.join(timeout)
+
+    def __run(self):
+        timestep = self.__timestep
+        dt = timestep.dt
+        last = time.perf_counter()
+        while not self.__stop.is_set():
+            now = time.perf_counter()
+            steps = timestep.advance(now - last)
+            last = now
+            if steps:
+                with self.__lock:
+                    for _ in range(steps):
+                        self.__step(dt)
+                    self.__steps += steps
+                    snapshot = self.__capture()
+                self.__published = (self.__steps, snapshot)
+            # Sleep until the accumulator holds a whole step again
+            self.__stop.wait((1 - timestep.alpha) * dt / timestep.time_scale)
+
+    def latest(self) -> tuple:
+        """Last published snapshot
+
+        Returns:
+            tuple: (steps run when it was captured, snapshot)
+        """
+        return self.__published
+
+    @property
+    def lock(self):
+        """Lock held by steps and captures
+        """
+        return self.__lock
+    @property
+    def steps(self):
+        """Steps run since creation
+        """
+        return self.__steps
+    @property
+    def time(self):
+        """Simulated time since creation, in seconds
+        """
+        return self.__steps * self.__timestep.dt
+    @property
+    def timestep(self):
+        """FixedTimestep pacing the steps
+        """
+        return self.__timestep
+    @property
+    def running(self):
+        """True while the thread is alive
+        """
+        return self.__thread is not None and self.__thread.is_alive()
@@ -1,15 +1,15 @@
-import math
-import time
 from pathlib import Path
-from threading import Thread
 
-import matplotlib.pyplot as plt
 import pygame
 
 from includes.button import Button
-from pendulum.includes.graph import coordinates_process
 from includes.label import Label
 from pendulum.includes.object import Pendulum
+from pendulum.includes.ensemble import PendulumEnsemble, DEF_STRENGTH
+from pendulum.includes.integrators import GRAVITY, INTEGRATORS
+from pendulum.includes.history import RingBuffer
+from pendulum.includes.graph import LiveGraph
+from pendulum.includes.scheduler import FixedStepScheduler
 
 _WIDTH = 950
 _HEIGHT = 600
@@ -17,6 +17,11 @@ _WHITE = "#FFFFFF"
 _BLACK = "#000000"
 _DARK_RED = "#960000"
 _FPS = 60
+# Ten minutes of ticks
+_HISTORY_SIZE = _FPS * 600
+_DEF_INTEGRATOR = "RK4"
+# Ticks between two clears of the trail
+_TRAIL_TICKS = 180
 
 
 class PendulumMain:
@@ -30,18 +35,31 @@ class PendulumMain:
         self.__label_font = pygame.font.SysFont("times new roman", 20)
         self.__background = pygame.image.load(rf"{Path(__file__).parent}"
                                               r"\assets\background.png").convert_alpha()
-        self.__exception_region = pygame.Rect(645, 100, 270, 175)
+        self.__widget_region = pygame.Rect(645, 100, 270, 175)
+        self.__graph_region = pygame.Rect(645, 290, 270, 200)
+        self.__exception_region = self.__widget_region
 
         self.__running = True
         self.__acceleration = False
-        self.__times_loop = []
-        self.__arr_x = []
+        self.__history = RingBuffer(_HISTORY_SIZE)
+        self.__graph_font = pygame.font.SysFont("times new roman", 14)
+        self.__graph = LiveGraph(self.__graph_region.size, window=_FPS * 10, y_range=(-100, 100),
+                                 font=self.__graph_font, title="Position / balance (10 s)")
+        self.__show_graph = False
         self.__count_loop = 0
         self.__angular_accel_change = 0
         self.__vel_change = 0
+        self.__integrator = INTEGRATORS[_DEF_INTEGRATOR]()
+        self.__integrator_surface = self.__graph_font.render(
+            f"Integrator: {self.__integrator.name} (I to change)", True, _BLACK)
 
         self.__balance = int(_WIDTH / 2)
-        self.__pendulum = Pendulum((self.__balance, -10), 2, self.__balance)
+        self.__ensemble = PendulumEnsemble()
+        self.__pendulum = Pendulum((self.__balance, -10), 2, self.__balance, self.__ensemble)
+        self.__scheduler = FixedStepScheduler(self.physics_step, self.__ensemble.snapshot,
+                                              1 / _FPS)
+        self.__trail_end = None
+        self.__trail_step = 0
 
     def init_widgets(self):
         self.__btn_vel_increase = Button(self.__screen, font=self.__button_font,text="+",
@@ -70,8 +88,18 @@ class PendulumMain:
         self.__btn_damp_decrease.place(860, 160, 55, 55)
         self.__btn_draw_graph.place(645, 220, 130, 55)
         self.__btn_reset_value.place(785, 220, 130, 55)
+        step, snapshot = self.__scheduler.latest()
+        if step - self.__trail_step >= _TRAIL_TICKS:
+            self.__trail_step = step
+            self.reset_region()
+        bob = snapshot.bob(self.__pendulum.row, self.__trail_end)
+        self.__trail_end = bob.x, bob.y
         self.__pendulum.draw(
-            self.__screen, self.__click_region, _BLACK, _BLACK, _DARK_RED)
+            self.__screen, self.__click_region, _BLACK, _BLACK, _DARK_RED, state=bob)
+        if self.__show_graph:
+            with self.__scheduler.lock:
+                self.__graph.update(self.__history)
+            self.__graph.draw(self.__screen, self.__graph_region.topleft)
 
     def increase_vel(self):
         if self.__angular_accel_change + 0.0005 <= 1:
@@ -92,35 +120,38 @@ class PendulumMain:
     def reset_value(self):
         self.__vel_change = self.__angular_accel_change = 0
 
+    def next_integrator(self):
+        """Switch to the next integrator of INTEGRATORS
+        """
+        names = list(INTEGRATORS)
+        name = names[(names.index(self.__integrator.name) + 1) % len(names)]
+        self.__integrator = INTEGRATORS[name]()
+        self.__integrator_surface = self.__graph_font.render(
+            f"Integrator: {name} (I to change)", True, _BLACK)
+
     def draw_graph(self):
-        plt.clf()
-        position_x, position_y = coordinates_process(
-            " ".join(self.__arr_x), " ".join(self.__times_loop))
-        plt.plot(position_y, position_x)
-        plt.title('Pendulum Graph')
-        plt.xlabel('Position update instance')
-        plt.ylabel('Position with respect to balance')
-        plt.show()
-
-    def animation(self, fps):
-        while self.__running:
-            if self.__acceleration:
-                self.__times_loop.append(str(self.__count_loop))
-                self.__pendulum.old_x = self.__pendulum.x
-                self.__pendulum.old_y = self.__pendulum.y
-                self.__arr_x.append(
-                    str(self.__pendulum.x - self.__pendulum.balance))
-                self.__pendulum.angacc = - \
-                    (0.0005 + self.__angular_accel_change) * \
-                    math.sin(self.__pendulum.angle)
-                self.__pendulum.vel += self.__pendulum.angacc
-                self.__pendulum.vel *= (1 + self.__vel_change)
-                self.__pendulum.angle += self.__pendulum.vel
-                self.__pendulum.update_position()
-                self.__count_loop += 1
-            if self.__count_loop % 180 == 0:
-                self.reset_region()
-            time.sleep(1/fps)
+        """Show or hide the live graph
+        """
+        self.__show_graph = not self.__show_graph
+        # Clicks on the graph must not spawn a pendulum
+        self.__exception_region = (self.__widget_region.union(self.__graph_region)
+                                   if self.__show_graph else self.__widget_region)
+        if self.__show_graph:
+            with self.__scheduler.lock:
+                self.__graph.redraw(self.__history)
+
+    def physics_step(self, dt):
+        """One fixed step, run by the scheduler thread while holding its lock
+        """
+        if not self.__acceleration:
+            return
+        self.__history.append(self.__count_loop, self.__pendulum.x - self.__pendulum.balance)
+        # The buttons keep their tick based steps: velocity scales gravity the way it scaled
+        # strength, damping per tick becomes a drag rate per second
+        self.__ensemble.gravity[:] = GRAVITY * (1 + self.__angular_accel_change / DEF_STRENGTH)
+        self.__ensemble.drag[:] = -self.__vel_change * _FPS
+        self.__ensemble.advance(dt, self.__integrator)
+        self.__count_loop += 1
 
 
     def reset_region(self):
@@ -131,27 +162,38 @@ class PendulumMain:
             pass
 
     def mainloop(self):
-        Thread(target=self.animation, args=(_FPS,)).start()
+        self.__scheduler.start()
         while self.__running:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
+                    self.__running = False
+                    self.__scheduler.stop()
                     pygame.quit()
                     return 0
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_i:
+                    self.next_integrator()
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     mouse_pos = pygame.mouse.get_pos()
                     if not self.__exception_region.collidepoint(mouse_pos):
-                        self.__arr_x = []
-                        self.__times_loop = []
-                        self.__count_loop = 0
+                        with self.__scheduler.lock:
+                            self.__history.clear()
+                            self.__graph.clear()
+                            self.__count_loop = 0
+                            self.__ensemble.clear()
+                            self.__pendulum = Pendulum(
+                                pygame.mouse.get_pos(), 15, self.__balance, self.__ensemble)
+                            self.__pendulum.angle_length()
+                            self.__acceleration = True
+                        self.__scheduler.publish()
                         self.reset_region()
-                        self.__pendulum = Pendulum(
-                            pygame.mouse.get_pos(), 15, self.__balance)
-                        self.__pendulum.angle_length()
-                        self.__acceleration = True
+                        self.__trail_end = None
+                        self.__trail_step = self.__scheduler.steps
 
             self.__screen.fill(_WHITE)
             self.__screen.blit(pygame.transform.scale(
                 self.__background, (955, 555)), (0, 0))
             self.draw_widget()
+            self.__screen.blit(self.__integrator_surface,
+                               (10, _HEIGHT - self.__integrator_surface.get_height() - 10))
             pygame.display.flip()
             self.__clock.tick(_FPS)
\ No newline at end of file
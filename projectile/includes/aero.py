@@ -0,0 +1,144 @@
+"""
+Aerodynamic drag and wind for projectile motion
+
+Aerodynamics computes linear and quadratic drag on every awake dynamic body of a Space in one NumPy
+pass and writes the result to body.force. Call apply() right before each space.step: Chipmunk
+resets forces after every step. Drag acts on the velocity relative to the air, so wind pushes
+bodies along.
+
+    F = -(linear * r) * v_rel - (quadratic * r^2) * |v_rel| * v_rel,    v_rel = v - wind(position)
+
+r is the radius of the body's first Circle shape (1 for bodies without one). Sleeping bodies are
+skipped: setting a force would wake them up.
+
+Wind is either a constant (x, y), a WindGrid, or a callable `wind(positions, time)` returning an
+(N, 2) or (2,) array.
+"""
+import numpy as np
+import pymunk
+
+from projectile.includes.state import BodyState
+
+
+class WindGrid:
+    """Wind vectors sampled on a regular grid. Lookup uses the nearest cell
+    """
+    def __init__(self, origin: tuple | list, cell_size: int | float, vectors: np.ndarray) -> None:
+        """Initiate grid
+
+        Args:
+            origin (tuple | list): World position of cell (0, 0)
+            cell_size (int | float): Cell width and height
+            vectors (np.ndarray): (rows, columns, 2) wind per cell. Positions outside the grid
+            use the nearest border cell.
+        """
+        vectors = np.asarray(vectors, dtype=float)
+        if vectors.ndim != 3 or vectors.shape[2] != 2:
+            raise ValueError("vectors must have shape (rows, columns, 2)")
+        if cell_size <= 0:
+            raise ValueError("cell_size must be greater than 0")
+        self.__origin = np.asarray(origin, dtype=float)
+        self.__cell_size = cell_size
+        self.__vectors = vectors
+
+    def __call__(self, positions: np.ndarray, time: int | float = 0) -> np.ndarray:
+        cells = np.floor((positions - self.__origin) / self.__cell_size).astype(np.intp)
+        rows, columns = self.__vectors.shape[:2]
+        return self.__vectors[np.clip(cells[:, 1], 0, rows - 1),
+                              np.clip(cells[:, 0], 0, columns - 1)]
+
+
+class Aerodynamics:
+    """Vectorized drag and wind for every dynamic body of a Space
+    """
+    def __init__(self, linear: int | float = 0.0, quadratic: int | float = 0.0,
+                 wind=(0, 0)) -> None:
+        """Initiate aerodynamics
+
+        Args:
+            linear (int | float, optional): Linear drag per unit of radius. Defaults to 0.0.
+            quadratic (int | float, optional): Quadratic drag per unit of cross section (r^2).
+            Defaults to 0.0.
+            wind (tuple | list | WindGrid | Callable, optional): Wind field. Defaults to (0, 0).
+        """
+        if not isinstance(linear, int | float):
+            raise TypeError("Unexpected type for linear. Expected: int, float")
+        if not isinstance(quadratic, int | float):
+            raise TypeError("Unexpected type for quadratic. Expected: int, float")
+        if linear < 0 or quadratic < 0:
+            raise ValueError("Drag coefficients must be >= 0")
+        self.__linear = linear
+        self.__quadratic = quadratic
+        self.wind = wind
+        self.__state = BodyState(fields=("position", "velocity", "sleeping", "radius"))
+
+    def forces(self, positions: np.ndarray, velocities: np.ndarray, radii: np.ndarray,
+               time: int | float = 0) -> np.ndarray:
+        """Drag forces for arrays of body state
+
+        Args:
+            positions (np.ndarray): (N, 2) positions
+            velocities (np.ndarray): (N, 2) velocities
+            radii (np.ndarray): (N,) radii
+            time (int | float, optional): Simulated time, passed to callable wind fields.
+
+        Returns:
+            np.ndarray: (N, 2) forces
+        """
+        wind = self.__wind
+        if callable(wind):
+            wind = wind(positions, time)
+        relative = velocities - wind
+        coefficient = self.__linear * radii
+        if self.__quadratic:
+            speed = np.sqrt(np.einsum("ij,ij->i", relative, relative))
+            coefficient = coefficient + self.__quadratic * radii * radii * speed
+        return relative * -coefficient[:, None]
+
+    def apply(self, space: pymunk.Space, time: int | float = 0) -> int:
+        """Set body.force of every awake dynamic body. Call before each space.step
+
+        Args:
+            space (pymunk.Space): Space to act on
+            time (int | float, optional): Simulated time, passed to callable wind fields.
+
+        Returns:
+            int: Number of bodies affected
+        """
+        state = self.__state
+        if not state.update(space):
+            return 0
+        radii = state.radii
+        radii = np.where(radii > 0, radii, 1)
+        if not state.sleeping.any():
+            state.set_forces(self.forces(state.positions, state.velocities, radii, time))
+            return len(state)
+        rows = np.flatnonzero(~state.sleeping)
+        if len(rows):
+            state.set_forces(self.forces(state.positions[rows], state.velocities[rows],
+                                         radii[rows], time), rows)
+        return len(rows)
+
+    @property
+    def linear(self):
+        """__linear getter
+        """
+        return self.__linear
+    @property
+    def quadratic(self):
+        """__quadratic getter
+        """
+        return self.__quadratic
+    @property
+    def wind(self):
+        """Wind field: (x, y) array, WindGrid or callable
+        """
+        return self.__wind
+    @wind.setter
+    def wind(self, value):
+        if callable(value):
+            self.__wind = value
+            return
+        if not isinstance(value, tuple | list | np.ndarray) or len(value) != 2:
+            raise TypeError("Unexpected type for wind. Expected: (x, y), WindGrid, callable")
+        self.__wind = np.asarray(value, dtype=float)
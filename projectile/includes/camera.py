@@ -1,6 +1,9 @@
 """projectile's camera
 
-This file containing the Camera class and default _CAM_CONTROL dictionary
+This file containing the Camera class, default _CAM_CONTROL dictionary and inverse_transform
+
+Camera keeps its composed world-to-screen transform (and the inverse) cached. They are only
+recomputed after the camera moved, zoomed or was reset.
 
 Imports:
 - Any from typing
@@ -14,6 +17,7 @@ Warnings:
 """
 from typing import Any
 import pymunk
+from pymunk.vec2d import Vec2d
 from pygame.locals import *
 
 
@@ -27,12 +31,34 @@ _CAM_CONTROl = {
     "reset": K_SPACE
 }
 
+def inverse_transform(transform: pymunk.Transform) -> pymunk.Transform:
+    """Inverse of an affine pymunk.Transform
+
+    Use it to map screen coordinates back to world coordinates:
+    `inverse_transform(draw_options.transform) @ Vec2d(*mouse_pos)`
+
+    Args:
+        transform (pymunk.Transform): Transform to invert
+
+    Returns:
+        pymunk.Transform: Inverted transform
+    """
+    a, b, c, d, tx, ty = transform
+    determinant = a * d - b * c
+    if determinant == 0:
+        raise ValueError("Transform is not invertible")
+    return pymunk.Transform(
+        d / determinant, -b / determinant,
+        -c / determinant, a / determinant,
+        (c * ty - d * tx) / determinant, (b * tx - a * ty) / determinant
+    )
+
 class Camera:
     """Camera class for Pymunk on Pygame
     """
     def __init__(self, scroll_speed: int = 1, zoom_speed: int | float = 0.01,
                  min_scaling: int | float = 1, max_scaling: int | float = 5,
-                 controls: dict = _CAM_CONTROl) -> None:
+                 controls: dict = _CAM_CONTROl, viewport: tuple | list | None = None) -> None:
         """Initiate camera
 
         Args:
@@ -41,6 +67,9 @@ class Camera:
             min_scaling (int | float, optional): Min zoom
             max_scaling (int | float, optional): Max zoom
             controls (dict, optional): Control. Setting this value is not recommended.
+            viewport (tuple | list | None, optional): Screen size (width, height). Zoom is
+            centered on the middle of the viewport. None zooms around (0, 0) and disables
+            visible_bb. Defaults to None.
 
             control dictionary should have these following keys:
 
@@ -71,6 +100,10 @@ class Camera:
         if not isinstance(controls, dict):
             raise TypeError(f"Unexpected type for controls: {type(controls)}. "
                             "Expected: dict")
+        if viewport is not None and (not isinstance(viewport, tuple | list)
+                                     or len(viewport) != 2):
+            raise TypeError(f"Unexpected type for viewport: {type(viewport)}. "
+                            "Expected: tuple, list of 2 elements, None")
         self.__translation       = pymunk.Transform()
         self.__translation_speed = scroll_speed
         self.__zoom_speed        = zoom_speed
@@ -80,6 +113,12 @@ class Camera:
         self.__scaling           = 1
         self.__x_offset          = 0
         self.__y_offset          = 0
+        self.__viewport          = viewport
+        self.__center            = ((int(viewport[0] / 2), int(viewport[1] / 2))
+                                    if viewport is not None else (0, 0))
+        self.__dirty             = True
+        self.__transform         = pymunk.Transform.identity()
+        self.__inverse           = pymunk.Transform.identity()
 
 
     def compute_translation_and_scaling(self, keys_pressed: Any):
@@ -96,6 +135,8 @@ class Camera:
         down             = int(keys_pressed[self.__controls["down"]])
         right            = int(keys_pressed[self.__controls["right"]])
 
+        zoom_in          = 0
+        zoom_out         = 0
         if not self.__controls["in"] is None:
             zoom_in      = int(keys_pressed[self.__controls["in"]])
         if not self.__controls["out"] is None:
@@ -105,6 +146,10 @@ class Camera:
         else:
             reset        = 0
 
+        if not (left or right or up or down or zoom_in or zoom_out or reset):
+            return (self.__translation, self.__scaling, 0)
+
+        previous = (self.__x_offset, self.__y_offset, self.__scaling)
         if not reset:
             self.__translation = self.__translation.translated(
                 self.__translation_speed * left - self.__translation_speed * right,
@@ -126,12 +171,75 @@ class Camera:
             self.__x_offset = 0
             self.__y_offset = 0
             self.__scaling  = 1
+        if (self.__x_offset, self.__y_offset, self.__scaling) != previous:
+            self.__dirty = True
 
         rotation = 0
 
         return (self.__translation, self.__scaling, rotation)
 
 
+    def __compose(self):
+        """Recompute the cached transform and its inverse
+        """
+        cx, cy = self.__center
+        self.__transform = (
+            pymunk.Transform.translation(cx, cy)
+            @ pymunk.Transform.scaling(self.__scaling)
+            @ pymunk.Transform.translation(self.__x_offset, self.__y_offset)
+            @ pymunk.Transform.translation(-cx, -cy)
+        )
+        self.__inverse = inverse_transform(self.__transform)
+        self.__dirty = False
+
+    def world_to_screen(self, position: tuple | list) -> Vec2d:
+        """Map a world position to screen coordinates
+
+        Args:
+            position (tuple | list): World position
+
+        Returns:
+            Vec2d: Screen position
+        """
+        return self.transform @ Vec2d(*position)
+
+    def screen_to_world(self, position: tuple | list) -> Vec2d:
+        """Map a screen position (e.g. the mouse) to world coordinates, undoing pan and zoom
+
+        Args:
+            position (tuple | list): Screen position
+
+        Returns:
+            Vec2d: World position
+        """
+        return self.inverse @ Vec2d(*position)
+
+    def visible_bb(self) -> pymunk.BB:
+        """World area covered by the viewport. Use it to cull or query what is on screen
+
+        Returns:
+            pymunk.BB: Visible world bounding box
+        """
+        if self.__viewport is None:
+            raise ValueError("visible_bb requires a viewport")
+        x0, y0 = self.screen_to_world((0, 0))
+        x1, y1 = self.screen_to_world(self.__viewport)
+        return pymunk.BB(min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))
+
+    @property
+    def transform(self):
+        """World to screen transform. Cached, recomposed only after the camera changed
+        """
+        if self.__dirty:
+            self.__compose()
+        return self.__transform
+    @property
+    def inverse(self):
+        """Screen to world transform. Cached with transform
+        """
+        if self.__dirty:
+            self.__compose()
+        return self.__inverse
     @property
     def x_offset(self):
         """__x_offset property
@@ -156,9 +264,12 @@ class Camera:
     @x_offset.setter
     def x_offset(self, value):
         self.__x_offset = value
+        self.__dirty = True
     @y_offset.setter
     def y_offset(self, value):
         self.__y_offset = value
+        self.__dirty = True
     @zoom_scale.setter
     def zoom_scale(self, value):
-        self.__scaling = value
\ No newline at end of file
+        self.__scaling = value
+        self.__dirty = True
\ No newline at end of file
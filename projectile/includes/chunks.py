@@ -0,0 +1,192 @@
+"""
+Chunked world for projectile motion
+
+Large, unbounded courses keep their static obstacles out of the pymunk Space until they are
+needed. The world is cut in square chunks; an obstacle belongs to every chunk its bounding box
+overlaps. update() activates the chunks around the camera view and around projectiles, adds the
+obstacles of newly active chunks to the space and removes the ones no chunk needs anymore, each
+with a single space.add / space.remove call. Broadphase and drawing costs then depend on the
+active region, not on the size of the world.
+
+Chunks are activated within `margin` chunks of a region and deactivated only once they are more
+than `margin + 1` chunks away, so a projectile moving along a chunk edge does not make obstacles
+flicker in and out of the space.
+"""
+import math
+from typing import Iterable
+
+import numpy as np
+import pymunk
+
+from projectile.includes.sprites import StaticObstacle, space_items
+
+
+class ChunkedWorld:
+    """Spatial chunks of StaticObstacle, streamed in and out of a pymunk Space
+    """
+    def __init__(self, space: pymunk.Space, chunk_size: int | float = 1200,
+                 margin: int = 1) -> None:
+        """Initiate world
+
+        Args:
+            space (pymunk.Space): Space active obstacles are added to
+            chunk_size (int | float, optional): Chunk width and height. Defaults to 1200.
+            margin (int, optional): Chunks activated around each region. Defaults to 1.
+        """
+        if not isinstance(space, pymunk.Space):
+            raise TypeError("Unexpected type for space. Expected: pymunk.Space")
+        if not isinstance(chunk_size, int | float):
+            raise TypeError("Unexpected type for chunk_size. Expected: int, float")
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be greater than 0")
+        if not isinstance(margin, int) or margin < 0:
+            raise ValueError("margin must be an int >= 0")
+        self.__space = space
+        self.__chunk_size = chunk_size
+        self.__margin = margin
+        # chunk -> set of obstacles, obstacle -> chunks it overlaps
+        self.__chunks = {}
+        self.__obstacle_chunks = {}
+        self.__active = set()
+        self.__in_space = set()
+        self.__ranges = None
+
+    def __len__(self):
+        return len(self.__obstacle_chunks)
+
+    def __chunk_range(self, bb: pymunk.BB) -> tuple:
+        size = self.__chunk_size
+        return (math.floor(bb.left / size), math.floor(bb.bottom / size),
+                math.floor(bb.right / size), math.floor(bb.top / size))
+
+    @staticmethod
+    def __keys(chunk_range: tuple):
+        x0, y0, x1, y1 = chunk_range
+        return ((x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1))
+
+    def chunk_of(self, point: tuple | list) -> tuple:
+        """Chunk holding a world position
+
+        Args:
+            point (tuple | list): World position
+
+        Returns:
+            tuple: (column, row)
+        """
+        size = self.__chunk_size
+        return (math.floor(point[0] / size), math.floor(point[1] / size))
+
+    def add_many(self, obstacles: Iterable[StaticObstacle]):
+        """Place obstacles in their chunks. Obstacles in active chunks are added to the space
+        with one call
+
+        Args:
+            obstacles (Iterable[StaticObstacle]): Obstacles not yet in the space
+        """
+        activated = []
+        for obstacle in obstacles:
+            keys = tuple(self.__keys(self.__chunk_range(obstacle.shape.cache_bb())))
+            self.__obstacle_chunks[obstacle] = keys
+            for key in keys:
+                self.__chunks.setdefault(key, set()).add(obstacle)
+            if not self.__active.isdisjoint(keys):
+                activated.append(obstacle)
+        if activated:
+            self.__in_space.update(activated)
+            self.__space.add(*space_items(self.__space, activated))
+
+    def remove_many(self, obstacles: Iterable[StaticObstacle]):
+        """Forget obstacles. The ones in the space are removed from it with one call
+
+        Args:
+            obstacles (Iterable[StaticObstacle]): Obstacles previously added
+        """
+        removed = []
+        for obstacle in obstacles:
+            for key in self.__obstacle_chunks.pop(obstacle, ()):
+                chunk = self.__chunks[key]
+                chunk.discard(obstacle)
+                if not chunk:
+                    del self.__chunks[key]
+            if obstacle in self.__in_space:
+                self.__in_space.discard(obstacle)
+                removed.append(obstacle)
+        if removed:
+            self.__space.remove(*space_items(self.__space, removed, remove=True))
+
+    def update(self, regions: Iterable[pymunk.BB] = (), points: np.ndarray | None = None) -> bool:
+        """Activate the chunks around regions and points, deactivate the far away ones
+
+        Args:
+            regions (Iterable[pymunk.BB], optional): World areas to keep loaded, e.g. the
+            camera's visible_bb. Defaults to ().
+            points (np.ndarray | None, optional): (N, 2) world positions to keep loaded, e.g.
+            projectile positions. Defaults to None.
+
+        Returns:
+            bool: True if obstacles were added to or removed from the space
+        """
+        margin = self.__margin
+        size = self.__chunk_size
+        ranges = {self.__chunk_range(bb) for bb in regions}
+        if points is not None and len(points):
+            if isinstance(points, np.ndarray):
+                points = np.floor(points / size).astype(np.int64).tolist()
+                ranges.update((x, y, x, y) for x, y in points)
+            else:
+                ranges.update((math.floor(x / size), math.floor(y / size),
+                               math.floor(x / size), math.floor(y / size)) for x, y in points)
+        if ranges == self.__ranges:
+            return False
+        self.__ranges = ranges
+        wanted = set()
+        kept = set()
+        for x0, y0, x1, y1 in ranges:
+            wanted.update(self.__keys((x0 - margin, y0 - margin, x1 + margin, y1 + margin)))
+            kept.update(self.__keys((x0 - margin - 1, y0 - margin - 1,
+                                     x1 + margin + 1, y1 + margin + 1)))
+        active = wanted | (self.__active & kept)
+        if active == self.__active:
+            return False
+        changed = (active ^ self.__active) & self.__chunks.keys()
+        self.__active = active
+
+        candidates = set()
+        for key in changed:
+            candidates.update(self.__chunks[key])
+        added = []
+        removed = []
+        for obstacle in candidates:
+            needed = not active.isdisjoint(self.__obstacle_chunks[obstacle])
+            if needed and obstacle not in self.__in_space:
+                added.append(obstacle)
+            elif not needed and obstacle in self.__in_space:
+                removed.append(obstacle)
+        self.__in_space.difference_update(removed)
+        self.__in_space.update(added)
+        if removed:
+            self.__space.remove(*space_items(self.__space, removed, remove=True))
+        if added:
+            self.__space.add(*space_items(self.__space, added))
+        return bool(added or removed)
+
+    @property
+    def space(self):
+        """__space getter
+        """
+        return self.__space
+    @property
+    def chunk_size(self):
+        """__chunk_size getter
+        """
+        return self.__chunk_size
+    @property
+    def active_chunks(self):
+        """Keys of the active chunks
+        """
+        return set(self.__active)
+    @property
+    def loaded(self):
+        """Number of obstacles currently in the space
+        """
+        return len(self.__in_space)
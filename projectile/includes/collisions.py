@@ -0,0 +1,255 @@
+"""
+Collision statistics for projectile motion
+
+CollisionStats installs post-solve handlers between projectiles and obstacles / boundary. It counts
+impacts (first contact) and solver calls per obstacle and per projectile, and accumulates impulse
+and kinetic energy lost. Counters live in NumPy arrays indexed by a per-shape slot, and every
+impact is also written to a preallocated ring buffer. Shapes are only weakly referenced: removed
+projectiles and obstacles are freed, their rows of counters stay. Handling a collision allocates nothing on our
+side besides what pymunk builds for the arbiter.
+
+Projectiles hitting each other are not counted.
+
+Example:
+    stats = CollisionStats(space, registry=obstacles)
+    stats.attach()
+    ...  # step the space, calling stats.tick(dt) after each step
+    stats.hud_lines()
+    stats.export("collisions.npz")
+"""
+import csv
+import weakref
+
+import numpy as np
+import pymunk
+
+from projectile.includes.sprites import PROJECTILE_COLLISION_TYPE, OBSTACLE_COLLISION_TYPE, \
+    BOUNDARY_COLLISION_TYPE
+
+_COUNTER_COLUMNS = ("impacts", "solves", "impulse", "ke_loss")
+
+
+def _ignore(arbiter, space, data):
+    pass
+
+
+class _Counters:
+    """Per-shape counters. Arrays grow by doubling when a new shape shows up. Shapes are weakly
+    referenced, so counting a shape does not keep it alive
+    """
+    def __init__(self, capacity: int = 64) -> None:
+        self.slots = weakref.WeakKeyDictionary()
+        # weakref.ref and collision type of the shape of each slot
+        self.shapes = []
+        self.collision_types = []
+        self.impacts = np.zeros(capacity, dtype=np.int64)
+        self.solves = np.zeros(capacity, dtype=np.int64)
+        self.impulse = np.zeros(capacity)
+        self.ke_loss = np.zeros(capacity)
+
+    def slot(self, shape: pymunk.Shape) -> int:
+        slot = self.slots.get(shape)
+        if slot is None:
+            slot = len(self.shapes)
+            if slot == len(self.impacts):
+                for column in _COUNTER_COLUMNS:
+                    array = getattr(self, column)
+                    setattr(self, column, np.concatenate((array, np.zeros_like(array))))
+            self.slots[shape] = slot
+            self.shapes.append(weakref.ref(shape))
+            self.collision_types.append(shape.collision_type)
+        return slot
+
+    def table(self) -> dict:
+        count = len(self.shapes)
+        return {column: getattr(self, column)[:count].copy() for column in _COUNTER_COLUMNS}
+
+    def reset(self):
+        for column in _COUNTER_COLUMNS:
+            getattr(self, column)[:] = 0
+
+
+class CollisionStats:
+    """Opt-in collision counters for a projectile Space
+    """
+    def __init__(self, space: pymunk.Space, capacity: int = 4096, registry=None) -> None:
+        """Initiate collector. Call attach to start collecting
+
+        Args:
+            space (pymunk.Space): Space to watch
+            capacity (int, optional): Impacts kept in the ring buffer. Defaults to 4096.
+            registry (ObstacleRegistry, optional): Used to name obstacles in reports.
+            Defaults to None.
+        """
+        if not isinstance(space, pymunk.Space):
+            raise TypeError("Unexpected type for space. Expected: pymunk.Space")
+        if not isinstance(capacity, int) or capacity < 1:
+            raise ValueError("capacity must be a positive int")
+        self.__space = space
+        self.__registry = registry
+        self.__handlers = []
+        self.__time = 0.0
+        self.__obstacles = _Counters()
+        self.__projectiles = _Counters()
+        self.__capacity = capacity
+        self.__head = 0
+        self.__recorded = 0
+        self.__event_time = np.zeros(capacity)
+        self.__event_obstacle = np.zeros(capacity, dtype=np.int32)
+        self.__event_projectile = np.zeros(capacity, dtype=np.int32)
+        self.__event_impulse = np.zeros(capacity)
+        self.__event_ke_loss = np.zeros(capacity)
+
+    def __post_solve(self, arbiter: pymunk.Arbiter, space: pymunk.Space, data: dict):
+        projectile_shape, obstacle_shape = arbiter.shapes
+        obstacles = self.__obstacles
+        projectiles = self.__projectiles
+        obstacle = obstacles.slot(obstacle_shape)
+        projectile = projectiles.slot(projectile_shape)
+        impulse = arbiter.total_impulse.length
+        ke_loss = arbiter.total_ke
+        obstacles.solves[obstacle] += 1
+        obstacles.impulse[obstacle] += impulse
+        obstacles.ke_loss[obstacle] += ke_loss
+        projectiles.solves[projectile] += 1
+        projectiles.impulse[projectile] += impulse
+        projectiles.ke_loss[projectile] += ke_loss
+        if arbiter.is_first_contact:
+            obstacles.impacts[obstacle] += 1
+            projectiles.impacts[projectile] += 1
+            head = self.__head
+            self.__event_time[head] = self.__time
+            self.__event_obstacle[head] = obstacle
+            self.__event_projectile[head] = projectile
+            self.__event_impulse[head] = impulse
+            self.__event_ke_loss[head] = ke_loss
+            self.__head = (head + 1) % self.__capacity
+            self.__recorded += 1
+
+    def attach(self):
+        """Install the collision handlers
+        """
+        if self.__handlers:
+            return
+        for other in (OBSTACLE_COLLISION_TYPE, BOUNDARY_COLLISION_TYPE):
+            handler = self.__space.add_collision_handler(PROJECTILE_COLLISION_TYPE, other)
+            handler.post_solve = self.__post_solve
+            self.__handlers.append(handler)
+
+    def detach(self):
+        """Stop collecting. Counters are kept
+        """
+        for handler in self.__handlers:
+            handler.post_solve = _ignore
+        self.__handlers = []
+
+    def tick(self, dt: int | float):
+        """Advance the clock used to time stamp impacts
+
+        Args:
+            dt (int | float): Simulated time since last call
+        """
+        self.__time += dt
+
+    def reset(self):
+        """Clear counters and the ring buffer
+        """
+        self.__obstacles.reset()
+        self.__projectiles.reset()
+        self.__head = 0
+        self.__recorded = 0
+
+    def __obstacle_names(self) -> list:
+        names = {}
+        if self.__registry is not None:
+            names = {obstacle.shape: obstacle.name for obstacle in self.__registry}
+        counters = self.__obstacles
+        return [names.get(shape(), f"boundary #{slot}"
+                          if collision_type == BOUNDARY_COLLISION_TYPE else f"#{slot}")
+                for slot, (shape, collision_type)
+                in enumerate(zip(counters.shapes, counters.collision_types))]
+
+    def obstacle_table(self) -> dict:
+        """Per obstacle counters, busiest (most solves) first
+
+        Returns:
+            dict: Arrays "name", "impacts", "solves", "impulse", "ke_loss"
+        """
+        table = self.__obstacles.table()
+        table["name"] = np.array(self.__obstacle_names(), dtype=object)
+        order = np.argsort(-table["solves"], kind="stable")
+        return {column: values[order] for column, values in table.items()}
+
+    def projectile_table(self) -> dict:
+        """Per projectile counters, in order of first collision
+
+        Returns:
+            dict: Arrays "impacts", "solves", "impulse", "ke_loss"
+        """
+        return self.__projectiles.table()
+
+    def events(self) -> dict:
+        """Impacts still held by the ring buffer, oldest first
+
+        Returns:
+            dict: Arrays "time", "obstacle" (name), "projectile" (row of projectile_table),
+            "impulse", "ke_loss"
+        """
+        count = min(self.__recorded, self.__capacity)
+        order = (np.arange(count) + (self.__head - count)) % self.__capacity
+        names = np.array(self.__obstacle_names() or [""], dtype=object)
+        return {"time": self.__event_time[order],
+                "obstacle": names[self.__event_obstacle[order]],
+                "projectile": self.__event_projectile[order],
+                "impulse": self.__event_impulse[order], "ke_loss": self.__event_ke_loss[order]}
+
+    def hud_lines(self, top: int = 5) -> list:
+        """Short text summary for an on-screen overlay
+
+        Args:
+            top (int, optional): Number of obstacles listed. Defaults to 5.
+
+        Returns:
+            list: Lines of text
+        """
+        table = self.obstacle_table()
+        lines = [f"impacts {int(table['impacts'].sum())}  solves {int(table['solves'].sum())}  "
+                 f"KE lost {table['ke_loss'].sum():.0f}"]
+        for index in range(min(top, len(table["name"]))):
+            lines.append(f"{table['name'][index]}: {table['impacts'][index]} hits, "
+                         f"{table['solves'][index]} solves, {table['ke_loss'][index]:.0f} KE")
+        return lines
+
+    def export(self, path: str):
+        """Write the obstacle table, the projectile table and the impact events
+
+        Args:
+            path (str): ".csv" writes the obstacle table only. Anything else writes every
+            table to a NumPy .npz archive
+        """
+        obstacles = self.obstacle_table()
+        if path.endswith(".csv"):
+            columns = ("name",) + _COUNTER_COLUMNS
+            with open(path, "w", newline="", encoding="utf-8") as file:
+                writer = csv.writer(file)
+                writer.writerow(columns)
+                writer.writerows(zip(*(obstacles[column].tolist() for column in columns)))
+            return
+        arrays = {f"obstacle_{column}": values for column, values in obstacles.items()}
+        arrays["obstacle_name"] = arrays["obstacle_name"].astype(str)
+        arrays.update({f"projectile_{column}": values
+                       for column, values in self.projectile_table().items()})
+        arrays.update({f"event_{column}": values for column, values in self.events().items()})
+        arrays["event_obstacle"] = arrays["event_obstacle"].astype(str)
+        np.savez_compressed(path, **arrays)
+
+    @property
+    def time(self):
+        """Simulated time seen by tick
+        """
+        return self.__time
+    @property
+    def impacts(self):
+        """Total number of recorded impacts, including those overwritten in the ring buffer
+        """
+        return self.__recorded
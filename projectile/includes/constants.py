@@ -8,4 +8,8 @@ HEIGHT = SIZE[1]
 FPS = 60
 G_HORIZONTAL, G_VERTICAL = 0, 900
 GRAY = "#dcdcdc"
-RED = "#ff0000"
\ No newline at end of file
+RED = "#ff0000"
+DT = 0.01
+SLEEP_TIME_THRESHOLD = 0.5
+PROJECTILE_TTL = 15
+MIN_TIME_SCALE, MAX_TIME_SCALE = 0.125, 8
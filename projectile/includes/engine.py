@@ -0,0 +1,242 @@
+"""
+Headless engine for projectile motion
+
+Build the same pymunk scene as ProjectileMain (Boundary, Projectile, StaticObstacle) without
+opening a pygame window, step it as fast as the CPU allows and collect trajectories as NumPy
+arrays.
+
+Example:
+    engine = ProjectileEngine()
+    engine.add_obstacle("wall", (600, 400), "Rectangle", multiplier=5)
+    engine.add_projectile((100, 100), impulse=(30000, -20000))
+    result = engine.run(2.0)
+    result["position"]  # shape: (samples, projectiles, 2)
+"""
+import math
+
+import numpy as np
+
+from projectile.includes.space import create_space
+from projectile.includes.sprites import Projectile, Boundary, StaticObstacle
+from projectile.includes.registry import ObstacleRegistry
+from projectile.includes.chunks import ChunkedWorld
+from projectile.includes.aero import Aerodynamics
+from projectile.includes.state import BodyState
+from projectile.includes.scene import read_scene, validate_scene, load_scene
+try:
+    from projectile.includes.constants import SIZE, DT, G_HORIZONTAL, G_VERTICAL
+except ImportError:
+    SIZE = (1200, 600)
+    DT = 0.01
+    G_HORIZONTAL, G_VERTICAL = 0, 900
+
+
+class ProjectileEngine:
+    """Headless projectile simulation. Does not require a display
+    """
+    def __init__(self, gravity: tuple | list = (G_HORIZONTAL, G_VERTICAL),
+                 origin: tuple | list = (0, 0), size: tuple | list | None = SIZE,
+                 dt: int | float = DT, chunk_size: int | float | None = None,
+                 aero: Aerodynamics | None = None, **space_options) -> None:
+        """Initiate engine
+
+        Args:
+            gravity (tuple | list, optional): Space gravity. Defaults to (G_HORIZONTAL, G_VERTICAL).
+            origin (tuple | list, optional): Boundary origin. Defaults to (0, 0).
+            size (tuple | list | None, optional): Boundary size. None for no boundary.
+            Defaults to SIZE.
+            dt (int | float, optional): Physics step size in seconds. Defaults to DT.
+            chunk_size (int | float | None, optional): Stream obstacles in and out of the space
+            in chunks of this size around the projectiles (see ChunkedWorld). Meant for large
+            worlds without boundary. None keeps every obstacle in the space. Defaults to None.
+            aero (Aerodynamics | None, optional): Drag and wind applied before every step.
+            Defaults to None.
+            **space_options: Solver settings passed to create_space (threaded, threads,
+            iterations, collision_slop, sleep_time_threshold, spatial_hash...)
+        """
+        if not isinstance(gravity, tuple | list) or len(gravity) != 2:
+            raise TypeError("Unexpected type for gravity. Expected: tuple, list of 2 elements")
+        if not isinstance(dt, int | float):
+            raise TypeError("Unexpected type for dt. Expected: int, float")
+        if dt <= 0:
+            raise ValueError("dt must be greater than 0")
+        self.__space = create_space(gravity, **space_options)
+        self.__dt = dt
+        self.__time = 0.0
+        self.__projectiles = []
+        self.__aero = aero
+        self.__world = None
+        if chunk_size is not None:
+            self.__world = ChunkedWorld(self.__space, chunk_size)
+        self.__obstacles = ObstacleRegistry(self.__space, self.__world)
+        self.__boundary = None
+
+        if size is not None:
+            self.__boundary = Boundary(self.__space.static_body, origin, size)
+            self.__space.add(*self.__boundary.segments)
+
+    @classmethod
+    def from_scene(cls, scene: dict | str, dt: int | float = DT, **space_options):
+        """Create an engine with the gravity, boundary and obstacles of a scene
+
+        Args:
+            scene (dict | str): Scene dict or scene file (see projectile.includes.scene)
+            dt (int | float, optional): Physics step size in seconds. Defaults to DT.
+            **space_options: Solver settings passed to create_space
+
+        Returns:
+            ProjectileEngine: Engine with the scene loaded
+        """
+        scene = read_scene(scene) if isinstance(scene, str) else validate_scene(scene)
+        boundary = scene["boundary"]
+        if boundary is None:
+            engine = cls(scene["gravity"], size=None, dt=dt, **space_options)
+        else:
+            engine = cls(scene["gravity"], boundary["origin"], boundary["size"], dt,
+                         **space_options)
+        load_scene(scene, engine.obstacles)
+        return engine
+
+    def add_projectile(self, pos: tuple | list = (0, 0), radius: int = 25,
+                       impulse: tuple | list | None = None) -> Projectile:
+        """Create a projectile and add it to the space
+
+        Args:
+            pos (tuple | list, optional): Spawn position. Defaults to (0, 0).
+            radius (int, optional): Projectile radius. Defaults to 25.
+            impulse (tuple | list | None, optional): Launch impulse in world coordinates.
+
+        Returns:
+            Projectile: The created projectile
+        """
+        projectile = Projectile(pos, radius)
+        self.__space.add(projectile.body, projectile.shape)
+        if impulse is not None:
+            projectile.body.apply_impulse_at_local_point(impulse)
+        self.__projectiles.append(projectile)
+        return projectile
+
+    def add_obstacle(self, name: str, pos: tuple | list, shape: str | int = "Circle",
+                     tags: tuple | list = (), **kwargs) -> StaticObstacle:
+        """Create a static obstacle and add it to the space
+
+        Args:
+            name (str): Obstacle name
+            pos (tuple | list): Obstacle position
+            shape (str | int, optional): Shape name. Defaults to "Circle".
+            tags (tuple | list, optional): Registry tags. Defaults to ().
+            **kwargs: Passed to StaticObstacle. The shape is attached to the space's static body
+            unless body is given.
+
+        Returns:
+            StaticObstacle: The created obstacle
+        """
+        kwargs.setdefault("body", self.__space.static_body)
+        obstacle = StaticObstacle(name, pos, shape, **kwargs)
+        self.__obstacles.add(obstacle, tags)
+        return obstacle
+
+    def step(self, steps: int = 1):
+        """Advance the simulation
+
+        Args:
+            steps (int, optional): Number of fixed steps. Defaults to 1.
+        """
+        step = self.__space.step
+        dt = self.__dt
+        world = self.__world
+        aero = self.__aero
+        for index in range(steps):
+            if world is not None:
+                world.update(points=[projectile.body.position
+                                     for projectile in self.__projectiles])
+            if aero is not None:
+                aero.apply(self.__space, self.__time + index * dt)
+            step(dt)
+        self.__time += steps * dt
+
+    def run(self, duration: int | float, sample_every: int = 1) -> dict:
+        """Step the simulation for a simulated duration and record every projectile
+
+        Args:
+            duration (int | float): Simulated time in seconds
+            sample_every (int, optional): Record one sample every N steps. Defaults to 1.
+
+        Returns:
+            dict: NumPy arrays
+                \t- "time": (samples,)
+                \t- "position": (samples, projectiles, 2)
+                \t- "velocity": (samples, projectiles, 2)
+                \t- "angle": (samples, projectiles)
+
+            Sample 0 is the state before the first step. The last sample is the state at
+            duration, even when fewer than sample_every steps are left before it.
+        """
+        if not isinstance(sample_every, int) or sample_every < 1:
+            raise ValueError("sample_every must be a positive int")
+        total_steps = int(math.ceil(duration / self.__dt - 1e-9))
+        samples = -(-total_steps // sample_every) + 1
+        bodies = [projectile.body for projectile in self.__projectiles]
+        count = len(bodies)
+        state = BodyState(fields=("position", "velocity", "angle"), capacity=max(count, 1))
+
+        time = np.empty(samples)
+        position = np.empty((samples, count, 2))
+        velocity = np.empty((samples, count, 2))
+        angle = np.empty((samples, count))
+
+        done = 0
+        for sample in range(samples):
+            if sample:
+                steps = min(sample_every, total_steps - done)
+                self.step(steps)
+                done += steps
+            time[sample] = self.__time
+            if count:
+                state.update(bodies)
+                position[sample] = state.positions
+                velocity[sample] = state.velocities
+                angle[sample] = state.angles
+
+        return {"time": time, "position": position, "velocity": velocity, "angle": angle}
+
+    @property
+    def space(self):
+        """__space getter
+        """
+        return self.__space
+    @property
+    def projectiles(self):
+        """__projectiles getter
+        """
+        return self.__projectiles
+    @property
+    def obstacles(self):
+        """__obstacles getter (ObstacleRegistry)
+        """
+        return self.__obstacles
+    @property
+    def aero(self):
+        """__aero getter (Aerodynamics or None)
+        """
+        return self.__aero
+    @property
+    def world(self):
+        """__world getter (ChunkedWorld or None)
+        """
+        return self.__world
+    @property
+    def boundary(self):
+        """__boundary getter
+        """
+        return self.__boundary
+    @property
+    def dt(self):
+        """__dt getter
+        """
+        return self.__dt
+    @property
+    def time(self):
+        """Simulated time in seconds
+        """
+        return self.__time
@@ -0,0 +1,52 @@
+"""
+Render interpolation for projectile motion
+
+Physics runs on fixed steps, rendering does not. capture_poses stores body poses before the last
+step of a frame, interpolated_poses temporarily moves bodies between that pose and the current
+one while drawing, then puts them back so the physics state is untouched.
+"""
+from contextlib import contextmanager
+
+import pymunk
+
+
+def capture_poses(space: pymunk.Space) -> list:
+    """Capture position and angle of every dynamic body
+
+    Args:
+        space (pymunk.Space): Space to capture
+
+    Returns:
+        list: A list of (body, position, angle)
+    """
+    return [(body, body.position, body.angle) for body in space.bodies
+            if body.body_type == pymunk.Body.DYNAMIC]
+
+
+@contextmanager
+def interpolated_poses(poses: list, alpha: int | float):
+    """Move captured bodies to `previous + (current - previous) * alpha` inside a with block
+
+    Args:
+        poses (list): Output of capture_poses
+        alpha (int | float): Interpolation factor in [0, 1]
+    """
+    current = []
+    if 0 <= alpha < 1:
+        for body, position, angle in poses:
+            now_position, now_angle = body.position, body.angle
+            if now_position == position and now_angle == angle:
+                continue
+            current.append((body, now_position, now_angle))
+            body.position = position + (now_position - position) * alpha
+            body.angle = angle + (now_angle - angle) * alpha
+            for shape in body.shapes:
+                shape.cache_bb()
+    try:
+        yield
+    finally:
+        for body, position, angle in current:
+            body.position = position
+            body.angle = angle
+            for shape in body.shapes:
+                shape.cache_bb()
@@ -0,0 +1,200 @@
+"""
+Projectile pool for projectile motion
+
+Reuse Projectile instances instead of allocating a new Body and Circle for every spawn, and
+despawn projectiles that left the boundary or stayed idle for longer than a time to live. Resting
+bodies are put to sleep by the space itself (see create_space's sleep_time_threshold); sleeping
+bodies count as idle.
+"""
+import pymunk
+
+from projectile.includes.sprites import Projectile
+
+
+class ProjectilePool:
+    """Pool of Projectile living in a pymunk Space
+    """
+    def __init__(self, space: pymunk.Space, bounds: tuple | list | None = None,
+                 ttl: int | float | None = 15, idle_speed: int | float = 5,
+                 capacity: int | None = None, max_free: int = 256,
+                 check_interval: int | float = 0.25) -> None:
+        """Initiate pool
+
+        Args:
+            space (pymunk.Space): Space projectiles are added to
+            bounds (tuple | list | None, optional): ((x0, y0), (x1, y1)). Projectiles whose
+            center leaves this box are despawned. None to disable. Defaults to None.
+            ttl (int | float | None, optional): Seconds a projectile may stay idle before it is
+            despawned. None to disable. Defaults to 15.
+            idle_speed (int | float, optional): Speed under which a projectile is idle.
+            Defaults to 5.
+            capacity (int | None, optional): Max active projectiles. Acquiring past it
+            despawns the oldest one. Defaults to None (no limit).
+            max_free (int, optional): Max released projectiles kept for reuse. Defaults to 256.
+            check_interval (int | float, optional): Simulated seconds between despawn checks.
+            Defaults to 0.25.
+        """
+        if not isinstance(space, pymunk.Space):
+            raise TypeError("Unexpected type for space. Expected: pymunk.Space")
+        if bounds is not None and (not isinstance(bounds, tuple | list) or len(bounds) != 2):
+            raise TypeError("Unexpected type for bounds. Expected: ((x0, y0), (x1, y1)), None")
+        if capacity is not None and (not isinstance(capacity, int) or capacity < 1):
+            raise ValueError("capacity must be a positive int or None")
+        self.__space = space
+        self.__bounds = bounds
+        self.__ttl = ttl
+        self.__idle_speed_sq = idle_speed * idle_speed
+        self.__capacity = capacity
+        self.__max_free = max_free
+        self.__check_interval = check_interval
+        self.__since_check = 0.0
+        # Insertion ordered: oldest first. body -> [projectile, idle time]
+        self.__active = {}
+        self.__free = []
+
+    def __len__(self):
+        return len(self.__active)
+
+    def __contains__(self, projectile):
+        return self.__body_of(projectile) in self.__active
+
+    def __iter__(self):
+        return (entry[0] for entry in self.__active.values())
+
+    @staticmethod
+    def __body_of(projectile) -> pymunk.Body:
+        if isinstance(projectile, Projectile):
+            return projectile.body
+        return projectile
+
+    def acquire(self, pos: tuple | list, radius: int = 20) -> Projectile:
+        """Spawn a projectile, reusing a released one when possible
+
+        Args:
+            pos (tuple | list): Spawn position
+            radius (int, optional): Projectile radius. Defaults to 20.
+
+        Returns:
+            Projectile: Spawned projectile
+        """
+        if self.__capacity is not None and len(self.__active) >= self.__capacity:
+            self.release(next(iter(self.__active)))
+        if self.__free:
+            projectile = self.__free.pop()
+            body, shape = projectile.body, projectile.shape
+            if shape.radius != radius:
+                # Resizing keeps the mass; set density again so mass follows the new radius
+                density = shape.density
+                shape.unsafe_set_radius(radius)
+                shape.density = density
+            body.position = pos
+            body.velocity = (0, 0)
+            body.angular_velocity = 0
+            body.angle = 0
+            body.force = (0, 0)
+            body.torque = 0
+        else:
+            projectile = Projectile(pos, radius)
+        self.__space.add(projectile.body, projectile.shape)
+        self.__active[projectile.body] = [projectile, 0.0]
+        return projectile
+
+    def release(self, projectile: Projectile | pymunk.Body) -> bool:
+        """Remove a projectile from the space and keep it for reuse
+
+        Args:
+            projectile (Projectile | pymunk.Body): Projectile, or its body
+
+        Returns:
+            bool: False if the projectile is not active in this pool
+        """
+        return bool(self.release_many((projectile,)))
+
+    def release_many(self, projectiles) -> list:
+        """Release several projectiles with one space.remove call
+
+        Args:
+            projectiles (Iterable[Projectile | pymunk.Body]): Projectiles, or their bodies
+
+        Returns:
+            list: Released projectiles
+        """
+        released = []
+        items = []
+        for projectile in projectiles:
+            entry = self.__active.pop(self.__body_of(projectile), None)
+            if entry is None:
+                continue
+            released.append(entry[0])
+            items.extend((entry[0].body, entry[0].shape))
+        if items:
+            self.__space.remove(*items)
+        room = self.__max_free - len(self.__free)
+        if room > 0:
+            self.__free.extend(released[:room])
+        return released
+
+    def clear(self) -> list:
+        """Release every active projectile
+
+        Returns:
+            list: Released projectiles
+        """
+        return self.release_many(list(self.__active))
+
+    def update(self, dt: int | float) -> list:
+        """Advance idle timers and despawn projectiles out of bounds or idle past ttl
+
+        Checks only run every check_interval of simulated time.
+
+        Args:
+            dt (int | float): Simulated time since last update
+
+        Returns:
+            list: Despawned projectiles
+        """
+        self.__since_check += dt
+        if self.__since_check < self.__check_interval:
+            return []
+        elapsed, self.__since_check = self.__since_check, 0.0
+
+        expired = []
+        bounds = self.__bounds
+        ttl = self.__ttl
+        idle_speed_sq = self.__idle_speed_sq
+        for body, entry in self.__active.items():
+            if bounds is not None:
+                x, y = body.position
+                if not (bounds[0][0] <= x <= bounds[1][0] and bounds[0][1] <= y <= bounds[1][1]):
+                    expired.append(body)
+                    continue
+            if ttl is None:
+                continue
+            if body.is_sleeping or body.velocity.get_length_sqrd() < idle_speed_sq:
+                entry[1] += elapsed
+                if entry[1] >= ttl:
+                    expired.append(body)
+            else:
+                entry[1] = 0.0
+        return self.release_many(expired)
+
+    def touch(self, projectile: Projectile | pymunk.Body):
+        """Reset the idle timer of a projectile, e.g. when the user grabs it
+
+        Args:
+            projectile (Projectile | pymunk.Body): Projectile, or its body
+        """
+        entry = self.__active.get(self.__body_of(projectile))
+        if entry is not None:
+            entry[1] = 0.0
+
+    @property
+    def active(self):
+        """Active projectiles, oldest first
+        """
+        return [entry[0] for entry in self.__active.values()]
+    @property
+    def free(self):
+        """Number of released projectiles kept for reuse
+        """
+        return len(self.__free)
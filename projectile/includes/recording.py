@@ -0,0 +1,316 @@
+"""
+Recording and replay for projectile motion
+
+Recorder captures the state of every dynamic body (id, radius, position, angle, velocity) after
+each physics step and writes it in chunks. A chunk stores its steps as a struct of arrays and is
+optionally zlib compressed. Each chunk starts a keyframe: it can be decoded on its own, and the
+index written at the end of the file maps steps to chunks.
+
+Replay reads that file through mmap without running physics. Uncompressed chunks are returned as
+zero-copy views into the mapped file.
+
+File layout (little-endian):
+    header      _HEADER: magic, version, flags, dt
+    chunks      _CHUNK header, then ids, radii, time, position, angle, velocity
+    index       _INDEX_ENTRY per chunk: offset, first step, steps, bodies
+    footer      _FOOTER: index offset, chunk count, magic
+
+CLI:
+    python -m projectile.includes.recording session.pmsrec
+"""
+import argparse
+import mmap
+import struct
+import zlib
+
+import numpy as np
+import pymunk
+
+from projectile.includes.state import BodyState
+
+_MAGIC = b"PMSREC\x00\x00"
+_INDEX_MAGIC = b"PMSIDX\x00\x00"
+_VERSION = 1
+_COMPRESSED = 0b1
+_HEADER = struct.Struct("<8sHHd")
+_CHUNK = struct.Struct("<QIIQQ")  # first step, steps, bodies, stored size, raw size
+_FOOTER = struct.Struct("<QQ8s")  # index offset, chunk count, magic
+_INDEX_ENTRY = np.dtype([("offset", "<u8"), ("first_step", "<u8"),
+                         ("steps", "<u4"), ("bodies", "<u4")])
+
+
+def _chunk_arrays(buffer, steps: int, bodies: int) -> dict:
+    """Split a raw chunk payload into arrays. No copy
+    """
+    layout = (("ids", "<i8", (bodies,)), ("radius", "<f4", (bodies,)),
+              ("time", "<f8", (steps,)), ("position", "<f4", (steps, bodies, 2)),
+              ("angle", "<f4", (steps, bodies)), ("velocity", "<f4", (steps, bodies, 2)))
+    arrays = {}
+    offset = 0
+    for name, dtype, shape in layout:
+        count = int(np.prod(shape))
+        arrays[name] = np.frombuffer(buffer, dtype, count, offset).reshape(shape)
+        offset += count * np.dtype(dtype).itemsize
+    return arrays
+
+
+class Recorder:
+    """Write per-step body state of a pymunk Space to a file
+    """
+    def __init__(self, path: str, dt: int | float, chunk_steps: int = 256,
+                 compress: bool = True, level: int = 1) -> None:
+        """Initiate recorder
+
+        Args:
+            path (str): Output file
+            dt (int | float): Physics step size, stored in the header
+            chunk_steps (int, optional): Steps per chunk (keyframe interval). Defaults to 256.
+            compress (bool, optional): zlib compress chunks. Defaults to True.
+            level (int, optional): zlib level. Defaults to 1.
+        """
+        if not isinstance(chunk_steps, int) or chunk_steps < 1:
+            raise ValueError("chunk_steps must be a positive int")
+        self.__file = open(path, "wb")
+        self.__file.write(_HEADER.pack(_MAGIC, _VERSION, _COMPRESSED if compress else 0, dt))
+        self.__chunk_steps = chunk_steps
+        self.__compress = compress
+        self.__level = level
+        self.__state = BodyState(fields=("position", "velocity", "angle", "radius"))
+        self.__index = []
+        self.__step = 0
+        self.__bodies = None
+        self.__filled = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __new_chunk(self):
+        self.flush()
+        state = self.__state
+        count = len(state)
+        steps = self.__chunk_steps
+        self.__bodies = state.bodies
+        self.__chunk_ids = state.ids.astype("<i8")
+        self.__radius = state.radii.astype("<f4")
+        self.__time = np.empty(steps, dtype="<f8")
+        self.__position = np.empty((steps, count, 2), dtype="<f4")
+        self.__angle = np.empty((steps, count), dtype="<f4")
+        self.__velocity = np.empty((steps, count, 2), dtype="<f4")
+        self.__first_step = self.__step
+        self.__filled = 0
+
+    def capture(self, space: pymunk.Space, time: int | float):
+        """Record the current state of every dynamic body
+
+        A new chunk is started when the chunk is full or the set of bodies changed.
+
+        Args:
+            space (pymunk.Space): Space to record
+            time (int | float): Simulated time of this state
+        """
+        state = self.__state
+        state.update(space)
+        if self.__bodies is None or self.__filled == self.__chunk_steps or state.changed:
+            self.__new_chunk()
+        row = self.__filled
+        self.__time[row] = time
+        if len(state):
+            self.__position[row] = state.positions
+            self.__angle[row] = state.angles
+            self.__velocity[row] = state.velocities
+        self.__filled += 1
+        self.__step += 1
+
+    def flush(self):
+        """Write the current chunk, if any
+        """
+        steps = self.__filled
+        if not steps:
+            return
+        payload = b"".join((self.__chunk_ids.tobytes(), self.__radius.tobytes(),
+                            self.__time[:steps].tobytes(), self.__position[:steps].tobytes(),
+                            self.__angle[:steps].tobytes(), self.__velocity[:steps].tobytes()))
+        stored = zlib.compress(payload, self.__level) if self.__compress else payload
+        offset = self.__file.tell()
+        self.__file.write(_CHUNK.pack(self.__first_step, steps, len(self.__chunk_ids),
+                                      len(stored), len(payload)))
+        self.__file.write(stored)
+        self.__index.append((offset, self.__first_step, steps, len(self.__chunk_ids)))
+        self.__filled = 0
+        self.__first_step = self.__step
+
+    def close(self):
+        """Flush, write the index and close the file
+        """
+        if self.__file.closed:
+            return
+        self.flush()
+        index_offset = self.__file.tell()
+        self.__file.write(np.array(self.__index, dtype=_INDEX_ENTRY).tobytes())
+        self.__file.write(_FOOTER.pack(index_offset, len(self.__index), _INDEX_MAGIC))
+        self.__file.close()
+
+    @property
+    def steps(self):
+        """Number of captured steps
+        """
+        return self.__step
+
+
+class Replay:
+    """Read a Recorder file through mmap
+    """
+    def __init__(self, path: str) -> None:
+        """Open a recording
+
+        Args:
+            path (str): Recording file
+        """
+        self.__file = open(path, "rb")
+        self.__map = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, flags, self.__dt = _HEADER.unpack_from(self.__map, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"Not a projectile recording: {path}")
+        if version != _VERSION:
+            raise ValueError(f"Unsupported recording version: {version}")
+        self.__compressed = bool(flags & _COMPRESSED)
+        index_offset, chunk_count, index_magic = _FOOTER.unpack_from(
+            self.__map, len(self.__map) - _FOOTER.size)
+        if index_magic != _INDEX_MAGIC:
+            raise ValueError("Recording index is missing. Was the recorder closed?")
+        self.__index = np.frombuffer(self.__map, _INDEX_ENTRY, chunk_count, index_offset).copy()
+        self.__cached = (None, None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        if not len(self.__index):
+            return 0
+        return int(self.__index["first_step"][-1] + self.__index["steps"][-1])
+
+    def __iter__(self):
+        for step in range(len(self)):
+            yield self.frame(step)
+
+    def chunk(self, number: int) -> dict:
+        """Decode a whole chunk
+
+        Args:
+            number (int): Chunk number
+
+        Returns:
+            dict: "first_step" and the arrays "ids", "radius", "time", "position", "angle",
+            "velocity" (step axis first)
+        """
+        if self.__cached[0] == number:
+            return self.__cached[1]
+        entry = self.__index[number]
+        first_step, steps, bodies, stored, _ = _CHUNK.unpack_from(self.__map, int(entry["offset"]))
+        start = int(entry["offset"]) + _CHUNK.size
+        if self.__compressed:
+            payload = zlib.decompress(self.__map[start:start + stored])
+        else:
+            payload = memoryview(self.__map)[start:start + stored]
+        chunk = _chunk_arrays(payload, steps, bodies)
+        chunk["first_step"] = first_step
+        self.__cached = (number, chunk)
+        return chunk
+
+    def seek(self, step: int) -> tuple:
+        """Find the chunk holding a step
+
+        Args:
+            step (int): Step number
+
+        Returns:
+            tuple: (chunk number, row in chunk)
+        """
+        if not 0 <= step < len(self):
+            raise IndexError(f"step out of range: {step}")
+        number = int(np.searchsorted(self.__index["first_step"], step, side="right")) - 1
+        return number, step - int(self.__index["first_step"][number])
+
+    def frame(self, step: int) -> dict:
+        """State of every recorded body at a step
+
+        Args:
+            step (int): Step number
+
+        Returns:
+            dict: "ids", "radius" (bodies,), "time" (scalar), "position" (bodies, 2),
+            "angle" (bodies,), "velocity" (bodies, 2)
+        """
+        number, row = self.seek(step)
+        chunk = self.chunk(number)
+        return {"ids": chunk["ids"], "radius": chunk["radius"], "time": chunk["time"][row],
+                "position": chunk["position"][row], "angle": chunk["angle"][row],
+                "velocity": chunk["velocity"][row]}
+
+    def close(self):
+        """Close the mapping and the file
+        """
+        self.__cached = (None, None)
+        try:
+            self.__map.close()
+        except BufferError:
+            # Frames of uncompressed chunks still reference the mapping; it is unmapped once
+            # they are garbage collected
+            pass
+        self.__file.close()
+
+    @property
+    def dt(self):
+        """Physics step size of the recording
+        """
+        return self.__dt
+    @property
+    def keyframes(self):
+        """First step of every chunk
+        """
+        return self.__index["first_step"]
+
+
+def main():
+    import pygame
+    from projectile.includes.renderer import SpaceRenderer
+    try:
+        from projectile.includes.constants import SIZE, GRAY
+    except ImportError:
+        SIZE = (1200, 600)
+        GRAY = "#dcdcdc"
+
+    parser = argparse.ArgumentParser(description="Play a projectile recording")
+    parser.add_argument("path")
+    parser.add_argument("--speed", type=float, default=1, help="Steps shown per frame")
+    parser.add_argument("--fps", type=int, default=60)
+    args = parser.parse_args()
+
+    pygame.init()
+    screen = pygame.display.set_mode(SIZE)
+    pygame.display.set_caption("Projectile Motion Replay")
+    clock = pygame.time.Clock()
+    renderer = SpaceRenderer(screen)
+    with Replay(args.path) as replay:
+        position = 0.0
+        while position < len(replay):
+            if pygame.event.peek(pygame.QUIT):
+                break
+            pygame.event.pump()
+            frame = replay.frame(int(position))
+            screen.fill(GRAY)
+            renderer.draw_circles(frame["position"], frame["angle"], frame["radius"])
+            pygame.display.flip()
+            clock.tick(args.fps)
+            position += args.speed
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Obstacle registry for projectile motion
+
+Keep StaticObstacle objects indexed by name (and optional tags) and keep the pymunk space in sync
+with them. Every operation, single or bulk, ends with at most one space.add / space.remove call.
+With a ChunkedWorld, obstacles are handed to the world instead, which only puts the ones in
+active chunks in the space.
+"""
+from fnmatch import fnmatchcase
+from typing import Iterable
+
+import pymunk
+
+from projectile.includes.sprites import StaticObstacle, space_items
+
+
+class ObstacleRegistry:
+    """Name-indexed collection of StaticObstacle living in a pymunk Space
+    """
+    def __init__(self, space: pymunk.Space, world=None) -> None:
+        """Initiate registry
+
+        Args:
+            space (pymunk.Space): Space the obstacles are added to / removed from
+            world (ChunkedWorld, optional): Chunked world managing space membership.
+            Defaults to None.
+        """
+        if not isinstance(space, pymunk.Space):
+            raise TypeError("Unexpected type for space. Expected: pymunk.Space")
+        if world is not None and world.space is not space:
+            raise ValueError("world must use the same space")
+        self.__space = space
+        self.__world = world
+        self.__obstacles = {}
+        self.__tags = {}
+        self.__tags_by_name = {}
+
+    def __len__(self):
+        return len(self.__obstacles)
+
+    def __contains__(self, name):
+        return name in self.__obstacles
+
+    def __iter__(self):
+        return iter(self.__obstacles.values())
+
+    def get(self, name: str, default=None) -> StaticObstacle | None:
+        """Get obstacle by name
+
+        Args:
+            name (str): Obstacle name
+            default (Any, optional): Returned if name is not registered. Defaults to None.
+        """
+        return self.__obstacles.get(name, default)
+
+    def tagged(self, tag: str) -> list:
+        """Get every obstacle carrying a tag
+
+        Args:
+            tag (str): Tag name
+
+        Returns:
+            list: Obstacles with this tag
+        """
+        return [self.__obstacles[name] for name in self.__tags.get(tag, ())]
+
+    def add(self, obstacle: StaticObstacle, tags: Iterable[str] = ()):
+        """Register an obstacle and add it to the space
+
+        Args:
+            obstacle (StaticObstacle): Obstacle to add
+            tags (Iterable[str], optional): Tags for this obstacle. Defaults to ().
+        """
+        self.add_many((obstacle,), tags)
+
+    def add_many(self, obstacles: Iterable[StaticObstacle], tags: Iterable[str] = (),
+                 tags_by_name: dict | None = None):
+        """Register obstacles and add all of them to the space in one call
+
+        Args:
+            obstacles (Iterable[StaticObstacle]): Obstacles to add
+            tags (Iterable[str], optional): Tags given to every obstacle. Defaults to ().
+            tags_by_name (dict | None, optional): Extra tags per obstacle name
+            ({name: Iterable[str]}). Defaults to None.
+
+        Raises:
+            ValueError: A name is already registered or repeated. Nothing is added.
+        """
+        obstacles = list(obstacles)
+        tags = frozenset(tags)
+        names = set()
+        for obstacle in obstacles:
+            if not isinstance(obstacle, StaticObstacle):
+                raise TypeError("Unexpected type for obstacle. Expected: StaticObstacle")
+            if obstacle.name in self.__obstacles or obstacle.name in names:
+                raise ValueError(f"Obstacle name already exists: {obstacle.name}")
+            names.add(obstacle.name)
+        if not obstacles:
+            return
+
+        for obstacle in obstacles:
+            self.__obstacles[obstacle.name] = obstacle
+            obstacle_tags = tags
+            if tags_by_name and obstacle.name in tags_by_name:
+                obstacle_tags = tags.union(tags_by_name[obstacle.name])
+            if obstacle_tags:
+                self.__tags_by_name[obstacle.name] = obstacle_tags
+                for tag in obstacle_tags:
+                    self.__tags.setdefault(tag, set()).add(obstacle.name)
+        if self.__world is not None:
+            self.__world.add_many(obstacles)
+        else:
+            self.__space.add(*space_items(self.__space, obstacles))
+
+    def remove(self, name: str) -> StaticObstacle:
+        """Remove an obstacle by name
+
+        Args:
+            name (str): Obstacle name
+
+        Raises:
+            KeyError: Name is not registered
+
+        Returns:
+            StaticObstacle: Removed obstacle
+        """
+        if name not in self.__obstacles:
+            raise KeyError(name)
+        return self.remove_many((name,))[0]
+
+    def remove_many(self, names: Iterable[str]) -> list:
+        """Remove obstacles by name in one space.remove call. Unknown names are ignored
+
+        Args:
+            names (Iterable[str]): Obstacle names
+
+        Returns:
+            list: Removed obstacles
+        """
+        removed = []
+        for name in set(names):
+            obstacle = self.__obstacles.pop(name, None)
+            if obstacle is None:
+                continue
+            for tag in self.__tags_by_name.pop(name, ()):
+                self.__tags[tag].discard(name)
+                if not self.__tags[tag]:
+                    del self.__tags[tag]
+            removed.append(obstacle)
+        if self.__world is not None:
+            self.__world.remove_many(removed)
+        elif removed:
+            self.__space.remove(*space_items(self.__space, removed, remove=True))
+        return removed
+
+    def remove_glob(self, pattern: str) -> list:
+        """Remove every obstacle whose name matches a glob pattern (`*`, `?`, `[seq]`)
+
+        Args:
+            pattern (str): Glob pattern. Case-sensitive.
+
+        Returns:
+            list: Removed obstacles
+        """
+        return self.remove_many([name for name in self.__obstacles
+                                 if fnmatchcase(name, pattern)])
+
+    def remove_prefix(self, prefix: str) -> list:
+        """Remove every obstacle whose name starts with prefix
+
+        Args:
+            prefix (str): Name prefix
+
+        Returns:
+            list: Removed obstacles
+        """
+        return self.remove_many([name for name in self.__obstacles if name.startswith(prefix)])
+
+    def remove_tag(self, tag: str) -> list:
+        """Remove every obstacle carrying a tag
+
+        Args:
+            tag (str): Tag name
+
+        Returns:
+            list: Removed obstacles
+        """
+        return self.remove_many(list(self.__tags.get(tag, ())))
+
+    def clear(self) -> list:
+        """Remove every obstacle
+
+        Returns:
+            list: Removed obstacles
+        """
+        return self.remove_many(list(self.__obstacles))
+
+    @property
+    def space(self):
+        """__space getter
+        """
+        return self.__space
+    @property
+    def world(self):
+        """__world getter (ChunkedWorld or None)
+        """
+        return self.__world
+    @property
+    def names(self):
+        """Registered names, in insertion order
+        """
+        return list(self.__obstacles)
@@ -0,0 +1,205 @@
+"""
+Batched renderer for projectile motion
+
+Replacement for space.debug_draw. Dynamic circles are gathered into NumPy arrays, transformed and
+culled against the viewport in one go, then drawn by blitting pre-rendered sprites. Static shapes
+(boundary, obstacles) are drawn once onto their own surface, which is only redrawn when the camera
+transform changes or invalidate_static is called. Only static shapes on screen are drawn.
+"""
+import math
+
+import numpy as np
+import pygame
+import pymunk
+
+from projectile.includes.camera import inverse_transform
+from projectile.includes.state import BodyState
+
+_STATIC_COLOR = (149, 165, 166, 255)
+_DYNAMIC_COLOR = (52, 152, 219, 255)
+_SLEEPING_COLOR = (114, 148, 168, 255)
+_OUTLINE_COLOR = (44, 62, 80, 255)
+_COLOR_KEY = (255, 0, 255)
+_ALL_SHAPES = pymunk.ShapeFilter()
+
+
+def transform_points(transform: pymunk.Transform, points: np.ndarray) -> np.ndarray:
+    """Apply a pymunk.Transform to an array of points
+
+    Args:
+        transform (pymunk.Transform): Transform to apply
+        points (np.ndarray): (N, 2) array of points
+
+    Returns:
+        np.ndarray: (N, 2) array of transformed points
+    """
+    a, b, c, d, tx, ty = transform
+    return points @ np.array(((a, b), (c, d))) + (tx, ty)
+
+
+class SpaceRenderer:
+    """Draw a pymunk Space on a pygame Surface
+    """
+    def __init__(self, surface: pygame.Surface, static_color: tuple = _STATIC_COLOR,
+                 dynamic_color: tuple = _DYNAMIC_COLOR, sleeping_color: tuple = _SLEEPING_COLOR,
+                 outline_color: tuple = _OUTLINE_COLOR) -> None:
+        """Initiate renderer
+
+        Args:
+            surface (pygame.Surface): Surface to draw on
+            static_color (tuple, optional): Static shapes color
+            dynamic_color (tuple, optional): Dynamic shapes color
+            sleeping_color (tuple, optional): Sleeping bodies color
+            outline_color (tuple, optional): Outline and rotation indicator color
+        """
+        if not isinstance(surface, pygame.Surface):
+            raise TypeError("Unexpected type for surface. Expected: pygame.Surface")
+        self.__surface = surface
+        self.__static_color = static_color
+        self.__dynamic_color = dynamic_color
+        self.__sleeping_color = sleeping_color
+        self.__outline_color = outline_color
+        self.__static_layer = pygame.Surface(surface.get_size(), 0, surface)
+        self.__static_layer.set_colorkey(_COLOR_KEY, pygame.RLEACCEL)
+        self.__static_transform = None
+        self.__static_dirty = True
+        self.__sprites = {}
+        self.__state = BodyState(fields=("position", "angle", "sleeping", "radius"))
+        self.__other_shapes = []
+
+    def invalidate_static(self):
+        """Redraw the static layer on next draw. Call after adding or removing static shapes
+        """
+        self.__static_dirty = True
+
+    def draw(self, space: pymunk.Space, transform: pymunk.Transform = pymunk.Transform.identity()):
+        """Draw the space
+
+        Args:
+            space (pymunk.Space): Space to draw
+            transform (pymunk.Transform, optional): World to screen transform
+        """
+        if self.__static_dirty or transform != self.__static_transform:
+            self.__draw_static_layer(space, transform)
+        self.__surface.blit(self.__static_layer, (0, 0))
+
+        state = self.__state
+        state.update(space)
+        if state.changed:
+            # The first circle of each body is drawn in batch, anything else one by one
+            self.__other_shapes = [shape for body, circle in zip(state.bodies, state.circles)
+                                   for shape in body.shapes if shape is not circle]
+        rows = state.circle_rows
+        if len(rows):
+            positions, angles = state.positions, state.angles
+            radii, sleeping, offsets = state.radii, state.sleeping, state.offsets
+            if len(rows) != len(state):
+                positions, angles = positions[rows], angles[rows]
+                radii, sleeping, offsets = radii[rows], sleeping[rows], offsets[rows]
+            if offsets.any():
+                cos, sin = np.cos(angles), np.sin(angles)
+                positions = positions + np.stack((offsets[:, 0] * cos - offsets[:, 1] * sin,
+                                                  offsets[:, 0] * sin + offsets[:, 1] * cos),
+                                                 axis=1)
+            self.draw_circles(positions, angles, radii, transform, sleeping)
+        for shape in self.__other_shapes:
+            self.__draw_shape(self.__surface, shape, transform, self.__dynamic_color)
+
+    def draw_circles(self, positions: np.ndarray, angles: np.ndarray, radii: np.ndarray,
+                     transform: pymunk.Transform = pymunk.Transform.identity(),
+                     sleeping: np.ndarray | None = None):
+        """Draw circles from arrays, e.g. replayed or extracted body state
+
+        Args:
+            positions (np.ndarray): (N, 2) world positions
+            angles (np.ndarray): (N,) body angles in radians
+            radii (np.ndarray): (N,) or scalar world radius
+            transform (pymunk.Transform, optional): World to screen transform
+            sleeping (np.ndarray | None, optional): (N,) bool. Draw with the sleeping color.
+        """
+        if not len(positions):
+            return
+        a, b, c, d = transform[:4]
+        scale = math.sqrt(abs(a * d - b * c))
+        centers = transform_points(transform, positions)
+        screen_radii = np.broadcast_to(np.asarray(radii) * scale, (len(positions),))
+
+        width, height = self.__surface.get_size()
+        visible = ((centers[:, 0] + screen_radii >= 0) & (centers[:, 0] - screen_radii <= width)
+                   & (centers[:, 1] + screen_radii >= 0)
+                   & (centers[:, 1] - screen_radii <= height))
+        if not visible.any():
+            return
+        centers = centers[visible]
+        screen_radii = np.maximum(np.rint(screen_radii[visible]).astype(int), 1)
+        # Rotation indicator: a line from the center to the edge of the circle
+        directions = np.stack((np.cos(angles[visible]), np.sin(angles[visible])), axis=1)
+        edges = centers + (directions @ np.array(((a, b), (c, d)))) \
+            * (screen_radii / max(scale, 1e-9))[:, None]
+        if sleeping is None:
+            sleeping = np.zeros(len(visible), dtype=bool)
+        sleeping = sleeping[visible]
+
+        blits = []
+        for center, radius, asleep in zip(centers.tolist(), screen_radii.tolist(),
+                                          sleeping.tolist()):
+            sprite = self.__circle_sprite(radius, asleep)
+            blits.append((sprite, (center[0] - radius, center[1] - radius)))
+        self.__surface.blits(blits, doreturn=False)
+        for center, edge in zip(centers.tolist(), edges.tolist()):
+            pygame.draw.line(self.__surface, self.__outline_color, center, edge, 1)
+
+    def __circle_sprite(self, radius: int, sleeping: bool) -> pygame.Surface:
+        """Pre-rendered circle, cached by screen radius
+        """
+        key = (radius, sleeping)
+        sprite = self.__sprites.get(key)
+        if sprite is None:
+            sprite = pygame.Surface((radius * 2 + 1, radius * 2 + 1), pygame.SRCALPHA, 32)
+            color = self.__sleeping_color if sleeping else self.__dynamic_color
+            pygame.draw.circle(sprite, color, (radius, radius), radius)
+            pygame.draw.circle(sprite, self.__outline_color, (radius, radius), radius, 1)
+            self.__sprites[key] = sprite
+        return sprite
+
+    def __draw_static_layer(self, space: pymunk.Space, transform: pymunk.Transform):
+        """Redraw static shapes. Only shapes overlapping the screen are looked up, through the
+        space's spatial index
+        """
+        self.__static_layer.fill(_COLOR_KEY)
+        width, height = self.__static_layer.get_size()
+        corners = transform_points(inverse_transform(transform),
+                                   np.array(((0, 0), (width, 0), (0, height), (width, height))))
+        view = pymunk.BB(*corners.min(axis=0), *corners.max(axis=0))
+        for shape in space.bb_query(view, _ALL_SHAPES):
+            if shape.body.body_type == pymunk.Body.STATIC:
+                self.__draw_shape(self.__static_layer, shape, transform, self.__static_color)
+        self.__static_transform = transform
+        self.__static_dirty = False
+
+    def __draw_shape(self, surface: pygame.Surface, shape: pymunk.Shape,
+                     transform: pymunk.Transform, color: tuple):
+        """Draw a single shape. Used for the static layer and non-circle dynamic shapes
+        """
+        a, b, c, d = transform[:4]
+        scale = math.sqrt(abs(a * d - b * c))
+        body = shape.body
+        if isinstance(shape, pymunk.Circle):
+            center = transform @ body.local_to_world(shape.offset)
+            radius = max(round(shape.radius * scale), 1)
+            pygame.draw.circle(surface, color, center, radius)
+            pygame.draw.circle(surface, self.__outline_color, center, radius, 1)
+        elif isinstance(shape, pymunk.Segment):
+            point_a = transform @ body.local_to_world(shape.a)
+            point_b = transform @ body.local_to_world(shape.b)
+            radius = shape.radius * scale
+            if radius >= 1:
+                pygame.draw.line(surface, color, point_a, point_b, round(radius * 2))
+                pygame.draw.circle(surface, color, point_a, radius)
+                pygame.draw.circle(surface, color, point_b, radius)
+            else:
+                pygame.draw.aaline(surface, color, point_a, point_b)
+        elif isinstance(shape, pymunk.Poly):
+            points = [transform @ body.local_to_world(vertex) for vertex in shape.get_vertices()]
+            pygame.draw.polygon(surface, color, points)
+            pygame.draw.polygon(surface, self.__outline_color, points, 1)
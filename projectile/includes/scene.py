@@ -0,0 +1,331 @@
+"""
+Scene files for projectile motion
+
+A scene describes the gravity, the boundary and the static obstacles of a course. Two encodings of
+the same data are supported:
+    - JSON (.json), for editing by hand:
+        {"format": "pms-scene", "version": 1, "gravity": [0, 900],
+         "boundary": {"origin": [0, 0], "size": [1200, 600]},
+         "obstacles": [{"name": "wall", "pos": [600, 400], "shape": "Rectangle",
+                        "multiplier": 5, "tags": ["walls"]}]}
+    - binary (.pmsb), for loading large courses fast. Obstacle fields are stored as arrays.
+      Version 2 stores multiplier and radius as float64, version 1 files (int32) still load.
+
+Obstacle keys other than name and pos are optional and default to StaticObstacle's defaults.
+load_scene validates the whole scene once, builds every StaticObstacle, then registers them with
+a single ObstacleRegistry.add_many (one space.add).
+
+CLI (convert between encodings):
+    python -m projectile.includes.scene course.json course.pmsb
+"""
+import argparse
+import json
+import struct
+
+import numpy as np
+
+from projectile.includes.sprites import StaticObstacle
+try:
+    from projectile.includes.constants import SIZE, G_HORIZONTAL, G_VERTICAL
+except ImportError:
+    SIZE = (1200, 600)
+    G_HORIZONTAL, G_VERTICAL = 0, 900
+
+FORMAT = "pms-scene"
+VERSION = 1
+# Same codes as StaticObstacle's int shapes
+SHAPE_CODES = {"Line": 0, "Square": 1, "Rectangle": 2, "IsoscelesTriangle": 3, "Trapezoid": 4,
+               "Circle": 5, "Custom": 6}
+_SHAPE_NAMES = {code: name for name, code in SHAPE_CODES.items()}
+_OBSTACLE_DEFAULTS = {"shape": "Circle", "multiplier": 1, "radius": 20, "vertices": (),
+                      "density": 1.0, "friction": 0.9, "elasticity": 0.0, "tags": ()}
+
+_MAGIC = b"PMSSCN\x00\x00"
+_BINARY_VERSION = 2
+# Binary version -> dtype of (multiplier, radius)
+_SIZE_DTYPES = {1: "<i4", 2: "<f8"}
+_HAS_BOUNDARY = 0b1
+_HEADER = struct.Struct("<8sHH6dQ")  # magic, version, flags, gravity, origin, size, count
+_NAME_SEPARATOR = "\x1e"
+_TAG_SEPARATOR = "\x1f"
+
+
+def new_scene(gravity: tuple | list = (G_HORIZONTAL, G_VERTICAL),
+              boundary: tuple | list | None = ((0, 0), SIZE), obstacles: list | None = None) -> dict:
+    """Create a scene dict
+
+    Args:
+        gravity (tuple | list, optional): Gravity. Defaults to (G_HORIZONTAL, G_VERTICAL).
+        boundary (tuple | list | None, optional): (origin, size). None for no boundary.
+        Defaults to ((0, 0), SIZE).
+        obstacles (list | None, optional): Obstacle dicts. Defaults to None.
+
+    Returns:
+        dict: Scene
+    """
+    return {"format": FORMAT, "version": VERSION, "gravity": list(gravity),
+            "boundary": None if boundary is None else {"origin": list(boundary[0]),
+                                                       "size": list(boundary[1])},
+            "obstacles": list(obstacles or [])}
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, int | float) and not isinstance(value, bool)
+
+
+def _integral(value: float) -> int | float:
+    """Whole floats back to int, so a binary round-trip gives what JSON gives
+    """
+    return int(value) if value.is_integer() else value
+
+
+def validate_scene(scene: dict) -> dict:
+    """Check a scene and fill in obstacle defaults
+
+    Args:
+        scene (dict): Scene as read from a file
+
+    Raises:
+        TypeError: A field has an unexpected type
+        ValueError: Unknown format / version, unknown shape or repeated name
+
+    Returns:
+        dict: Scene with every obstacle key present
+    """
+    if not isinstance(scene, dict):
+        raise TypeError("Unexpected type for scene. Expected: dict")
+    if scene.get("format", FORMAT) != FORMAT:
+        raise ValueError(f"Not a scene: format is {scene.get('format')}")
+    if scene.get("version") != VERSION:
+        raise ValueError(f"Unsupported scene version: {scene.get('version')}")
+    gravity = scene.get("gravity", (G_HORIZONTAL, G_VERTICAL))
+    if not isinstance(gravity, tuple | list) or len(gravity) != 2 or not all(
+            _is_number(value) for value in gravity):
+        raise TypeError("Unexpected type for gravity. Expected: tuple, list of 2 numbers")
+    # A missing boundary means the default one, null means no boundary
+    boundary = scene.get("boundary", {"origin": [0, 0], "size": list(SIZE)})
+    if boundary is not None and (not isinstance(boundary, dict)
+                                 or len(boundary.get("origin", ())) != 2
+                                 or len(boundary.get("size", ())) != 2):
+        raise TypeError("Unexpected type for boundary. Expected: {origin, size}, None")
+
+    obstacles = []
+    names = set()
+    for index, obstacle in enumerate(scene.get("obstacles", ())):
+        if not isinstance(obstacle, dict) or "name" not in obstacle or "pos" not in obstacle:
+            raise TypeError(f"Unexpected obstacle #{index}. Expected: dict with name and pos")
+        if obstacle["name"] in names:
+            raise ValueError(f"Obstacle name already exists: {obstacle['name']}")
+        names.add(obstacle["name"])
+        obstacle = {**_OBSTACLE_DEFAULTS, **obstacle}
+        pos = obstacle["pos"]
+        if not isinstance(pos, tuple | list) or len(pos) != 2 or not all(
+                _is_number(value) for value in pos):
+            raise TypeError(f"Unexpected type for pos of {obstacle['name']}. "
+                            "Expected: tuple, list of 2 numbers")
+        for key in ("multiplier", "radius"):
+            if not _is_number(obstacle[key]):
+                raise TypeError(f"Unexpected type for {key} of {obstacle['name']}. "
+                                "Expected: int, float")
+        if isinstance(obstacle["shape"], int):
+            obstacle["shape"] = _SHAPE_NAMES.get(obstacle["shape"], obstacle["shape"])
+        if obstacle["shape"] not in SHAPE_CODES:
+            raise ValueError(f"Unknown shape for {obstacle['name']}: {obstacle['shape']}")
+        vertices = obstacle["vertices"]
+        valid = isinstance(vertices, tuple | list) and all(
+            isinstance(vertex, tuple | list) and len(vertex) == 2
+            and all(_is_number(value) for value in vertex) for vertex in vertices)
+        if not valid or (obstacle["shape"] == "Custom" and not vertices):
+            raise TypeError(f"Unexpected type for vertices of {obstacle['name']}. "
+                            "Expected: tuple, list of (x, y) number pairs, required for Custom")
+        tags = obstacle["tags"]
+        if not isinstance(tags, tuple | list) or not all(isinstance(tag, str) for tag in tags):
+            raise TypeError(f"Unexpected type for tags of {obstacle['name']}. "
+                            "Expected: tuple, list of str")
+        obstacles.append(obstacle)
+    return {"format": FORMAT, "version": VERSION, "gravity": list(gravity),
+            "boundary": boundary, "obstacles": obstacles}
+
+
+def build_obstacles(scene: dict, body=None) -> tuple:
+    """Create the StaticObstacle of a validated scene
+
+    Args:
+        scene (dict): Scene returned by validate_scene
+        body (pymunk.Body | None, optional): Shared static body for every obstacle. None gives
+        each obstacle its own body. Defaults to None.
+
+    Returns:
+        tuple: (obstacles, tags_by_name), arguments of ObstacleRegistry.add_many
+    """
+    obstacles = []
+    tags_by_name = {}
+    for spec in scene["obstacles"]:
+        obstacles.append(StaticObstacle(spec["name"], tuple(spec["pos"]), spec["shape"],
+                                        spec["multiplier"], spec["vertices"], spec["radius"],
+                                        spec["density"], spec["friction"], spec["elasticity"],
+                                        body))
+        if spec["tags"]:
+            tags_by_name[spec["name"]] = spec["tags"]
+    return obstacles, tags_by_name
+
+
+def _write_strings(file, strings: list, separator: str):
+    data = separator.join(strings).encode("utf-8")
+    file.write(struct.pack("<Q", len(data)))
+    file.write(data)
+
+
+def _read_strings(buffer, offset: int, separator: str) -> tuple:
+    (length,) = struct.unpack_from("<Q", buffer, offset)
+    offset += 8
+    return bytes(buffer[offset:offset + length]).decode("utf-8").split(separator), offset + length
+
+
+def _write_binary(scene: dict, path: str):
+    obstacles = scene["obstacles"]
+    boundary = scene["boundary"]
+    flags = _HAS_BOUNDARY if boundary is not None else 0
+    origin, size = ((boundary["origin"], boundary["size"]) if boundary is not None
+                    else ((0, 0), (0, 0)))
+    with open(path, "wb") as file:
+        file.write(_HEADER.pack(_MAGIC, _BINARY_VERSION, flags, *scene["gravity"], *origin, *size,
+                                len(obstacles)))
+        file.write(np.array([SHAPE_CODES[spec["shape"]] for spec in obstacles],
+                            dtype="<u1").tobytes())
+        file.write(np.array([spec["pos"] for spec in obstacles],
+                            dtype="<f8").reshape(-1, 2).tobytes())
+        file.write(np.array([(spec["multiplier"], spec["radius"]) for spec in obstacles],
+                            dtype=_SIZE_DTYPES[_BINARY_VERSION]).reshape(-1, 2).tobytes())
+        file.write(np.array([(spec["density"], spec["friction"], spec["elasticity"])
+                             for spec in obstacles], dtype="<f8").reshape(-1, 3).tobytes())
+        file.write(np.array([len(spec["vertices"]) for spec in obstacles],
+                            dtype="<u4").tobytes())
+        file.write(np.array([vertex for spec in obstacles for vertex in spec["vertices"]],
+                            dtype="<f8").reshape(-1, 2).tobytes())
+        _write_strings(file, [spec["name"] for spec in obstacles], _NAME_SEPARATOR)
+        _write_strings(file, [_TAG_SEPARATOR.join(spec["tags"]) for spec in obstacles],
+                       _NAME_SEPARATOR)
+
+
+def _read_binary(data: bytes) -> dict:
+    """Decode a binary scene. The result is already validated: the encoding can only hold known
+    shapes and complete obstacles, so only names are checked
+    """
+    (_, version, flags, gx, gy, ox, oy, width, height,
+     count) = _HEADER.unpack_from(data, 0)
+    if version not in _SIZE_DTYPES:
+        raise ValueError(f"Unsupported scene version: {version}")
+    offset = _HEADER.size
+
+    def take(dtype: str, shape: tuple) -> np.ndarray:
+        nonlocal offset
+        items = int(np.prod(shape))
+        array = np.frombuffer(data, dtype, items, offset).reshape(shape)
+        offset += items * array.itemsize
+        return array
+
+    shapes = take("<u1", (count,))
+    if count and shapes.max() > max(_SHAPE_NAMES):
+        raise ValueError(f"Unknown shape code: {shapes.max()}")
+    positions = take("<f8", (count, 2)).tolist()
+    sizes = take(_SIZE_DTYPES[version], (count, 2)).tolist()
+    materials = take("<f8", (count, 3)).tolist()
+    vertex_counts = take("<u4", (count,))
+    vertex_ends = np.cumsum(vertex_counts).tolist()
+    vertices = [tuple(vertex) for vertex in
+                take("<f8", (vertex_ends[-1] if count else 0, 2)).tolist()]
+    names, offset = _read_strings(data, offset, _NAME_SEPARATOR)
+    tags, offset = _read_strings(data, offset, _NAME_SEPARATOR)
+    if count and len(set(names)) != count:
+        raise ValueError("Obstacle names are not unique")
+
+    obstacles = []
+    first_vertex = 0
+    for name, position, shape, (multiplier, radius), (density, friction, elasticity), \
+            vertex_end, obstacle_tags in zip(names, positions, shapes.tolist(), sizes, materials,
+                                             vertex_ends, tags):
+        obstacles.append({
+            "name": name, "pos": position, "shape": _SHAPE_NAMES[shape],
+            "multiplier": _integral(float(multiplier)), "radius": _integral(float(radius)),
+            "vertices": vertices[first_vertex:vertex_end],
+            "density": density, "friction": friction, "elasticity": elasticity,
+            "tags": obstacle_tags.split(_TAG_SEPARATOR) if obstacle_tags else []})
+        first_vertex = vertex_end
+    return new_scene((gx, gy), ((ox, oy), (width, height)) if flags & _HAS_BOUNDARY else None,
+                     obstacles)
+
+
+def read_scene(path: str) -> dict:
+    """Read and validate a JSON or binary scene file. The encoding is detected from the content
+
+    Args:
+        path (str): Scene file
+
+    Returns:
+        dict: Validated scene
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    if data.startswith(_MAGIC):
+        return _read_binary(data)
+    return validate_scene(json.loads(data.decode("utf-8")))
+
+
+def write_scene(scene: dict, path: str, binary: bool | None = None):
+    """Write a scene file
+
+    Args:
+        scene (dict): Scene
+        path (str): Output file
+        binary (bool | None, optional): Use the binary encoding. None picks it for paths ending
+        with ".pmsb". Defaults to None.
+    """
+    scene = validate_scene(scene)
+    if binary is None:
+        binary = path.endswith(".pmsb")
+    if binary:
+        _write_binary(scene, path)
+        return
+    for spec in scene["obstacles"]:
+        # Drop values equal to the defaults to keep the file short
+        for key, value in _OBSTACLE_DEFAULTS.items():
+            if key in spec and (spec[key] == value or isinstance(value, tuple) and not spec[key]):
+                del spec[key]
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(scene, file, indent=1)
+
+
+def load_scene(scene: dict | str, registry, tags: tuple | list = ()) -> list:
+    """Add the obstacles of a scene to an ObstacleRegistry with one space.add. Every obstacle
+    is attached to the space's static body
+
+    Gravity and boundary are not applied: they belong to whoever owns the space (see
+    ProjectileEngine.from_scene).
+
+    Args:
+        scene (dict | str): Scene dict or scene file
+        registry (ObstacleRegistry): Registry to fill
+        tags (tuple | list, optional): Extra tags given to every obstacle. Defaults to ().
+
+    Returns:
+        list: Added obstacles
+    """
+    scene = read_scene(scene) if isinstance(scene, str) else validate_scene(scene)
+    obstacles, tags_by_name = build_obstacles(scene, registry.space.static_body)
+    registry.add_many(obstacles, tags, tags_by_name)
+    return obstacles
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a scene between JSON and binary")
+    parser.add_argument("source")
+    parser.add_argument("destination", help="Binary if it ends with .pmsb, JSON otherwise")
+    args = parser.parse_args()
+    scene = read_scene(args.source)
+    write_scene(scene, args.destination)
+    print(f"{len(scene['obstacles'])} obstacles written to {args.destination}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+pymunk Space factory for projectile motion
+
+create_space builds a Space with solver settings exposed (iterations, collision slop, sleeping,
+spatial hash) and optionally uses pymunk's threaded solver. measure_step_scaling reports how the
+step time of a configuration grows with the number of bodies.
+
+Run `python -m projectile.includes.space --threaded` to compare configurations from a terminal.
+"""
+import argparse
+import math
+import time
+
+import pymunk
+
+from projectile.includes.sprites import Projectile, Boundary
+try:
+    from projectile.includes.constants import SIZE, DT, G_HORIZONTAL, G_VERTICAL
+except ImportError:
+    SIZE = (1200, 600)
+    DT = 0.01
+    G_HORIZONTAL, G_VERTICAL = 0, 900
+
+_MAX_THREADS = 2  # pymunk / Chipmunk limit
+
+
+def create_space(gravity: tuple | list = (G_HORIZONTAL, G_VERTICAL), threaded: bool = False,
+                 threads: int = _MAX_THREADS, iterations: int = 10,
+                 collision_slop: int | float = 0.1,
+                 sleep_time_threshold: int | float = math.inf,
+                 idle_speed_threshold: int | float = 0,
+                 spatial_hash: tuple | list | None = None) -> pymunk.Space:
+    """Create a configured pymunk.Space
+
+    Args:
+        gravity (tuple | list, optional): Gravity. Defaults to (G_HORIZONTAL, G_VERTICAL).
+        threaded (bool, optional): Use the threaded solver. Ignored by pymunk on Windows.
+        Defaults to False.
+        threads (int, optional): Solver threads when threaded (1 or 2). Defaults to 2.
+        iterations (int, optional): Solver iterations per step. Defaults to 10.
+        collision_slop (int | float, optional): Allowed overlap between shapes. Defaults to 0.1.
+        sleep_time_threshold (int | float, optional): Idle time before a body falls asleep.
+        math.inf disables sleeping. Defaults to math.inf.
+        idle_speed_threshold (int | float, optional): Speed under which a body is idle. 0 lets
+        pymunk estimate it from gravity. Defaults to 0.
+        spatial_hash (tuple | list | None, optional): (dim, count) to use a spatial hash instead
+        of the default BB tree. dim should match the typical shape size, count the number of
+        shapes. Defaults to None.
+
+    Returns:
+        pymunk.Space: Configured space
+    """
+    if not isinstance(threaded, bool):
+        raise TypeError("Unexpected type for threaded. Expected: bool")
+    if not isinstance(threads, int):
+        raise TypeError("Unexpected type for threads. Expected: int")
+    if not 1 <= threads <= _MAX_THREADS:
+        raise ValueError(f"threads must be between 1 and {_MAX_THREADS}")
+    if not isinstance(iterations, int):
+        raise TypeError("Unexpected type for iterations. Expected: int")
+    if iterations < 1:
+        raise ValueError("iterations must be greater than 0")
+    if not isinstance(collision_slop, int | float):
+        raise TypeError("Unexpected type for collision_slop. Expected: int, float")
+    if not isinstance(sleep_time_threshold, int | float):
+        raise TypeError("Unexpected type for sleep_time_threshold. Expected: int, float")
+    if not isinstance(idle_speed_threshold, int | float):
+        raise TypeError("Unexpected type for idle_speed_threshold. Expected: int, float")
+    if spatial_hash is not None and (not isinstance(spatial_hash, tuple | list)
+                                     or len(spatial_hash) != 2):
+        raise TypeError("Unexpected type for spatial_hash. Expected: (dim, count), None")
+
+    space = pymunk.Space(threaded=threaded)
+    if threaded and space.threaded:
+        space.threads = threads
+    space.gravity = tuple(gravity)
+    space.iterations = iterations
+    space.collision_slop = collision_slop
+    space.sleep_time_threshold = sleep_time_threshold
+    space.idle_speed_threshold = idle_speed_threshold
+    if spatial_hash is not None:
+        space.use_spatial_hash(*spatial_hash)
+    return space
+
+
+def fill_lattice(space: pymunk.Space, count: int, origin: tuple | list = (20, 20),
+                 spacing: int | float = 12, columns: int = 95, radius: int = 5) -> list:
+    """Add projectiles on a square lattice
+
+    Args:
+        space (pymunk.Space): Space to fill
+        count (int): Number of projectiles
+        origin (tuple | list, optional): First lattice point. Defaults to (20, 20).
+        spacing (int | float, optional): Distance between lattice points. Defaults to 12.
+        columns (int, optional): Projectiles per row. Defaults to 95.
+        radius (int, optional): Projectile radius. Defaults to 5.
+
+    Returns:
+        list: Created projectiles
+    """
+    projectiles = [Projectile((origin[0] + (index % columns) * spacing,
+                               origin[1] + (index // columns) * spacing), radius)
+                   for index in range(count)]
+    items = []
+    for projectile in projectiles:
+        items.extend((projectile.body, projectile.shape))
+    space.add(*items)
+    return projectiles
+
+
+def measure_step_scaling(body_counts: tuple | list = (100, 1000, 5000), steps: int = 200,
+                         warmup: int = 20, **space_options) -> list:
+    """Measure mean step time of a space configuration for several body counts
+
+    Bodies are dropped from a lattice into a SIZE boundary, so most of them end up in contact.
+
+    Args:
+        body_counts (tuple | list, optional): Body counts to measure.
+        Defaults to (100, 1000, 5000).
+        steps (int, optional): Measured steps per count. Defaults to 200.
+        warmup (int, optional): Steps run before measuring. Defaults to 20.
+        **space_options: Passed to create_space
+
+    Returns:
+        list: One dict per count: {"bodies", "step_ms", "steps_per_second"}
+    """
+    results = []
+    for count in body_counts:
+        space = create_space(**space_options)
+        boundary = Boundary(space.static_body, (0, 0), (SIZE[0], SIZE[1] * 4))
+        space.add(*boundary.segments)
+        fill_lattice(space, count)
+        for _ in range(warmup):
+            space.step(DT)
+        start = time.perf_counter()
+        for _ in range(steps):
+            space.step(DT)
+        elapsed = (time.perf_counter() - start) / steps
+        results.append({"bodies": count, "step_ms": elapsed * 1000,
+                        "steps_per_second": 1 / elapsed if elapsed else math.inf})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure pymunk step time scaling")
+    parser.add_argument("--bodies", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--threaded", action="store_true")
+    parser.add_argument("--threads", type=int, default=_MAX_THREADS)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--collision-slop", type=float, default=0.1)
+    parser.add_argument("--sleep-time-threshold", type=float, default=math.inf)
+    parser.add_argument("--spatial-hash", type=float, nargs=2, metavar=("DIM", "COUNT"))
+    args = parser.parse_args()
+
+    spatial_hash = None
+    if args.spatial_hash:
+        spatial_hash = (args.spatial_hash[0], int(args.spatial_hash[1]))
+    results = measure_step_scaling(args.bodies, args.steps, threaded=args.threaded,
+                                   threads=args.threads, iterations=args.iterations,
+                                   collision_slop=args.collision_slop,
+                                   sleep_time_threshold=args.sleep_time_threshold,
+                                   spatial_hash=spatial_hash)
+    print(f"{'bodies':>8} {'step (ms)':>10} {'steps/s':>10}")
+    for result in results:
+        print(f"{result['bodies']:>8} {result['step_ms']:>10.3f} "
+              f"{result['steps_per_second']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,8 @@
 Sprites for projectile motion
 """
 import enum
-from typing import Sequence, Tuple
+import functools
+from typing import Iterable, Sequence, Tuple
 
 import pymunk
 import numpy as np
@@ -15,6 +16,15 @@ except ImportError:
 #!: This file is a modified version of Circle and Box from this tutorial
 #!: https://pymunk-tutorial.readthedocs.io/en/latest/mouse/mouse.html
 
+# Collision categories. Used by spatial queries (e.g. mouse picking) to only look at projectiles
+PROJECTILE_CATEGORY = 0b01
+OBSTACLE_CATEGORY = 0b10
+# Collision types. Used by collision handlers
+PROJECTILE_COLLISION_TYPE = 1
+OBSTACLE_COLLISION_TYPE = 2
+BOUNDARY_COLLISION_TYPE = 3
+_OBSTACLE_FILTER = pymunk.ShapeFilter(categories=OBSTACLE_CATEGORY)
+
 class _ShapeDefinition(enum.Enum):
     Line = [(0, 0), (0, 10)]
     Square = [(0, 0), (10, 0), (10, 10), (0, 10)]
@@ -22,6 +32,29 @@ class _ShapeDefinition(enum.Enum):
     IsoscelesTriangle = [(5, 0), (10, 10), (0, 10)]
     Trapezoid = [(5, 0), (10, 0), (15, 20), (0, 20)]
 
+_SHAPE_NAMES = ("Line", "Square", "Rectangle", "IsoscelesTriangle", "Trapezoid", "Circle",
+                "Custom")
+
+@functools.lru_cache(maxsize=1024)
+def _scaled_geometry(shape: str, multiplier: int, radius: int,
+                     vertices: Tuple[Tuple[int, int], ...] = ()) -> tuple:
+    """Geometry of a pre-defined (or "Custom") shape, relative to the obstacle position
+
+    Cached: identical obstacles share one computation.
+
+    Returns:
+        tuple: ("Circle", radius), ("Segment", a, b, radius) or ("Poly", vertices)
+    """
+    if shape == "Circle":
+        return ("Circle", radius)
+    if shape == "Line":
+        return ("Segment", _ShapeDefinition.Line.value[0],
+                tuple(np.multiply(_ShapeDefinition.Line.value[1], multiplier).tolist()), radius)
+    if shape == "Custom":
+        return ("Poly", tuple(map(tuple, np.multiply(vertices, multiplier).tolist())))
+    return ("Poly", tuple(map(tuple, np.multiply(_ShapeDefinition[shape].value,
+                                                 multiplier).tolist())))
+
 class Projectile:
     """Projectile class. For spawning projectiles
     """
@@ -38,6 +71,8 @@ class Projectile:
         self.__shape.density = 0.1
         self.__shape.friction = 0.9
         self.__shape.elasticity = 0.5
+        self.__shape.filter = pymunk.ShapeFilter(categories=PROJECTILE_CATEGORY)
+        self.__shape.collision_type = PROJECTILE_COLLISION_TYPE
 
     @property
     def body(self):
@@ -75,14 +110,18 @@ class Projectile:
         
 class StaticObstacle:
     def __init__(self, name: str, pos: tuple | list = (), shape: str | int = "Circle",
-                 multiplier: int = 1, vertices: Sequence[Tuple[int, int]] | None = (),
-                 radius: int = 20, density: float | int = 1.0, friction: float | int = 0.9,
-                 elasticity: float | int = 0.0) -> None:
+                 multiplier: int | float = 1, vertices: Sequence[Tuple[int, int]] | None = (),
+                 radius: int | float = 20, density: float | int = 1.0, friction: float | int = 0.9,
+                 elasticity: float | int = 0.0, body: pymunk.Body | None = None) -> None:
         """Obstacle class
         
         Object's shape (if not "Custom") is pre-defined and can only modified by changing it's
         multiplier. While "Custom" shape requires you to define it's vertices in form of a
         sequence of tuple.
+
+        By default every obstacle owns a static body placed at pos. Pass a shared static body
+        (e.g. space.static_body) to attach the shape to it instead, offset by pos. Obstacles
+        sharing a body cost one shape each and nothing more.
         
         Example of vertices:
         -   [(0, 0), (0, 10)] (Line)
@@ -93,13 +132,17 @@ class StaticObstacle:
         Args:
             pos (tuple | list, optional): Position to spawn object. Defaults to ().
             shape (str | int, optional): Object's shape name. Defaults to "Circle".
-            multiplier (int, optional): Object's size (if shape is not "Custom"). Defaults to 1.
+            multiplier (int | float, optional): Object's size (if shape is not "Custom").
+            Defaults to 1.
             vertices (Sequence[Tuple[int, int]] | None, optional): Shape's Vertices.
             If shape is "Custom". Defaults to ().
-            radius (int, optional): Thickness (for "Line" or "Circle" radius). Defaults to 20.
+            radius (int | float, optional): Thickness (for "Line" or "Circle" radius).
+            Defaults to 20.
             density (float | int, optional): Shape density. Defaults to 1.0.
             friction (float | int, optional): Shape friction. Defaults to 0.9.
             elasticity (float | int, optional): Shape elasticity. Defaults to 0.0.
+            body (pymunk.Body | None, optional): Shared static body. None to create one.
+            Defaults to None.
         """
         if not isinstance(name, str):
             raise TypeError("Unexpected type for name. Expected: str")
@@ -109,52 +152,55 @@ class StaticObstacle:
             raise ValueError("Pos must only have 2 elements")
         if not isinstance(shape, str | int):
             raise TypeError("Unexpected type for shape. Expected: str | int")
-        if not isinstance(radius, int):
-            raise TypeError("Unexpected type for radius. Expected: int")
+        if not isinstance(radius, int | float):
+            raise TypeError("Unexpected type for radius. Expected: int, float")
         if not isinstance(density, int | float):
             raise TypeError("Unexpected type for density. Expected: int, float")
         if not isinstance(friction, int | float):
             raise TypeError("Unexpected type for friction. Expected: int, float")
         if not isinstance(elasticity, int | float):
             raise TypeError("Unexpected type for elasticity. Expected: int, float")
-        if (shape != "Circle" or shape != 5) and not isinstance(multiplier, int):
-            raise TypeError("Unexpected type for multiplier. Expected: int")
+        if (shape != "Circle" or shape != 5) and not isinstance(multiplier, int | float):
+            raise TypeError("Unexpected type for multiplier. Expected: int, float")
         if (shape != "Custom" or shape != 6) and not isinstance(vertices, Sequence):
             raise TypeError("Unexpected type for vertices. Expected: Sequence type")
+        if body is not None and (not isinstance(body, pymunk.Body)
+                                 or body.body_type != pymunk.Body.STATIC):
+            raise TypeError("Unexpected type for body. Expected: static pymunk.Body, None")
         self.__name = name
-        self.__body = pymunk.Body(body_type=pymunk.Body.STATIC)
-        self.__body.position = pos
-        if shape == "Circle" or shape == 5:
-            self.__shape = pymunk.Circle(self.__body, radius)
-        elif shape == "Square" or shape == 1:
-            self.__shape = pymunk.Poly(self.__body,
-                                       tuple(np.multiply(_ShapeDefinition.Square.value,
-                                                         multiplier).tolist()))
-        elif shape == "Rectangle" or shape == 2:
-            self.__shape = pymunk.Poly(self.__body,
-                                       tuple(np.multiply(_ShapeDefinition.Rectangle.value,
-                                                         multiplier).tolist()))
-        elif shape == "IsoscelesTriangle" or shape == 3:
-            self.__shape = pymunk.Poly(self.__body,
-                                       tuple(np.multiply(_ShapeDefinition.IsoscelesTriangle.value,
-                                                         multiplier).tolist()))
-        elif shape == "Trapezoid" or shape == 4:
-            self.__shape = pymunk.Poly(self.__body,
-                                       tuple(np.multiply(_ShapeDefinition.Trapezoid.value,
-                                                         multiplier).tolist()))
-        elif shape == "Custom" or shape == 6:
-            self.__shape = pymunk.Poly(self.__body, tuple(np.multiply(vertices,
-                                                                      multiplier).tolist()))
-        elif shape == "Line" or shape == 0:
-            self.__shape = pymunk.Segment(self.__body, _ShapeDefinition.Line.value[0],
-                                          tuple(np.multiply(_ShapeDefinition.Line.value[1],
-                                                            multiplier)), radius)
+        self.__position = tuple(pos)
+        if isinstance(shape, int) and 0 <= shape < len(_SHAPE_NAMES):
+            shape = _SHAPE_NAMES[shape]
+        if body is None:
+            self.__body = pymunk.Body(body_type=pymunk.Body.STATIC)
+            self.__body.position = pos
+            offset = (0, 0)
+        else:
+            self.__body = body
+            offset = tuple(body.world_to_local(pos))
+        if shape in _SHAPE_NAMES:
+            if shape == "Custom":
+                vertices = tuple(map(tuple, vertices))
+            else:
+                vertices = ()
+            geometry = _scaled_geometry(shape, multiplier, radius, vertices)
+            if geometry[0] == "Circle":
+                self.__shape = pymunk.Circle(self.__body, radius, offset)
+            elif geometry[0] == "Segment":
+                self.__shape = pymunk.Segment(self.__body, np.add(geometry[1], offset).tolist(),
+                                              np.add(geometry[2], offset).tolist(), radius)
+            else:
+                self.__shape = pymunk.Poly(self.__body, geometry[1],
+                                           pymunk.Transform.translation(*offset))
         else:
             print(f"Unknown shape. Creating a segment with {radius} as thickness instead")
-            self.__shape = pymunk.Segment(self.__body, pos, tuple(np.add(pos, 10)), radius)
+            self.__shape = pymunk.Segment(self.__body, offset,
+                                          tuple(np.add(offset, 10).tolist()), radius)
         self.__shape.density = density
         self.__shape.friction = friction
         self.__shape.elasticity = elasticity
+        self.__shape.filter = _OBSTACLE_FILTER
+        self.__shape.collision_type = OBSTACLE_COLLISION_TYPE
 
 
     @property
@@ -174,6 +220,11 @@ class StaticObstacle:
         """
         return self.__shape
     @property
+    def position(self):
+        """World position the obstacle was created at
+        """
+        return self.__position
+    @property
     def name(self):
         """__shape getter
 
@@ -207,6 +258,42 @@ class StaticObstacle:
         self.__name = value
 
 
+def space_items(space: pymunk.Space, obstacles: Iterable[StaticObstacle],
+                remove: bool = False) -> list:
+    """Bodies and shapes to add to / remove from a space in one call. The space's own static body
+    is never added or removed, other bodies are listed once and only when needed
+
+    Args:
+        space (pymunk.Space): Space the obstacles go in / out of
+        obstacles (Iterable[StaticObstacle]): Obstacles to add or remove
+        remove (bool, optional): List items to remove instead of items to add. Defaults to False.
+
+    Returns:
+        list: Bodies and shapes for space.add / space.remove
+    """
+    obstacles = list(obstacles)
+    static_body = space.static_body
+    items = []
+    bodies = set()
+    shapes = None
+    for obstacle in obstacles:
+        body = obstacle.body
+        if body is not static_body and body not in bodies:
+            bodies.add(body)
+            # A body shared by several obstacles goes in with the first one and out with the
+            # last one. Only this body's own shapes are checked, not the whole space
+            if remove:
+                if shapes is None:
+                    shapes = {obstacle.shape for obstacle in obstacles}
+                if body.space is space and not any(
+                        shape.space is space and shape not in shapes for shape in body.shapes):
+                    items.append(body)
+            elif body.space is not space:
+                items.append(body)
+        items.append(obstacle.shape)
+    return items
+
+
 class Boundary:
     """Boundary class.  For surrounding game window with a box (STATIC BODY)
     """
@@ -228,6 +315,7 @@ class Boundary:
             segment = pymunk.Segment(body, points[i], points[(i+1) % 4], radius)
             segment.elasticity = 1
             segment.friction = 1
+            segment.collision_type = BOUNDARY_COLLISION_TYPE
             self.__segments.append(segment)
 
     @property
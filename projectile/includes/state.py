@@ -0,0 +1,285 @@
+"""
+Bulk body state for projectile motion
+
+BodyState fills preallocated NumPy arrays with the state of many pymunk bodies in one call:
+ids, positions, velocities, angles, sleeping flags and the radius and offset of each body's first
+Circle. The renderer, the recorder, aerodynamics and the headless engine all read bodies through
+it.
+
+pymunk 6.2 has no batch API. Values are read through Chipmunk's C getters on cached cffi handles,
+written straight into the arrays' memory: about ten times faster than body.position, and
+nothing is allocated per body. This fast path relies on pymunk internals (pymunk._chipmunk,
+Body._body, Shape._shape) and was checked against pymunk 6.2.1. They are probed once at import;
+if any is missing or behaves differently, the public attributes are used instead.
+
+Arrays are reused by every update and returned as views, copy them to keep a frame. Order is
+stable: a space's dynamic bodies keep the order they were added in, an explicit body list keeps
+its own order. Ids are unique per body for the lifetime of the BodyState.
+
+Example:
+    state = BodyState(space)
+    state.update()
+    state.positions  # (N, 2) view, refilled by the next update
+"""
+import weakref
+
+import numpy as np
+import pymunk
+
+_C_FUNCTIONS = ("cpBodyGetPosition", "cpBodyGetVelocity", "cpBodyGetAngle", "cpBodyIsSleeping",
+                "cpCircleShapeGetRadius", "cpBodySetForce")
+
+
+def _load_fast_path() -> tuple:
+    """(ffi, lib) of pymunk's Chipmunk bindings, or (None, None) if the internals used by the
+    fast path are not available
+    """
+    try:
+        from pymunk._chipmunk import ffi, lib
+        if not all(hasattr(lib, name) for name in _C_FUNCTIONS):
+            return None, None
+        body = pymunk.Body(1, 1)
+        body.position = (1, 2)
+        circle = pymunk.Circle(body, 3)
+        position = lib.cpBodyGetPosition(body._body)
+        if ((position.x, position.y) != (1, 2)
+                or lib.cpCircleShapeGetRadius(circle._shape) != 3):
+            return None, None
+        ffi.from_buffer("cpVect[]", np.zeros((1, 2)))
+    except (ImportError, AttributeError, TypeError):
+        return None, None
+    return ffi, lib
+
+
+_ffi, _lib = _load_fast_path()
+
+FIELDS = ("position", "velocity", "angle", "sleeping", "radius")
+
+
+class BodyState:
+    """Reusable arrays holding the state of a list of pymunk bodies
+    """
+    def __init__(self, space: pymunk.Space | None = None, fields: tuple | list = FIELDS,
+                 capacity: int = 256) -> None:
+        """Initiate state
+
+        Args:
+            space (pymunk.Space | None, optional): Space read by update() when called without
+            source. Defaults to None.
+            fields (tuple | list, optional): Values refreshed by update, among FIELDS. Ids and
+            offsets are always available. Defaults to FIELDS.
+            capacity (int, optional): Initial number of rows. Grows as needed. Defaults to 256.
+        """
+        if space is not None and not isinstance(space, pymunk.Space):
+            raise TypeError("Unexpected type for space. Expected: pymunk.Space, None")
+        if any(field not in FIELDS for field in fields):
+            raise ValueError(f"fields must be among {FIELDS}")
+        if not isinstance(capacity, int) or capacity < 1:
+            raise ValueError("capacity must be a positive int")
+        self.__space = space
+        self.__fields = frozenset(fields)
+        self.__source = None
+        self.__bodies = []
+        self.__handles = []
+        self.__circles = []
+        self.__row_circles = []
+        self.__circle_rows = np.empty(0, dtype=np.intp)
+        self.__count = 0
+        self.__changed = False
+        self.__ids = weakref.WeakKeyDictionary()
+        self.__next_id = 0
+        self.__allocate(capacity)
+
+    def __len__(self):
+        return self.__count
+
+    def __reduce__(self):
+        # cffi buffers and handles cannot be pickled: a copy starts empty, with new ids
+        return (BodyState, (self.__space, tuple(self.__fields), self.__capacity))
+
+    def __allocate(self, capacity: int):
+        self.__capacity = capacity
+        self.__id = np.zeros(capacity, dtype=np.int64)
+        self.__position = np.zeros((capacity, 2))
+        self.__velocity = np.zeros((capacity, 2))
+        self.__angle = np.zeros(capacity)
+        self.__sleeping = np.zeros(capacity, dtype=bool)
+        self.__radius = np.zeros(capacity)
+        self.__offset = np.zeros((capacity, 2))
+        if _ffi is not None:
+            self.__position_buffer = _ffi.from_buffer("cpVect[]", self.__position)
+            self.__velocity_buffer = _ffi.from_buffer("cpVect[]", self.__velocity)
+            self.__angle_buffer = _ffi.from_buffer("double[]", self.__angle)
+
+    def __track(self, bodies: list):
+        """Cache handles, ids and circles of a new body list
+        """
+        count = len(bodies)
+        if count > self.__capacity:
+            capacity = self.__capacity
+            while capacity < count:
+                capacity *= 2
+            self.__allocate(capacity)
+        self.__bodies = bodies
+        self.__count = count
+        ids = self.__ids
+        for row, body in enumerate(bodies):
+            body_id = ids.get(body)
+            if body_id is None:
+                body_id = ids[body] = self.__next_id
+                self.__next_id += 1
+            self.__id[row] = body_id
+        circles = [next((shape for shape in body.shapes if isinstance(shape, pymunk.Circle)),
+                        None) for body in bodies]
+        self.__row_circles = circles
+        self.__circle_rows = np.array([row for row, circle in enumerate(circles)
+                                       if circle is not None], dtype=np.intp)
+        self.__circles = [circle for circle in circles if circle is not None]
+        self.__radius[:count] = 0
+        self.__offset[:count] = 0
+        if len(self.__circle_rows):
+            self.__offset[self.__circle_rows] = [circle.offset for circle in self.__circles]
+        if _lib is not None:
+            self.__handles = [body._body for body in bodies]
+            self.__circle_handles = [circle._shape for circle in self.__circles]
+
+    def update(self, source: pymunk.Space | list | None = None) -> int:
+        """Refresh the arrays
+
+        Args:
+            source (pymunk.Space | list | None, optional): Space whose dynamic bodies are read,
+            or a list of bodies read in that order. None for the constructor's space.
+            Defaults to None.
+
+        Returns:
+            int: Number of bodies read
+        """
+        if source is None:
+            source = self.__space
+            if source is None:
+                raise ValueError("update needs a source when BodyState has no space")
+        if isinstance(source, pymunk.Space):
+            bodies = source.bodies
+            self.__changed = bodies != self.__source
+            if self.__changed:
+                self.__source = bodies
+                self.__track([body for body in bodies if body.body_type == pymunk.Body.DYNAMIC])
+        else:
+            self.__source = None
+            self.__changed = source != self.__bodies
+            if self.__changed:
+                self.__track(list(source))
+        count = self.__count
+        if not count:
+            return 0
+        fields = self.__fields
+        if _lib is not None:
+            handles = self.__handles
+            if "position" in fields:
+                self.__position_buffer[0:count] = list(map(_lib.cpBodyGetPosition, handles))
+            if "velocity" in fields:
+                self.__velocity_buffer[0:count] = list(map(_lib.cpBodyGetVelocity, handles))
+            if "angle" in fields:
+                self.__angle_buffer[0:count] = list(map(_lib.cpBodyGetAngle, handles))
+            if "sleeping" in fields:
+                self.__sleeping[:count] = np.fromiter(map(_lib.cpBodyIsSleeping, handles),
+                                                      bool, count)
+            if "radius" in fields and self.__circles:
+                self.__radius[self.__circle_rows] = np.fromiter(
+                    map(_lib.cpCircleShapeGetRadius, self.__circle_handles), float,
+                    len(self.__circles))
+            return count
+        bodies = self.__bodies
+        if "position" in fields:
+            self.__position[:count] = np.fromiter(
+                (value for body in bodies for value in body.position), float,
+                2 * count).reshape(count, 2)
+        if "velocity" in fields:
+            self.__velocity[:count] = np.fromiter(
+                (value for body in bodies for value in body.velocity), float,
+                2 * count).reshape(count, 2)
+        if "angle" in fields:
+            self.__angle[:count] = np.fromiter((body.angle for body in bodies), float, count)
+        if "sleeping" in fields:
+            self.__sleeping[:count] = np.fromiter((body.is_sleeping for body in bodies), bool,
+                                                  count)
+        if "radius" in fields and self.__circles:
+            self.__radius[self.__circle_rows] = [circle.radius for circle in self.__circles]
+        return count
+
+    def set_forces(self, forces: np.ndarray, rows: np.ndarray | None = None):
+        """Write body.force of tracked bodies. Chipmunk resets forces after every step
+
+        Args:
+            forces (np.ndarray): (M, 2) forces, one per row
+            rows (np.ndarray | None, optional): (M,) rows the forces belong to. None for every
+            tracked body. Defaults to None.
+        """
+        forces = np.ascontiguousarray(forces, dtype=float)
+        if _lib is not None:
+            handles = self.__handles
+            if rows is not None:
+                handles = [handles[row] for row in np.asarray(rows).tolist()]
+            list(map(_lib.cpBodySetForce, handles, _ffi.from_buffer("cpVect[]", forces)))
+            return
+        bodies = self.__bodies
+        if rows is not None:
+            bodies = [bodies[row] for row in np.asarray(rows).tolist()]
+        for body, force in zip(bodies, forces.tolist()):
+            body.force = force
+
+    @property
+    def bodies(self):
+        """Tracked bodies, in row order
+        """
+        return self.__bodies
+    @property
+    def changed(self):
+        """True if the last update tracked a different body list than the one before
+        """
+        return self.__changed
+    @property
+    def ids(self):
+        """(N,) int64 body ids
+        """
+        return self.__id[:self.__count]
+    @property
+    def positions(self):
+        """(N, 2) body positions
+        """
+        return self.__position[:self.__count]
+    @property
+    def velocities(self):
+        """(N, 2) body velocities
+        """
+        return self.__velocity[:self.__count]
+    @property
+    def angles(self):
+        """(N,) body angles in radians
+        """
+        return self.__angle[:self.__count]
+    @property
+    def sleeping(self):
+        """(N,) True for sleeping bodies
+        """
+        return self.__sleeping[:self.__count]
+    @property
+    def radii(self):
+        """(N,) radius of each body's first Circle, 0 for bodies without one
+        """
+        return self.__radius[:self.__count]
+    @property
+    def offsets(self):
+        """(N, 2) local offset of each body's first Circle, read when the body list changes
+        """
+        return self.__offset[:self.__count]
+    @property
+    def circles(self):
+        """First Circle of each body, None for bodies without one
+        """
+        return self.__row_circles
+    @property
+    def circle_rows(self):
+        """Rows of the bodies having a Circle
+        """
+        return self.__circle_rows
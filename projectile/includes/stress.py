@@ -0,0 +1,239 @@
+"""
+Stress test for projectile motion
+
+StressTest drives ProjectileMain through phases of increasing projectile counts. Each phase
+clears the pool, spawns N projectiles on a lattice fitted to the boundary (or the screen) with
+random launch velocities, then times every frame in four parts: space.step alone, bookkeeping
+around it (aerodynamics, pose capture, recording, pool and chunk updates), drawing and display
+flip. Physics runs a fixed number of steps per frame instead of following the wall clock,
+and the random generator is seeded, so two runs do the same work and can be compared.
+
+Results are written as JSON: one entry per count, with mean, median, 95th percentile and max in
+milliseconds for "step", "bookkeeping", "draw", "flip" and the whole "frame".
+
+CLI (from the repository root):
+    python -m projectile.includes.stress --counts 100 1000 5000 10000 --output stress.json
+"""
+import argparse
+import json
+import math
+import platform
+
+import numpy as np
+import pygame
+import pymunk
+
+from projectile.includes.pool import ProjectilePool
+
+_PARTS = ("step", "bookkeeping", "draw", "flip", "frame")
+
+
+def lattice(count: int, region: tuple | list, spacing: int | float | None = None) -> tuple:
+    """Points of a square lattice holding count points inside a region
+
+    Args:
+        count (int): Number of points
+        region (tuple | list): ((x0, y0), (x1, y1)) area covered by the lattice
+        spacing (int | float | None, optional): Max distance between points, lowered if the
+        lattice would not fit. None to spread the points over the whole region. Defaults to None.
+
+    Returns:
+        tuple: (count x 2 array of points, spacing used)
+    """
+    (x0, y0), (x1, y1) = region
+    width, height = x1 - x0, y1 - y0
+    spacing = spacing or math.sqrt(width * height / count)
+    columns = min(count, max(1, int(width // spacing)))
+    rows = math.ceil(count / columns)
+    spacing = min(spacing, width / columns, height / rows)
+    index = np.arange(count)
+    points = np.column_stack((x0 + spacing * (index % columns + 0.5),
+                              y0 + spacing * (index // columns + 0.5)))
+    return points, spacing
+
+
+class StressTest:
+    """Phases of projectile counts, and the frame timings measured for each of them
+    """
+    def __init__(self, counts: tuple | list = (100, 1000, 5000, 10000), frames: int = 300,
+                 warmup: int = 30, steps_per_frame: int = 1, speed: int | float = 300,
+                 radius: int | None = None, spacing: int | float | None = None,
+                 seed: int = 0, output: str | None = "stress.json") -> None:
+        """Initiate stress test
+
+        Args:
+            counts (tuple | list, optional): Projectile count of each phase.
+            Defaults to (100, 1000, 5000, 10000).
+            frames (int, optional): Measured frames per phase. Defaults to 300.
+            warmup (int, optional): Frames run before measuring. Defaults to 30.
+            steps_per_frame (int, optional): Physics steps per frame. Defaults to 1.
+            speed (int | float, optional): Max launch speed, the direction is random.
+            Defaults to 300.
+            radius (int | None, optional): Projectile radius. None to fit the lattice.
+            Defaults to None.
+            spacing (int | float | None, optional): Max distance between lattice points. None to
+            spread the projectiles over the whole region. Defaults to None.
+            seed (int, optional): Random generator seed. Defaults to 0.
+            output (str | None, optional): JSON file written when the last phase ends. None to
+            only keep results in memory. Defaults to "stress.json".
+        """
+        if not isinstance(counts, tuple | list) or not counts:
+            raise TypeError("Unexpected type for counts. Expected: non empty tuple, list")
+        if any(not isinstance(count, int) or count < 1 for count in counts):
+            raise ValueError("counts must be positive ints")
+        if not isinstance(frames, int) or frames < 1:
+            raise ValueError("frames must be a positive int")
+        if not isinstance(warmup, int) or warmup < 0:
+            raise ValueError("warmup must be an int >= 0")
+        if not isinstance(steps_per_frame, int) or steps_per_frame < 1:
+            raise ValueError("steps_per_frame must be a positive int")
+        self.__counts = tuple(counts)
+        self.__frames = frames
+        self.__warmup = warmup
+        self.__steps_per_frame = steps_per_frame
+        self.__speed = speed
+        self.__radius = radius
+        self.__spacing = spacing
+        self.__seed = seed
+        self.__output = output
+        self.__phase = 0
+        self.__frame = 0
+        self.__spawned = False
+        self.__timings = np.zeros((len(_PARTS), frames))
+        self.__results = []
+
+    def spawn(self, pool: ProjectilePool, region: tuple | list) -> list:
+        """Clear the pool and spawn the projectiles of the current phase
+
+        Args:
+            pool (ProjectilePool): Pool to spawn in
+            region (tuple | list): ((x0, y0), (x1, y1)) area covered by the lattice
+
+        Returns:
+            list: Spawned projectiles
+        """
+        count = self.__counts[self.__phase]
+        points, spacing = lattice(count, region, self.__spacing)
+        radius = self.__radius or max(1, int(spacing * 0.4))
+        rng = np.random.default_rng(self.__seed + self.__phase)
+        angles = rng.uniform(0, 2 * math.pi, count)
+        speeds = self.__speed * np.sqrt(rng.uniform(0, 1, count))
+        velocities = np.column_stack((np.cos(angles), np.sin(angles))) * speeds[:, None]
+
+        pool.clear()
+        projectiles = []
+        for pos, velocity in zip(points.tolist(), velocities.tolist()):
+            projectile = pool.acquire(pos, radius)
+            projectile.body.velocity = velocity
+            projectiles.append(projectile)
+        self.__frame = 0
+        self.__spawned = True
+        return projectiles
+
+    def record(self, step: int | float, bookkeeping: int | float, draw: int | float,
+               flip: int | float) -> bool:
+        """Store the timings of one frame, in seconds
+
+        Args:
+            step (int | float): Time spent in space.step
+            bookkeeping (int | float): Rest of the update before drawing
+            draw (int | float): Drawing time
+            flip (int | float): Display flip time
+
+        Returns:
+            bool: True once the last phase is over
+        """
+        measured = self.__frame - self.__warmup
+        self.__frame += 1
+        if measured < 0:
+            return False
+        self.__timings[:, measured] = (step, bookkeeping, draw, flip,
+                                       step + bookkeeping + draw + flip)
+        if measured + 1 < self.__frames:
+            return False
+        self.__results.append(self.__summary())
+        self.__phase += 1
+        self.__spawned = False
+        if self.done and self.__output is not None:
+            self.write(self.__output)
+        return self.done
+
+    def __summary(self) -> dict:
+        milliseconds = self.__timings * 1000
+        result = {"projectiles": self.__counts[self.__phase], "frames": self.__frames}
+        for row, part in enumerate(_PARTS):
+            values = milliseconds[row]
+            result[f"{part}_ms"] = {"mean": float(values.mean()),
+                                    "median": float(np.median(values)),
+                                    "p95": float(np.percentile(values, 95)),
+                                    "max": float(values.max())}
+        result["fps"] = 1000 / result["frame_ms"]["mean"] if result["frame_ms"]["mean"] else None
+        return result
+
+    def write(self, path: str):
+        """Write the configuration and the results of the finished phases as JSON
+
+        Args:
+            path (str): Output file
+        """
+        report = {"config": {"counts": list(self.__counts), "frames": self.__frames,
+                             "warmup": self.__warmup, "steps_per_frame": self.__steps_per_frame,
+                             "speed": self.__speed, "radius": self.__radius,
+                             "spacing": self.__spacing, "seed": self.__seed},
+                  "environment": {"python": platform.python_version(),
+                                  "pymunk": pymunk.version, "pygame": pygame.version.ver,
+                                  "numpy": np.__version__, "machine": platform.machine()},
+                  "results": self.__results}
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+    @property
+    def needs_spawn(self):
+        """True when the current phase has not spawned its projectiles yet
+        """
+        return not self.__spawned and not self.done
+    @property
+    def done(self):
+        """True once every phase ran
+        """
+        return self.__phase >= len(self.__counts)
+    @property
+    def steps_per_frame(self):
+        """__steps_per_frame getter
+        """
+        return self.__steps_per_frame
+    @property
+    def results(self):
+        """Summaries of the finished phases
+        """
+        return list(self.__results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Projectile motion stress test")
+    parser.add_argument("--counts", type=int, nargs="+", default=[100, 1000, 5000, 10000])
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=30)
+    parser.add_argument("--steps-per-frame", type=int, default=1)
+    parser.add_argument("--speed", type=float, default=300)
+    parser.add_argument("--radius", type=int)
+    parser.add_argument("--spacing", type=float)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scene", help="Scene file giving the boundary and obstacles")
+    parser.add_argument("--output", default="stress.json")
+    args = parser.parse_args()
+
+    from projectile.main import ProjectileMain
+
+    stress = StressTest(args.counts, args.frames, args.warmup, args.steps_per_frame, args.speed,
+                        args.radius, args.spacing, args.seed, args.output)
+    pms = ProjectileMain(scene_path=args.scene, stress=stress)
+    pms.init_widgets()
+    pms.mainloop()
+    for result in stress.results:
+        print(f"{result['projectiles']:>6} projectiles: "
+              + "  ".join(f"{part} {result[f'{part}_ms']['mean']:.2f} ms" for part in _PARTS))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+Launch parameter sweep for projectile motion
+
+Run every combination of launch angle, impulse magnitude and obstacle layout through the headless
+ProjectileEngine in a process pool and collect range, apex, time of flight and first obstacle hit.
+
+Launches are split in tasks. A task builds its space and obstacles once and runs its launches one
+after another, so building the scene is not paid for every launch.
+
+Layouts are lists of obstacle dicts, keyword arguments of ProjectileEngine.add_obstacle:
+    [{"name": "wall", "pos": [600, 400], "shape": "Rectangle", "multiplier": 5}]
+
+CLI:
+    python -m projectile.includes.sweep --angles 10 80 71 --impulses 2000 20000 37 \\
+        --layout course.json --output sweep.csv
+"""
+import argparse
+import csv
+import itertools
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from projectile.includes.engine import ProjectileEngine
+from projectile.includes.sprites import PROJECTILE_COLLISION_TYPE
+try:
+    from projectile.includes.constants import SIZE, DT, G_HORIZONTAL, G_VERTICAL
+except ImportError:
+    SIZE = (1200, 600)
+    DT = 0.01
+    G_HORIZONTAL, G_VERTICAL = 0, 900
+
+BOUNDARY = "boundary"
+COLUMNS = ("layout", "angle", "impulse", "range", "apex", "time_of_flight", "first_hit")
+
+
+def _run_task(task: tuple) -> dict:
+    """Simulate one batch of launches on one layout. Runs in a worker process
+
+    The space and its obstacles are built once per task. Launches then run one after another
+    with the same projectile: sharing a space between simultaneous launches would start every
+    projectile at the same spot and flood the broadphase with overlapping pairs.
+
+    Args:
+        task (tuple): (layout, angles, impulses, options)
+
+    Returns:
+        dict: Columns of COLUMNS except "layout"
+    """
+    layout, angles, impulses, options = task
+    origin = options["origin"]
+    duration = options["duration"]
+
+    engine = ProjectileEngine(options["gravity"], (0, 0), options["size"], options["dt"],
+                              **options["space_options"])
+    for obstacle in layout:
+        engine.add_obstacle(**obstacle)
+    names = {obstacle.shape: obstacle.name for obstacle in engine.obstacles}
+    projectile = engine.add_projectile(origin, options["radius"])
+    body, shape = projectile.body, projectile.shape
+    space = engine.space
+    space.remove(body, shape)
+
+    count = len(angles)
+    radians = np.radians(angles)
+    # Angles are measured from the horizontal, counterclockwise on screen (y points down)
+    launch = np.stack((np.cos(radians), -np.sin(radians)), axis=1) * np.asarray(impulses)[:, None]
+    launch = launch.tolist()
+    hit_step = np.full(count, -1)
+    first_hit = [""] * count
+    end_x = np.empty(count)
+    min_y = np.empty(count)
+    # [current step, name of the shape hit or None]
+    state = [0, None]
+
+    def begin(arbiter, space, data):
+        if state[1] is None:
+            state[1] = names.get(arbiter.shapes[1], BOUNDARY)
+        return False
+
+    handler = space.add_wildcard_collision_handler(PROJECTILE_COLLISION_TYPE)
+    handler.begin = begin
+
+    dt = engine.dt
+    step = space.step
+    total_steps = int(math.ceil(duration / dt - 1e-9))
+    for index in range(count):
+        body.position = origin
+        body.velocity = (0, 0)
+        body.angular_velocity = 0
+        body.angle = 0
+        space.add(body, shape)
+        body.apply_impulse_at_local_point(launch[index])
+        state[1] = None
+        lowest = origin[1]
+        for current in range(1, total_steps + 1):
+            step(dt)
+            if state[1] is not None:
+                hit_step[index] = current
+                first_hit[index] = state[1]
+                break
+            y = body.position.y
+            if y < lowest:
+                lowest = y
+        end_x[index] = body.position.x
+        min_y[index] = lowest
+        space.remove(body, shape)
+
+    time_of_flight = np.where(hit_step < 0, np.nan, hit_step * dt)
+    return {
+        "angle": np.asarray(angles, dtype=float),
+        "impulse": np.asarray(impulses, dtype=float),
+        "range": end_x - origin[0],
+        "apex": origin[1] - min_y,
+        "time_of_flight": time_of_flight,
+        "first_hit": np.array(first_hit, dtype=object),
+    }
+
+
+def run_sweep(angles, impulses, layouts: list | tuple = ((),), origin: tuple | list = (100, 500),
+              radius: int = 10, duration: int | float = 5, size: tuple | list | None = SIZE,
+              gravity: tuple | list = (G_HORIZONTAL, G_VERTICAL), dt: int | float = DT,
+              processes: int | None = None, chunk_size: int = 2000, **space_options) -> dict:
+    """Launch a projectile for every (layout, angle, impulse) combination
+
+    A launch ends at the first contact with an obstacle or the boundary, or after duration.
+
+    Args:
+        angles (Iterable[int | float]): Launch angles in degrees above the horizontal
+        impulses (Iterable[int | float]): Impulse magnitudes
+        layouts (list | tuple, optional): Obstacle layouts. Defaults to one empty layout.
+        origin (tuple | list, optional): Launch position. Defaults to (100, 500).
+        radius (int, optional): Projectile radius. Defaults to 10.
+        duration (int | float, optional): Max simulated seconds per launch. Defaults to 5.
+        size (tuple | list | None, optional): Boundary size. None for no boundary.
+        gravity (tuple | list, optional): Gravity
+        dt (int | float, optional): Physics step size. Defaults to DT.
+        processes (int | None, optional): Worker processes. None for os.cpu_count(),
+        1 to run in this process. Defaults to None.
+        chunk_size (int, optional): Launches per task. Defaults to 2000.
+        **space_options: Passed to create_space
+
+    Returns:
+        dict: One NumPy array per column of COLUMNS, one row per launch.
+            \t- "range": horizontal distance at the end of the flight
+            \t- "apex": max height above origin
+            \t- "time_of_flight": time until first contact, NaN if nothing was hit
+            \t- "first_hit": obstacle name, "boundary" or "" if nothing was hit
+    """
+    if not isinstance(chunk_size, int) or chunk_size < 1:
+        raise ValueError("chunk_size must be a positive int")
+    options = {"origin": tuple(origin), "radius": radius, "duration": duration,
+               "size": size, "gravity": tuple(gravity), "dt": dt,
+               "space_options": space_options}
+    grid = np.array(list(itertools.product(angles, impulses)), dtype=float).reshape(-1, 2)
+
+    tasks = []
+    task_layouts = []
+    for layout_index, layout in enumerate(layouts):
+        for start in range(0, len(grid), chunk_size):
+            chunk = grid[start:start + chunk_size]
+            tasks.append((list(layout), chunk[:, 0], chunk[:, 1], options))
+            task_layouts.append(layout_index)
+
+    if processes == 1 or len(tasks) <= 1:
+        results = list(map(_run_task, tasks))
+    else:
+        with ProcessPoolExecutor(processes) as executor:
+            results = list(executor.map(_run_task, tasks))
+
+    table = {column: [] for column in COLUMNS}
+    for layout_index, result in zip(task_layouts, results):
+        table["layout"].append(np.full(len(result["angle"]), layout_index))
+        for column in COLUMNS[1:]:
+            table[column].append(result[column])
+    if not results:
+        return {column: np.empty(0) for column in COLUMNS}
+    return {column: np.concatenate(values) for column, values in table.items()}
+
+
+def write_csv(table: dict, path: str):
+    """Write a run_sweep table to a CSV file
+
+    Args:
+        table (dict): run_sweep result
+        path (str): Output path
+    """
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(COLUMNS)
+        writer.writerows(zip(*(table[column].tolist() for column in COLUMNS)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Projectile launch parameter sweep")
+    parser.add_argument("--angles", type=float, nargs=3, metavar=("START", "STOP", "COUNT"),
+                        default=[10, 80, 8])
+    parser.add_argument("--impulses", type=float, nargs=3, metavar=("START", "STOP", "COUNT"),
+                        default=[2000, 20000, 10])
+    parser.add_argument("--layout", action="append", default=[],
+                        help="JSON file with a list of obstacles. Repeat for several layouts")
+    parser.add_argument("--origin", type=float, nargs=2, default=[100, 500])
+    parser.add_argument("--radius", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--output", default="sweep.csv")
+    args = parser.parse_args()
+
+    layouts = []
+    for path in args.layout:
+        with open(path, encoding="utf-8") as file:
+            layouts.append(json.load(file))
+    angles = np.linspace(args.angles[0], args.angles[1], int(args.angles[2]))
+    impulses = np.linspace(args.impulses[0], args.impulses[1], int(args.impulses[2]))
+    table = run_sweep(angles, impulses, layouts or [()], args.origin, args.radius,
+                      args.duration, processes=args.processes)
+    write_csv(table, args.output)
+    print(f"{len(table['angle'])} launches written to {os.path.abspath(args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+Snapshot and rewind timeline for projectile motion
+
+Timeline steps a ProjectileEngine and keeps a pickled keyframe of the whole engine (space,
+bodies, shapes, velocities, projectiles, obstacles) every `interval` steps. Keyframes are
+compressed and kept under a byte budget; the least recently used ones are evicted first, except
+the keyframe of step 0 so every step stays reachable.
+
+Chipmunk keeps contact caches, a bounding box tree and shape ids that pickling does not
+preserve, so an unpickled engine does not step exactly like the engine it was pickled from, while
+two engines unpickled from the same keyframe step identically. So when a keyframe is taken the
+recorded engine continues from that keyframe, loaded back into it: seek() reloads the same state
+and every rewind reproduces the recorded run exactly, at keyframes and between them. Recording
+therefore changes the run slightly compared to an engine stepped without timeline.
+
+Keyframes are loaded into the existing objects: the engine, its projectiles, obstacles, obstacle
+registry, chunked world, aerodynamics and boundary keep their identity, so handles to them stay
+valid across keyframes and seeks. Only the pymunk space, bodies and shapes are replaced; get them
+again through those objects (e.g. projectile.body) instead of keeping them.
+
+Everything reachable from the engine must be picklable (e.g. no lambda as Aerodynamics wind).
+
+Example:
+    timeline = Timeline(engine, interval=50)
+    timeline.step(1000)
+    timeline.seek(420)  # engine now holds its state at step 420
+    timeline.truncate()  # the old future is dropped before changing anything
+    engine.add_projectile((100, 100), impulse=(20000, 0))
+"""
+import bisect
+import collections
+import io
+import pickle
+import zlib
+
+from projectile.includes.engine import ProjectileEngine
+
+
+class _KeyframePickler(pickle.Pickler):
+    """Pickler writing the persistent ids of the engine's own objects instead of the objects
+    """
+    def __init__(self, file, ids: dict) -> None:
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.__ids = ids
+
+    def persistent_id(self, obj):
+        return self.__ids.get(id(obj))
+
+
+class _KeyframeUnpickler(pickle.Unpickler):
+    """Unpickler resolving persistent ids to the live objects, or to new empty ones for objects
+    that no longer exist
+    """
+    def __init__(self, file, live: dict) -> None:
+        super().__init__(file)
+        self.__live = live
+        self.objects = {}
+
+    def persistent_load(self, pid):
+        obj = self.objects.get(pid)
+        if obj is None:
+            kind, key, cls = pid
+            obj = self.__live.get((kind, key))
+            if type(obj) is not cls:
+                obj = cls.__new__(cls)
+            self.objects[pid] = obj
+        return obj
+
+
+class Timeline:
+    """Keyframes of a ProjectileEngine, with LRU eviction under a memory budget
+    """
+    def __init__(self, engine: ProjectileEngine, interval: int = 100,
+                 budget: int = 64 * 2 ** 20, compress: bool = True, level: int = 1) -> None:
+        """Initiate timeline. Takes the keyframe of step 0 right away
+
+        Args:
+            engine (ProjectileEngine): Engine to record. Its current state is step 0
+            interval (int, optional): Steps between keyframes. Defaults to 100.
+            budget (int, optional): Max bytes of keyframe data. Defaults to 64 MiB.
+            compress (bool, optional): zlib compress keyframes. Defaults to True.
+            level (int, optional): zlib level. Defaults to 1.
+        """
+        if not isinstance(engine, ProjectileEngine):
+            raise TypeError("Unexpected type for engine. Expected: ProjectileEngine")
+        if not isinstance(interval, int) or interval < 1:
+            raise ValueError("interval must be a positive int")
+        if not isinstance(budget, int) or budget < 1:
+            raise ValueError("budget must be a positive int")
+        self.__interval = interval
+        self.__budget = budget
+        self.__level = level if compress else None
+        # step -> keyframe bytes, least recently used first
+        self.__keyframes = collections.OrderedDict()
+        self.__steps = []
+        self.__size = 0
+        self.__step = 0
+        self.__engine = engine
+        self.__capture()
+
+    def __objects(self) -> dict:
+        """Objects of the engine kept across keyframes, by (kind, key)
+        """
+        engine = self.__engine
+        objects = {("engine", None): engine, ("registry", None): engine.obstacles}
+        for kind, obj in (("world", engine.world), ("aero", engine.aero),
+                          ("boundary", engine.boundary)):
+            if obj is not None:
+                objects[(kind, None)] = obj
+        for index, projectile in enumerate(engine.projectiles):
+            objects[("projectile", index)] = projectile
+        for obstacle in engine.obstacles:
+            objects[("obstacle", obstacle.name)] = obstacle
+        return objects
+
+    def __dump(self) -> bytes:
+        objects = self.__objects()
+        ids = {id(obj): (kind, key, type(obj)) for (kind, key), obj in objects.items()}
+        buffer = io.BytesIO()
+        _KeyframePickler(buffer, ids).dump({ids[id(obj)]: vars(obj) for obj in objects.values()})
+        return buffer.getvalue()
+
+    def __load(self, data: bytes):
+        """Load a keyframe into the engine's objects
+        """
+        unpickler = _KeyframeUnpickler(io.BytesIO(data), self.__objects())
+        states = unpickler.load()
+        for pid, state in states.items():
+            obj = unpickler.persistent_load(pid)
+            vars(obj).clear()
+            vars(obj).update(state)
+
+    def __capture(self):
+        """Store a keyframe of the current step and continue from it
+        """
+        data = self.__dump()
+        # Continue from the state a seek would reload, so rewinds reproduce this run
+        self.__load(data)
+        if self.__level is not None:
+            data = zlib.compress(data, self.__level)
+        step = self.__step
+        if step in self.__keyframes:
+            self.__size -= len(self.__keyframes.pop(step))
+        else:
+            bisect.insort(self.__steps, step)
+        self.__keyframes[step] = data
+        self.__size += len(data)
+        self.__evict()
+
+    def __evict(self):
+        keyframes = self.__keyframes
+        while self.__size > self.__budget and len(keyframes) > 1:
+            step = next(step for step in keyframes if step != 0)
+            self.__size -= len(keyframes.pop(step))
+            del self.__steps[bisect.bisect_left(self.__steps, step)]
+
+    def step(self, steps: int = 1):
+        """Advance the engine, taking a keyframe every interval steps
+
+        Args:
+            steps (int, optional): Number of fixed steps. Defaults to 1.
+        """
+        interval = self.__interval
+        target = self.__step + steps
+        while self.__step < target:
+            count = min(target, (self.__step // interval + 1) * interval) - self.__step
+            self.__engine.step(count)
+            self.__step += count
+            if self.__step % interval == 0:
+                self.__capture()
+
+    def seek(self, step: int) -> ProjectileEngine:
+        """Restore the engine state at a step
+
+        Args:
+            step (int): Step to go to. May be later than the current step
+
+        Returns:
+            ProjectileEngine: Engine at that step, always the recorded engine
+        """
+        if not isinstance(step, int) or step < 0:
+            raise ValueError("step must be an int >= 0")
+        steps = self.__steps
+        keyframe = steps[bisect.bisect_right(steps, step) - 1]
+        # Stepping forward from the current state is cheaper when no keyframe is closer
+        if not keyframe <= self.__step <= step:
+            self.__keyframes.move_to_end(keyframe)
+            data = self.__keyframes[keyframe]
+            self.__load(zlib.decompress(data) if self.__level is not None else data)
+            self.__step = keyframe
+        self.step(step - self.__step)
+        return self.__engine
+
+    def seek_time(self, time: int | float) -> ProjectileEngine:
+        """Restore the engine state at a simulated time (rounded to the nearest step)
+
+        Args:
+            time (int | float): Simulated seconds since step 0
+
+        Returns:
+            ProjectileEngine: Engine at that step, always the recorded engine
+        """
+        return self.seek(max(0, round(time / self.__engine.dt)))
+
+    def truncate(self):
+        """Drop the keyframes after the current step. Call before changing the engine after a
+        seek, so later seeks do not jump back into the old future
+        """
+        index = bisect.bisect_right(self.__steps, self.__step)
+        for step in self.__steps[index:]:
+            self.__size -= len(self.__keyframes.pop(step))
+        del self.__steps[index:]
+
+    @property
+    def engine(self):
+        """Recorded engine, at the current step
+        """
+        return self.__engine
+    @property
+    def current_step(self):
+        """__step getter
+        """
+        return self.__step
+    @property
+    def keyframes(self):
+        """Steps holding a keyframe, in order
+        """
+        return list(self.__steps)
+    @property
+    def size(self):
+        """Bytes of keyframe data held
+        """
+        return self.__size
+    @property
+    def interval(self):
+        """__interval getter
+        """
+        return self.__interval
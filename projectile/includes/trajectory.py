@@ -0,0 +1,154 @@
+"""
+Trajectory preview for projectile motion
+
+While aiming, predict the flight path the launch impulse would give. The path is evaluated in
+closed form (p = p0 + v0 * t + g * t^2 / 2) for all sample points at once, then optionally checked
+against static shapes with a few segment queries. Results are cached by quantized mouse and body
+position plus the exact body velocity, mass, radius, impulse factor and gravity, so a mouse that
+is not moving (or moving within one quantum) over a resting body costs a dict lookup.
+"""
+from collections import OrderedDict
+
+import numpy as np
+import pymunk
+
+from projectile.includes.sprites import PROJECTILE_CATEGORY
+
+
+def predict_path(position: tuple | list, velocity: tuple | list, gravity: tuple | list,
+                 duration: int | float, samples: int) -> tuple:
+    """Closed form ballistic path
+
+    Args:
+        position (tuple | list): Start position
+        velocity (tuple | list): Start velocity
+        gravity (tuple | list): Gravity
+        duration (int | float): Predicted time in seconds
+        samples (int): Number of sample points
+
+    Returns:
+        tuple: (times, points). (samples,) and (samples, 2) arrays
+    """
+    times = np.linspace(0, duration, samples)
+    points = (np.asarray(position, dtype=float)
+              + np.multiply.outer(times, velocity)
+              + np.multiply.outer(0.5 * times * times, gravity))
+    return times, points
+
+
+def first_hit(space: pymunk.Space, points: np.ndarray, radius: int | float = 0,
+              shape_filter: pymunk.ShapeFilter = pymunk.ShapeFilter(),
+              look_ahead: int | None = None) -> tuple | None:
+    """First shape hit along a polyline
+
+    Each polyline segment is checked with a zero-radius segment query (exact for the center line,
+    no tunneling) and a point query of the given radius at its end point (body edge). Swept segment
+    queries with a radius are not used: the static BB tree culls them with the unexpanded segment
+    and misses shapes that are only reached by the radius.
+
+    Args:
+        space (pymunk.Space): Space to query
+        points (np.ndarray): (N, 2) polyline
+        radius (int | float, optional): Body radius. Defaults to 0.
+        shape_filter (pymunk.ShapeFilter, optional): Query filter
+        look_ahead (int | None, optional): Max number of segments to check. None for all.
+
+    Returns:
+        tuple | None: (segment index, shape, center at impact) or None if nothing is hit
+    """
+    point_list = points.tolist()
+    count = len(point_list) - 1
+    if look_ahead is not None:
+        count = min(count, look_ahead)
+    segment_query = space.segment_query_first
+    point_query = space.point_query_nearest
+    for index in range(count):
+        start, end = point_list[index], point_list[index + 1]
+        info = segment_query(start, end, 0, shape_filter)
+        if info is not None:
+            return index, info.shape, info.point
+        if radius > 0:
+            info = point_query(end, radius, shape_filter)
+            if info is not None:
+                return index, info.shape, end
+    return None
+
+
+class TrajectoryPreview:
+    """Cached trajectory prediction for the projectile being aimed
+    """
+    def __init__(self, duration: int | float = 2, samples: int = 200, quantum: int = 4,
+                 look_ahead: int | None = 60, cache_size: int = 64) -> None:
+        """Initiate preview
+
+        Args:
+            duration (int | float, optional): Predicted time in seconds. Defaults to 2.
+            samples (int, optional): Number of sample points. Defaults to 200.
+            quantum (int, optional): Mouse / body position quantization (pixels) for the cache.
+            Defaults to 4.
+            look_ahead (int | None, optional): Number of path segments checked for collisions.
+            0 disables collision checks, None checks the whole path. Defaults to 60.
+            cache_size (int, optional): Max cached paths. Defaults to 64.
+        """
+        if not isinstance(samples, int) or samples < 2:
+            raise ValueError("samples must be an int >= 2")
+        if not isinstance(quantum, int) or quantum < 1:
+            raise ValueError("quantum must be a positive int")
+        self.__duration = duration
+        self.__samples = samples
+        self.__quantum = quantum
+        self.__look_ahead = look_ahead
+        self.__cache_size = cache_size
+        self.__cache = OrderedDict()
+        self.__filter = pymunk.ShapeFilter(
+            mask=pymunk.ShapeFilter.ALL_MASKS() ^ PROJECTILE_CATEGORY)
+
+    def clear(self):
+        """Drop cached paths. Call when static obstacles change
+        """
+        self.__cache.clear()
+
+    def compute(self, space: pymunk.Space, shape: pymunk.Circle, target: tuple | list,
+                impulse_factor: int | float) -> tuple:
+        """Predicted path for releasing the mouse at target
+
+        The launch mirrors ProjectileMain's MOUSEBUTTONUP: the world impulse is
+        `impulse_factor * (body.position - target)`.
+
+        Args:
+            space (pymunk.Space): Space (for gravity and collision checks)
+            shape (pymunk.Circle): Projectile shape being aimed
+            target (tuple | list): Mouse position in world coordinates
+            impulse_factor (int | float): Impulse modifier
+
+        Returns:
+            tuple: (points, hit). points is a (N, 2) array ending at the first hit,
+            hit is the pymunk.Shape hit or None
+        """
+        body = shape.body
+        quantum = self.__quantum
+        # Anything but the quantized positions changes the path: a moving body misses the cache
+        key = (int(target[0] // quantum), int(target[1] // quantum),
+               int(body.position.x // quantum), int(body.position.y // quantum),
+               tuple(body.velocity), body.mass, shape.radius, impulse_factor,
+               tuple(space.gravity))
+        cached = self.__cache.get(key)
+        if cached is not None:
+            self.__cache.move_to_end(key)
+            return cached
+
+        position = body.position
+        velocity = body.velocity + (position - target) * (impulse_factor / body.mass)
+        _, points = predict_path(position, velocity, space.gravity,
+                                 self.__duration, self.__samples)
+        hit = None
+        if self.__look_ahead != 0:
+            result = first_hit(space, points, shape.radius, self.__filter, self.__look_ahead)
+            if result is not None:
+                index, hit, impact = result
+                points = np.vstack((points[:index + 1], impact))
+
+        self.__cache[key] = (points, hit)
+        if len(self.__cache) > self.__cache_size:
+            self.__cache.popitem(last=False)
+        return points, hit
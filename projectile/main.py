@@ -35,18 +35,37 @@ from pygame.locals import *
 from includes.label import Label
 from includes.button import Button
 from includes.entry import Entry
-from projectile.includes.sprites import Projectile, Boundary, StaticObstacle
+from includes.timestep import FixedTimestep
+from projectile.includes.interpolation import capture_poses, interpolated_poses
+from projectile.includes.sprites import Boundary, StaticObstacle, \
+    PROJECTILE_CATEGORY
 from projectile.includes.camera import Camera
+from projectile.includes.registry import ObstacleRegistry
+from projectile.includes.renderer import SpaceRenderer, transform_points
+from projectile.includes.trajectory import TrajectoryPreview
+from projectile.includes.space import create_space
+from projectile.includes.pool import ProjectilePool
+from projectile.includes.recording import Recorder
+from projectile.includes.scene import read_scene, new_scene, load_scene
+from projectile.includes.collisions import CollisionStats
+from projectile.includes.chunks import ChunkedWorld
+from projectile.includes.aero import Aerodynamics
+from projectile.includes.stress import StressTest
 from projectile.includes.selector import ObjectSelector
 try:
-    from projectile.includes.constants import SIZE, GRAY, RED, FPS, \
-        G_HORIZONTAL, G_VERTICAL
+    from projectile.includes.constants import SIZE, GRAY, RED, FPS, DT, \
+        G_HORIZONTAL, G_VERTICAL, SLEEP_TIME_THRESHOLD, PROJECTILE_TTL, MIN_TIME_SCALE, \
+        MAX_TIME_SCALE
 except ImportError:
     SIZE = (1200, 600)
     WIDTH = SIZE[0]
     HEIGHT = SIZE[1]
     FPS = 60
+    DT = 0.01
     G_HORIZONTAL, G_VERTICAL = 0, 900
+    SLEEP_TIME_THRESHOLD = 0.5
+    PROJECTILE_TTL = 15
+    MIN_TIME_SCALE, MAX_TIME_SCALE = 0.125, 8
     GRAY = "#dcdcdc"
     RED = "#ff0000"
 
@@ -56,21 +75,54 @@ except ImportError:
 class ProjectileMain:
     """Projectile Motion main class. Entry point for menu
     """
-    def __init__(self):
+    def __init__(self, space_options: dict | None = None, record_path: str | None = None,
+                 scene_path: str | None = None, collision_stats: bool = False,
+                 aero: Aerodynamics | None = None, stress: StressTest | None = None):
         """Initiate the simulation
+
+        Args:
+            space_options (dict | None, optional): Solver settings passed to create_space, e.g.
+            {"threaded": True, "threads": 2, "iterations": 5}. Defaults to None.
+            record_path (str | None, optional): Record every physics step to this file, see
+            projectile.includes.recording. Defaults to None.
+            scene_path (str | None, optional): Scene file (JSON or binary) giving gravity,
+            boundary and obstacles, see projectile.includes.scene. A scene without boundary
+            is an unbounded world: obstacles are streamed in chunks around the camera and the
+            projectiles. Defaults to None.
+            collision_stats (bool, optional): Count collisions per obstacle and show them in a
+            HUD. Read them after the run with the collision_stats property. Defaults to False.
+            aero (Aerodynamics | None, optional): Drag and wind applied before every physics
+            step. The aiming preview does not include them. Defaults to None.
+            stress (StressTest | None, optional): Run a stress test instead of the interactive
+            session: phases of projectile counts, timed per frame, then quit. Defaults to None.
         """
         pygame.init()
-        self.__space = pymunk.Space()
+        scene = read_scene(scene_path) if scene_path is not None else new_scene()
+        self.__space = create_space(**{"gravity": scene["gravity"],
+                                       "sleep_time_threshold": SLEEP_TIME_THRESHOLD,
+                                       **(space_options or {})})
+        bounds = None
+        if scene["boundary"] is not None:
+            (x0, y0), (x1, y1) = scene["boundary"]["origin"], scene["boundary"]["size"]
+            bounds = ((x0 - 50, y0 - 50), (x1 + 50, y1 + 50))
+        self.__pool = ProjectilePool(self.__space, bounds, ttl=PROJECTILE_TTL)
         self.__screen = pygame.display.set_mode(SIZE)
         self.__clock = pygame.time.Clock()
-        self.__draw_options = DrawOptions(self.__screen)
-        self.__boundary = Boundary(self.__space.static_body, (0, 0), (1200, 600))
-        self.__projectile = Projectile((100, 100), 25)
+        # Physics may use half of a frame, fast forward lowers its step count to fit
+        self.__timestep = FixedTimestep(DT, max_steps=100, step_budget=0.5 / FPS)
+        self.__time_scale_surface = None
+        self.__renderer = SpaceRenderer(self.__screen)
+        self.__preview = TrajectoryPreview()
+        self.__transform = pymunk.Transform.identity()
+        self.__boundary = None
+        if scene["boundary"] is not None:
+            self.__boundary = Boundary(self.__space.static_body, scene["boundary"]["origin"],
+                                       scene["boundary"]["size"])
         self.__label_font = pygame.font.Font(rf"{Path(__file__).parent}\assets\fonts\times.ttf", 20)
         self.__desc_font = pygame.font.Font(rf"{Path(__file__).parent}\assets\fonts\times.ttf", 20)
         self.__button_font = pygame.font.Font(rf"{Path(__file__).parent}\assets\fonts\times.ttf", 15)
         self.__entry_font = pygame.font.Font(rf"{Path(__file__).parent}\assets\fonts\times.ttf", 20)
-        self.__camera = Camera(5, 0.01, 0.01)
+        self.__camera = Camera(5, 0.01, 0.01, viewport=SIZE)
         self.__ignore_zone = pygame.Rect(0, 0, 0, 0)
         self.__selected_object = ObjectSelector.Line.name
         self.__object_queue = deque(ObjectSelector)
@@ -84,16 +136,37 @@ class ProjectileMain:
         self.__toggling = False
         self.__impulse = -1000
         self.__info_frame = 0
-        self.__objects = []
+        self.__world = None
+        if scene["boundary"] is None:
+            self.__world = ChunkedWorld(self.__space, max(SIZE))
+        self.__objects = ObstacleRegistry(self.__space, self.__world)
+        self.__previous_poses = []
+        self.__m_position = (0, 0)
+        self.__pick_filter = pymunk.ShapeFilter(mask=PROJECTILE_CATEGORY)
+        self.__recorder = Recorder(record_path, DT) if record_path is not None else None
+        self.__simulated_time = 0.0
+        self.__aero = aero
+        self.__stress = stress
+        self.__stress_region = ((0, 0), SIZE)
+        if scene["boundary"] is not None:
+            self.__stress_region = (scene["boundary"]["origin"], scene["boundary"]["size"])
+        self.__collision_stats = None
+        self.__hud_surfaces = []
+        self.__hud_frame = 0
+        if collision_stats:
+            self.__collision_stats = CollisionStats(self.__space, registry=self.__objects)
+            self.__collision_stats.attach()
 
-        self.__space.gravity = G_HORIZONTAL, G_VERTICAL
         self.__active_shape = None
         self.__pulling = False
         self.__running = True
 
-        for segment in self.__boundary.segments:
-            self.__space.add(segment)
-        self.__space.add(self.__projectile.body, self.__projectile.shape)
+        if self.__boundary is not None:
+            self.__space.add(*self.__boundary.segments)
+        load_scene(scene, self.__objects)
+        self.__projectile = self.__pool.acquire((100, 100), 25)
+        if self.__world is not None:
+            self.__world.update((self.__camera.visible_bb(),), [self.__projectile.body.position])
 
     def init_widgets(self):
         """Initiate widgets
@@ -200,15 +273,22 @@ class ProjectileMain:
                 tmp_object = StaticObstacle(self.__entry_name.get(),
                                             (self.__entry_pos_x.get(as_type=int),
                                             self.__entry_pos_y.get(as_type=int)), shape,
-                                            radius=self.__entry_multiplier.get(as_type=int))
+                                            radius=self.__entry_multiplier.get(as_type=int),
+                                            body=self.__space.static_body)
             else:
                 tmp_object = StaticObstacle(self.__entry_name.get(),
                                             (self.__entry_pos_x.get(as_type=int),
                                             self.__entry_pos_y.get(as_type=int)), shape,
-                                            multiplier=self.__entry_multiplier.get(as_type=int))
-            self.__objects.append(tmp_object)
+                                            multiplier=self.__entry_multiplier.get(as_type=int),
+                                            body=self.__space.static_body)
+            if tmp_object.name in self.__objects:
+                self.__show_info = True
+                self.__label_info.config(f"\"{tmp_object.name}\" already exists")
+                return
             self.__label_info.config(text="")
-            self.__space.add(tmp_object.body, tmp_object.shape)
+            self.__objects.add(tmp_object)
+            self.__renderer.invalidate_static()
+            self.__preview.clear()
 
     def __remove(self):
         while self.__ready_to_step or self.__during_query:
@@ -231,10 +311,12 @@ class ProjectileMain:
             for entry in self.__entries:
                 entry.config(state="normal")
             remove_name = self.__entry_name.get()
-            for object in self.__objects:
-                if object.name == remove_name:
-                    self.__space.remove(object.shape, object.body)
-                    self.__objects.remove(object)
+            if any(char in remove_name for char in "*?["):
+                self.__objects.remove_glob(remove_name)
+            else:
+                self.__objects.remove_many((remove_name,))
+            self.__renderer.invalidate_static()
+            self.__preview.clear()
 
     def __next_object(self):
         self.__btn_down.config(state="disabled")
@@ -285,28 +367,80 @@ class ProjectileMain:
     def __handle_camera_movement(self):
         if any([entry.get_status() for entry in self.__entries]):
             return
-        keys = pygame.key.get_pressed()
-        self.__camera_transform = self.__camera.compute_translation_and_scaling(keys)
-        self.__draw_options.transform = (
-            pymunk.Transform.translation(int(SIZE[0] / 2), int(SIZE[1] / 2))
-            @ pymunk.Transform.scaling(self.__camera_transform[1])
-            @ self.__camera_transform[0]
-            @ pymunk.Transform.rotation(self.__camera_transform[2])
-            @ pymunk.Transform.translation(-int(SIZE[0] / 2), -int(SIZE[1] / 2))
-        )
+        self.__camera.compute_translation_and_scaling(pygame.key.get_pressed())
+        self.__transform = self.__camera.transform
+
+    def __to_world(self, position):
+        """Map a screen position to world coordinates, undoing camera pan and zoom
+        """
+        return self.__camera.screen_to_world(position)
+
+    def __to_screen(self, position):
+        """Map a world position to screen coordinates
+        """
+        return self.__camera.world_to_screen(position)
+
+    def __pick_projectile(self, position):
+        """Return the projectile shape under a world position, or None
+        """
+        self.__during_query = True
+        q_info = self.__space.point_query_nearest(position, 0, self.__pick_filter)
+        self.__during_query = False
+        if q_info is None or q_info.distance >= 0:
+            return None
+        return q_info.shape
+
+    def __draw_preview(self, shape):
+        """Draw the predicted flight path of the projectile being aimed
+        """
+        self.__during_query = True
+        points, hit = self.__preview.compute(self.__space, shape,
+                                             self.__to_world(self.__m_position), self.__impulse)
+        self.__during_query = False
+        screen_points = transform_points(self.__transform, points).tolist()
+        pygame.draw.lines(self.__screen, RED, False, screen_points, 1)
+        if hit is not None:
+            pygame.draw.circle(self.__screen, RED, screen_points[-1],
+                               int(shape.radius * self.__camera.zoom_scale), 1)
 
     def __create_projectile(self):
         if any([entry.get_status() for entry in self.__entries]):
             return
-        pg_position = from_pygame(
-            tuple(np.subtract(
-                pygame.mouse.get_pos(),
-                (self.__camera.x_offset, self.__camera.y_offset)
-            )),
-            self.__screen
-        )
-        self.__projectile = Projectile(pg_position, radius=20)
-        self.__space.add(self.__projectile.body, self.__projectile.shape)
+        pg_position = self.__to_world(pygame.mouse.get_pos())
+        self.__projectile = self.__pool.acquire(pg_position, radius=20)
+
+    def __change_time_scale(self, factor):
+        """Multiply the time scale by factor (slow motion / fast forward), 0 to reset it
+        """
+        if any([entry.get_status() for entry in self.__entries]):
+            return
+        scale = 1.0
+        if factor:
+            scale = min(max(self.__timestep.time_scale * factor, MIN_TIME_SCALE), MAX_TIME_SCALE)
+        self.__timestep.time_scale = scale
+        self.__time_scale_surface = None
+        if scale != 1:
+            self.__time_scale_surface = self.__button_font.render(
+                f"Time x{scale:g}  (, slower  . faster  / reset)", True, "#000000")
+
+    def __draw_collision_hud(self):
+        """Draw collision statistics. Text is rendered again twice per second only
+        """
+        if self.__hud_frame % (FPS // 2) == 0:
+            self.__hud_surfaces = [self.__button_font.render(line, True, "#000000")
+                                   for line in self.__collision_stats.hud_lines()]
+        self.__hud_frame += 1
+        y = 80
+        for surface in self.__hud_surfaces:
+            self.__screen.blit(surface, (10, y))
+            y += surface.get_height()
+
+    def __stop_recording(self):
+        """Write the recording index and close the file
+        """
+        if self.__recorder is not None:
+            self.__recorder.close()
+            self.__recorder = None
 
     def __pulling_handle(self):
         if self.__pulling:
@@ -332,6 +466,7 @@ class ProjectileMain:
 
         while self.__running:
             if pygame.event.peek(pygame.QUIT):
+                self.__stop_recording()
                 pygame.quit()
                 self.__running = False
                 return 0
@@ -341,75 +476,118 @@ class ProjectileMain:
                 if event.type == KEYDOWN:
                     if event.key in (K_ESCAPE,):
                         self.__running = False
+                        self.__stop_recording()
                         pygame.quit()
                         return 0
                     elif event.key == K_c:
                         self.__create_projectile()
+                    elif event.key == K_COMMA:
+                        self.__change_time_scale(0.5)
+                    elif event.key == K_PERIOD:
+                        self.__change_time_scale(2)
+                    elif event.key == K_SLASH:
+                        self.__change_time_scale(0)
                     elif event.key == K_BACKSPACE and self.__active_shape != None:
-                        self.__space.remove(self.__active_shape, self.__active_shape.body)
+                        self.__pool.release(self.__active_shape.body)
                         self.__active_shape = None
+                        self.__pulling = False
                 elif event.type == MOUSEBUTTONDOWN:
-                    pg_position = from_pygame(
-                        tuple(np.subtract(
-                            pygame.mouse.get_pos(),
-                            (self.__camera.x_offset, self.__camera.y_offset)
-                        )),
-                        self.__screen
-                    )
-                    self.__active_shape = None
-                    for body in self.__space.bodies:
-                        if body.body_type == pymunk.Body.DYNAMIC:
-                            shape = list(body.shapes)[0]
-                            self.__during_query = True
-                            q_info = shape.point_query(pg_position)
-                            self.__during_query = False
-                            distance = q_info.distance
-                            if distance < 0:
-                                self.__active_shape = shape
-                                self.__pulling = True
-                                shape.body.angle = (pg_position - shape.body.position).angle
+                    pg_position = self.__to_world(event.pos)
+                    self.__active_shape = self.__pick_projectile(pg_position)
+                    if self.__active_shape != None:
+                        shape = self.__active_shape
+                        self.__pulling = True
+                        shape.body.angle = (pg_position - shape.body.position).angle
                 elif event.type == MOUSEMOTION:
                     self.__m_position = event.pos
                 elif event.type == MOUSEBUTTONUP:
                     if self.__pulling:
-                        new_event_pos = from_pygame(
-                            tuple(np.subtract(
-                                event.pos,
-                                (self.__camera.x_offset, self.__camera.y_offset)
-                            )),
-                            self.__screen
-                        )
                         self.__pulling = False
                         active_body = self.__active_shape.body
                         point1 = Vec2d(active_body.position[0], active_body.position[1])
-                        point2 = from_pygame(new_event_pos, self.__screen)
+                        point2 = self.__to_world(event.pos)
                         impulse = self.__impulse * Vec2d((point1 - point2)[0],
                                                 (point1 - point2)[1]).rotated(-active_body.angle)
                         active_body.apply_impulse_at_local_point(impulse)
 
+            if self.__stress is not None and self.__stress.needs_spawn:
+                self.__stress.spawn(self.__pool, self.__stress_region)
+                self.__active_shape = None
+                self.__pulling = False
+                self.__renderer.invalidate_static()
+
             self.__ready_to_step = True
             self.__pulling_handle()
             self.__screen.fill(GRAY)
             self.__handle_camera_movement()
-            self.__space.debug_draw(self.__draw_options)
+            if self.__stress is not None:
+                # Same work every frame, whatever the frame rate: runs are comparable
+                self.__clock.tick()
+                steps = self.__stress.steps_per_frame
+            else:
+                steps = self.__timestep.advance(self.__clock.tick(FPS) / 1000)
+            step_start = time.perf_counter()
+            # Time of space.step alone, the rest of the frame before drawing is bookkeeping
+            physics_time = 0
+            # Intermediate states are not drawn: only the last step keeps poses to interpolate
+            for step in range(steps):
+                if step == steps - 1:
+                    self.__previous_poses = capture_poses(self.__space)
+                if self.__aero is not None:
+                    self.__aero.apply(self.__space, self.__simulated_time)
+                space_step_start = time.perf_counter()
+                self.__space.step(DT)
+                physics_time += time.perf_counter() - space_step_start
+                self.__simulated_time += DT
+                if self.__collision_stats is not None:
+                    self.__collision_stats.tick(DT)
+                if self.__recorder is not None:
+                    self.__recorder.capture(self.__space, self.__simulated_time)
+            self.__timestep.record_cost(time.perf_counter() - step_start, steps)
+            if self.__pulling:
+                self.__pool.touch(self.__active_shape.body)
+            self.__pool.update(steps * DT)
+            if self.__world is not None and self.__world.update(
+                    (self.__camera.visible_bb(),),
+                    [projectile.body.position for projectile in self.__pool]):
+                self.__renderer.invalidate_static()
+                self.__preview.clear()
+            if self.__active_shape != None and self.__active_shape.body not in self.__pool:
+                self.__active_shape = None
+                self.__pulling = False
+            draw_start = time.perf_counter()
+            with interpolated_poses(self.__previous_poses, self.__timestep.alpha):
+                self.__renderer.draw(self.__space, self.__transform)
             self.__draw_widgets()
+            if self.__collision_stats is not None:
+                self.__draw_collision_hud()
+            if self.__time_scale_surface is not None:
+                self.__screen.blit(self.__time_scale_surface,
+                                   (10, SIZE[1] - self.__time_scale_surface.get_height() - 10))
 
             if self.__active_shape != None:
                 shape = self.__active_shape
-                radius = int(shape.radius)
-                pg_position = to_pygame(
-                    tuple(np.add(
-                        shape.body.position,
-                        (self.__camera.x_offset, self.__camera.y_offset)
-                    )),
-                    self.__screen
-                )
+                radius = int(shape.radius * self.__camera.zoom_scale)
+                pg_position = to_pygame(self.__to_screen(shape.body.position), self.__screen)
                 pygame.draw.circle(self.__screen, RED, pg_position, radius, 3)
                 if self.__pulling:
                     pygame.draw.line(self.__screen, RED, pg_position, self.__m_position, 3)
                     pygame.draw.circle(self.__screen, RED, self.__m_position, radius, 3)
+                    self.__draw_preview(shape)
 
-            self.__space.step(0.01)
             self.__ready_to_step = False
+            flip_start = time.perf_counter()
             pygame.display.flip()
-            self.__clock.tick(FPS)
\ No newline at end of file
+            if self.__stress is not None and self.__stress.record(
+                    physics_time, draw_start - step_start - physics_time,
+                    flip_start - draw_start, time.perf_counter() - flip_start):
+                self.__running = False
+                self.__stop_recording()
+                pygame.quit()
+                return 0
+
+    @property
+    def collision_stats(self):
+        """CollisionStats of this run, None unless created with collision_stats=True
+        """
+        return self.__collision_stats
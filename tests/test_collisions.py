@@ -0,0 +1,43 @@
+"""CollisionStats tests
+
+Run from the repository root: python -m unittest discover tests
+"""
+import gc
+import unittest
+import weakref
+
+import pymunk
+
+from projectile.includes.collisions import CollisionStats
+from projectile.includes.sprites import Boundary, Projectile
+
+
+class CollisionStatsTest(unittest.TestCase):
+    def test_removed_projectiles_are_released(self):
+        space = pymunk.Space()
+        space.gravity = (0, 900)
+        space.add(*Boundary(space.static_body, (0, 0), (1200, 600)).segments)
+        stats = CollisionStats(space)
+        stats.attach()
+        projectiles = [Projectile((200 + 100 * index, 100), 20) for index in range(5)]
+        for projectile in projectiles:
+            space.add(projectile.body, projectile.shape)
+        refs = [weakref.ref(projectile.shape) for projectile in projectiles]
+        for _ in range(200):
+            space.step(0.01)
+        self.assertGreater(stats.impacts, 0)
+
+        for projectile in projectiles:
+            space.remove(projectile.body, projectile.shape)
+        # Chipmunk drops its cached arbiters of removed shapes on the next step
+        space.step(0.01)
+        del projectiles, projectile
+        gc.collect()
+        self.assertEqual([ref for ref in refs if ref() is not None], [])
+        self.assertEqual(len(stats.projectile_table()["impacts"]), 5)
+        self.assertTrue(all(name.startswith("boundary")
+                            for name in stats.obstacle_table()["name"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,27 @@
+"""ProjectileEngine tests
+
+Run from the repository root: python -m unittest discover tests
+"""
+import unittest
+
+from projectile.includes.engine import ProjectileEngine
+
+
+class RunTest(unittest.TestCase):
+    def test_run_reaches_duration_with_remainder(self):
+        engine = ProjectileEngine(dt=0.01)
+        engine.add_projectile((100, 100))
+        result = engine.run(1.0, sample_every=30)
+        self.assertEqual(len(result["time"]), 5)
+        self.assertAlmostEqual(result["time"][-1], 1.0)
+        self.assertAlmostEqual(engine.time, 1.0)
+
+    def test_run_exact_multiple(self):
+        engine = ProjectileEngine(dt=0.01)
+        result = engine.run(0.5, sample_every=10)
+        self.assertEqual(len(result["time"]), 6)
+        self.assertAlmostEqual(result["time"][-1], 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
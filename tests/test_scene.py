@@ -0,0 +1,52 @@
+"""Scene file tests
+
+Run from the repository root: python -m unittest discover tests
+"""
+import os
+import tempfile
+import unittest
+
+from projectile.includes.scene import new_scene, read_scene, validate_scene, write_scene
+
+
+def _scene():
+    return new_scene(obstacles=[
+        {"name": "ball", "pos": [100, 200], "radius": 1.5},
+        {"name": "wall", "pos": [600.5, 400], "shape": "Rectangle", "multiplier": 0.5},
+        {"name": "big", "pos": [300, 300], "shape": "Square", "multiplier": 5, "radius": 10}])
+
+
+class SceneTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_binary_round_trip_keeps_float_sizes(self):
+        json_path = os.path.join(self.directory.name, "scene.json")
+        binary_path = os.path.join(self.directory.name, "scene.pmsb")
+        write_scene(_scene(), json_path)
+        write_scene(_scene(), binary_path)
+        for binary, text in zip(read_scene(binary_path)["obstacles"],
+                                read_scene(json_path)["obstacles"]):
+            for key in ("name", "pos", "multiplier", "radius"):
+                self.assertEqual(binary[key], text[key])
+            self.assertIs(type(binary["radius"]), type(text["radius"]))
+
+    def test_bad_types_raise_type_error(self):
+        for key, value in (("pos", "100, 200"), ("pos", [1, 2, 3]), ("multiplier", "2"),
+                           ("radius", None), ("vertices", "xy"), ("vertices", [[0, 0], [1]]),
+                           ("vertices", [["a", 0]]), ("tags", "abc"), ("tags", [1])):
+            scene = new_scene(obstacles=[{"name": "bad", "pos": [0, 0], key: value}])
+            with self.assertRaisesRegex(TypeError, f"Unexpected type for {key}"):
+                validate_scene(scene)
+        custom = new_scene(obstacles=[{"name": "bad", "pos": [0, 0], "shape": "Custom"}])
+        with self.assertRaisesRegex(TypeError, "Unexpected type for vertices"):
+            validate_scene(custom)
+        with self.assertRaisesRegex(TypeError, "Unexpected type for gravity"):
+            validate_scene(new_scene(gravity=["a", "b"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,27 @@
+"""StressTest tests
+
+Run from the repository root: python -m unittest discover tests
+"""
+import unittest
+
+from projectile.includes.stress import lattice
+
+
+class LatticeTest(unittest.TestCase):
+    def test_points_fit_the_region(self):
+        regions = (((0, 0), (600, 600)), ((0, 0), (1000, 100)), ((50, 20), (150, 820)))
+        for region in regions:
+            (x0, y0), (x1, y1) = region
+            for count in (1, 7, 100, 1000, 5000, 10000):
+                for spacing in (None, 40):
+                    with self.subTest(region=region, count=count, spacing=spacing):
+                        points, used = lattice(count, region, spacing)
+                        self.assertEqual(len(points), count)
+                        self.assertTrue(((points[:, 0] > x0) & (points[:, 0] < x1)).all())
+                        self.assertTrue(((points[:, 1] > y0) & (points[:, 1] < y1)).all())
+                        if spacing is not None:
+                            self.assertLessEqual(used, spacing)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+"""Timeline tests
+
+Run from the repository root: python -m unittest discover tests
+"""
+import unittest
+
+import numpy as np
+
+from projectile.includes.engine import ProjectileEngine
+from projectile.includes.timeline import Timeline
+
+
+def _engine():
+    engine = ProjectileEngine()
+    for index in range(20):
+        engine.add_projectile((100 + 50 * (index % 10), 100 + 60 * (index // 10)), radius=15,
+                              impulse=(20000 * (index % 3 - 1), -15000 + 1000 * index))
+    return engine
+
+
+def _positions(engine):
+    return np.array([tuple(projectile.body.position) for projectile in engine.projectiles])
+
+
+class TimelineTest(unittest.TestCase):
+    def test_recording_is_reproducible(self):
+        first = Timeline(_engine(), interval=50)
+        second = Timeline(_engine(), interval=50)
+        for _ in range(8):
+            first.step(50)
+            second.step(50)
+            np.testing.assert_array_equal(_positions(first.engine), _positions(second.engine))
+
+    def test_keyframes_keep_handles(self):
+        engine = _engine()
+        projectiles = list(engine.projectiles)
+        timeline = Timeline(engine, interval=50)
+        timeline.step(120)
+        timeline.seek(60)
+        self.assertIs(timeline.engine, engine)
+        self.assertEqual(engine.projectiles, projectiles)
+        bodies = engine.space.bodies
+        self.assertTrue(all(projectile.body in bodies for projectile in projectiles))
+
+    def test_seek_forward_keeps_the_engine(self):
+        engine = _engine()
+        timeline = Timeline(engine, interval=50)
+        timeline.step(120)
+        self.assertIs(timeline.seek(300), engine)
+        self.assertEqual(timeline.current_step, 300)
+
+    def test_rewind_restores_keyframe(self):
+        straight = Timeline(_engine(), interval=50)
+        expected = {}
+        for step in (100, 130, 420):
+            straight.step(step - straight.current_step)
+            expected[step] = _positions(straight.engine)
+        timeline = Timeline(_engine(), interval=50)
+        timeline.step(500)
+        # Steps between keyframes, after contacts, must match the straight run too
+        for step in (420, 130, 100):
+            restored = timeline.seek(step)
+            self.assertEqual(timeline.current_step, step)
+            self.assertIs(timeline.engine, restored)
+            np.testing.assert_array_equal(_positions(restored), expected[step])
+
+if __name__ == "__main__":
+    unittest.main()